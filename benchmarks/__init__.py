@@ -0,0 +1 @@
+"""Performance measurements for the workout tracker."""
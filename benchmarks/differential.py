@@ -0,0 +1,397 @@
+"""Differential check of every calculation engine against the classes.
+
+The reference is ``read_package(...).show_training_info()``. Every
+other engine calculates the same seeded inputs and its values are
+compared field by field within the tolerance it declares: 0 for engines
+that must match bit for bit, a small relative error for the ones that
+reorder the arithmetic. The report lists the worst offenders with their
+inputs; the report lines of the bulk formatters are compared too.
+
+Inputs are plausible packages from ``benchmarks.generator`` plus
+randomized edge cases spanning many orders of magnitude.
+
+    python -m benchmarks.differential --count 100000 --seed 3
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from io import StringIO
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from benchmarks.generator import generate_packages
+from tracker import Package
+from workout_tracker import read_package
+
+FIELDS = ('duration', 'distance', 'speed', 'calories')
+WORST = 5
+
+Row = Tuple[str, float, float, float, float]
+
+
+def generate_edge_packages(count: int, seed: int = 0) -> List[Package]:
+    """Return valid packages with extreme and awkward values.
+
+    Values are drawn log-uniformly over many orders of magnitude and mixed
+    with integers, tiny fractions and values that do not round-trip
+    through short decimal strings.
+    """
+    rng = random.Random(seed)
+
+    def value(low: float, high: float) -> float:
+        number = 10 ** rng.uniform(math.log10(low), math.log10(high))
+        kind = rng.random()
+        if kind < 0.2:
+            return float(max(1, round(number)))
+        if kind < 0.3:
+            return number / 3
+        return number
+
+    packages = []
+    for _ in range(count):
+        workout_type = rng.choice(('RUN', 'WLK', 'SWM'))
+        data = [rng.choice((0, round(value(1, 1e7)))),
+                value(1e-4, 1e3), value(1, 500)]
+        if workout_type == 'WLK':
+            data.append(value(1, 300))
+        elif workout_type == 'SWM':
+            data += [value(1, 100), rng.randint(0, 10_000)]
+        packages.append((workout_type, data))
+    return packages
+
+
+def _rows(infos) -> List[Row]:
+    return [(info.training_type, info.duration, info.distance, info.speed,
+             info.calories) for info in infos]
+
+
+def _columns(names, result):
+    return list(zip(names, *(column.tolist() for column in result)))
+
+
+def _scalar(packages):
+    return _rows(read_package(*package).show_training_info()
+                 for package in packages)
+
+
+def _metric_cache(packages):
+    trainings = [read_package(*package) for package in packages]
+    for training in trainings:
+        training.show_training_info()
+    return _rows(training.show_training_info() for training in trainings)
+
+
+def _result_cache(packages):
+    from tracker.cache import ResultCache
+
+    cache = ResultCache()
+    for package in packages:
+        cache.get_info(*package)
+    return _rows(cache.get_info(*package) for package in packages)
+
+
+def _batch(packages):
+    from tracker.batch import compute_packages
+
+    return _columns(*compute_packages(packages))
+
+
+def _wire(packages):
+    from tracker import wire
+    from tracker.batch import compute_groups
+
+    groups = wire.read_columns(wire.encode_many(packages))
+    return _columns(*compute_groups(groups, len(packages)))
+
+
+def _parallel(packages):
+    from tracker.parallel import score_parallel
+
+    messages, _ = score_parallel(packages, workers=2,
+                                 chunk_size=max(1, len(packages) // 4),
+                                 serial_threshold=0)
+    return _rows(messages)
+
+
+def _streaming(packages):
+    from tracker import streaming
+
+    log = StringIO(''.join(json.dumps(package) + '\n'
+                           for package in packages))
+    return _rows(streaming.iter_info(streaming.iter_trainings(
+        streaming.iter_packages(log))))
+
+
+def _compact(packages):
+    from tracker import compact
+
+    return _rows(compact.read_package(*package).show_training_info()
+                 for package in packages)
+
+
+def _profile(packages):
+    from tracker.profile import ProfileScorer
+
+    scorer = ProfileScorer()
+    return _rows(scorer.score(position % 16, *package)
+                 for position, package in enumerate(packages))
+
+
+def _live(packages):
+    from tracker.live import COUNTERS, SECONDS_IN_HOUR, start_session
+    from workout_tracker import TRAINING_TYPES
+
+    infos = []
+    for workout_type, data in packages:
+        values = dict(zip(TRAINING_TYPES[workout_type].fields, data))
+        action = values.pop('action')
+        # Going through seconds may change the last bit of the duration.
+        seconds = values.pop('duration') * SECONDS_IN_HOUR
+        counts = [values.pop(field) for field in list(values)
+                  if field in COUNTERS]
+        session = start_session(workout_type, *values.values())
+        session.tick(action, seconds, *counts)
+        infos.append(session.info())
+    return _rows(infos)
+
+
+def _mapped(packages):
+    from tracker import wire
+    from tracker.batch import compute_groups
+    from tracker.mapped import MappedArchive
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.bin')
+        with open(path, 'wb') as file:
+            file.write(wire.encode_many(packages))
+        with MappedArchive(path) as archive:
+            columns = compute_groups(archive.columns(), len(archive))
+    return _columns(*columns)
+
+
+def _archive(packages):
+    from tracker.archive import ArchiveReader, write_archive
+    from workout_tracker import TRAINING_TYPES
+
+    rows: List[Optional[Row]] = [None] * len(packages)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.trk')
+        # The start time of a package is its position.
+        write_archive(path, range(len(packages)), packages)
+        with ArchiveReader(path) as archive:
+            for workout_type, starts, result in archive.iter_results():
+                name = TRAINING_TYPES[workout_type].training_class.__name__
+                for position, *values in zip(
+                        starts.astype(int).tolist(),
+                        *(column.tolist() for column in result)):
+                    rows[position] = (name, *values)
+    return rows
+
+
+def _pipeline(packages):
+    from tracker.pipeline import Pipeline
+    from tracker.sinks import JsonLinesSink
+
+    output = StringIO()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sessions.log')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(package) + '\n'
+                            for package in packages)
+        # One file keeps the order of its packages.
+        Pipeline(chunk_rows=1000).run([path], JsonLinesSink(output))
+    return [tuple(json.loads(line).values())
+            for line in output.getvalue().splitlines()]
+
+
+class Engine(NamedTuple):
+    """A calculation path and the relative error it may show."""
+    name: str
+    calculate: Callable[[List[Package]], List[Row]]
+    tolerance: float = 0.0
+
+
+REFERENCE = Engine('scalar', _scalar)
+ENGINES = [
+    Engine('cached.metrics', _metric_cache),
+    Engine('cached.results', _result_cache),
+    Engine('batch', _batch),
+    Engine('wire+batch', _wire),
+    Engine('parallel', _parallel),
+    Engine('streaming', _streaming),
+    Engine('compact', _compact),
+    Engine('profile', _profile, 1e-12),
+    Engine('live', _live, 1e-12),
+    Engine('mapped', _mapped),
+    Engine('archive', _archive),
+    Engine('pipeline', _pipeline),
+]
+
+
+class Mismatch(NamedTuple):
+    """A value of an engine outside its tolerance."""
+    position: int
+    package: Package
+    field: str
+    expected: object
+    actual: object
+    error: float
+
+
+class EngineReport(NamedTuple):
+    """Result of comparing one engine with the reference."""
+    name: str
+    tolerance: float
+    compared: int
+    failures: int
+    max_error: float
+    worst: List[Mismatch]
+    skipped: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.skipped is not None or self.failures == 0
+
+
+def relative_error(expected: float, actual: float) -> float:
+    """Relative difference of two values; equal values give 0."""
+    if expected == actual:
+        return 0.0
+    if math.isnan(expected) or math.isnan(actual):
+        return math.inf
+    return abs(actual - expected) / max(abs(expected), sys.float_info.min)
+
+
+def compare_rows(name: str, tolerance: float, packages: Sequence[Package],
+                 expected: Sequence[Row], actual: Sequence[Row],
+                 worst: int = WORST) -> EngineReport:
+    """Compare the rows of an engine with the reference rows."""
+    if len(actual) != len(expected):
+        mismatch = Mismatch(-1, ('', []), 'rows', len(expected),
+                            len(actual), math.inf)
+        return EngineReport(name, tolerance, 0, 1, math.inf, [mismatch])
+    failures = 0
+    max_error = 0.0
+    offenders: List[Tuple[float, int, Mismatch]] = []
+    for position, (reference, row) in enumerate(zip(expected, actual)):
+        if row[0] != reference[0]:
+            errors = [('training_type', reference[0], row[0], math.inf)]
+        else:
+            errors = [(field, want, got, relative_error(want, got))
+                      for field, want, got in zip(FIELDS, reference[1:],
+                                                  row[1:])]
+        for field, want, got, error in errors:
+            max_error = max(max_error, error)
+            if error <= tolerance:
+                continue
+            failures += 1
+            mismatch = Mismatch(position, packages[position], field, want,
+                                got, error)
+            item = (error, -position, mismatch)
+            if len(offenders) < worst:
+                heapq.heappush(offenders, item)
+            elif item[:2] > offenders[0][:2]:
+                heapq.heapreplace(offenders, item)
+    ranked = [mismatch for _, _, mismatch in sorted(
+        offenders, key=lambda item: item[:2], reverse=True)]
+    return EngineReport(name, tolerance, len(expected), failures, max_error,
+                        ranked)
+
+
+def compare_messages(packages: Sequence[Package],
+                     worst: int = WORST) -> EngineReport:
+    """Compare the bulk report lines with ``InfoMessage.get_message``."""
+    try:
+        from tracker.batch import compute_packages
+        from tracker.formatting import format_messages, render_messages
+    except ImportError as exc:
+        return EngineReport('messages', 0.0, 0, 0, 0.0, [], str(exc))
+    expected = [read_package(*package).show_training_info().get_message()
+                for package in packages]
+    columns = compute_packages(packages)
+    rendered = render_messages(*columns).decode('utf-8').splitlines()
+    failures = 0
+    offenders = []
+    for lines in (format_messages(*columns), rendered):
+        for position, (want, got) in enumerate(zip(expected, lines)):
+            if want != got:
+                failures += 1
+                if len(offenders) < worst:
+                    offenders.append(Mismatch(position, packages[position],
+                                              'message', want, got,
+                                              math.inf))
+        if len(lines) != len(expected):
+            failures += 1
+    return EngineReport('messages', 0.0, len(expected), failures,
+                        math.inf if failures else 0.0, offenders)
+
+
+def run(packages: Sequence[Package], engines: Sequence[Engine] = ENGINES,
+        worst: int = WORST) -> List[EngineReport]:
+    """Run every engine on the packages and compare with the reference."""
+    packages = list(packages)
+    expected = REFERENCE.calculate(packages)
+    reports = []
+    for engine in engines:
+        try:
+            actual = engine.calculate(packages)
+        except ImportError as exc:
+            reports.append(EngineReport(engine.name, engine.tolerance, 0, 0,
+                                        0.0, [], str(exc)))
+            continue
+        reports.append(compare_rows(engine.name, engine.tolerance, packages,
+                                    expected, actual, worst))
+    reports.append(compare_messages(packages, worst))
+    return reports
+
+
+def format_report(reports: Sequence[EngineReport]) -> str:
+    lines = [f'{"engine":16} {"tolerance":>9} {"compared":>9} '
+             f'{"failures":>9} {"max error":>10}']
+    for report in reports:
+        if report.skipped is not None:
+            lines.append(f'{report.name:16} skipped: {report.skipped}')
+            continue
+        lines.append(f'{report.name:16} {report.tolerance:9.0e} '
+                     f'{report.compared:9} {report.failures:9} '
+                     f'{report.max_error:10.2e}')
+    for report in reports:
+        for mismatch in report.worst:
+            workout_type, data = mismatch.package
+            lines.append(
+                f'  {report.name} #{mismatch.position} {mismatch.field}: '
+                f'expected {mismatch.expected!r}, got {mismatch.actual!r} '
+                f'(error {mismatch.error:.2e}) for '
+                f'{json.dumps([workout_type, data])}')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog=prog, description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10_000,
+                        help='plausible packages, as many edge cases')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--worst', type=int, default=WORST,
+                        help='offenders listed per engine')
+    parser.add_argument('--only', nargs='+', metavar='ENGINE',
+                        help='engines to check')
+    args = parser.parse_args(argv)
+
+    engines: Sequence[Engine] = ENGINES
+    if args.only:
+        engines = [engine for engine in ENGINES if engine.name in args.only]
+    packages = (generate_packages(args.count, args.seed)
+                + generate_edge_packages(args.count, args.seed))
+    reports = run(packages, engines, args.worst)
+    print(format_report(reports))
+    return 0 if all(report.ok for report in reports) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Compare per-object and bulk rendering of report lines.
+
+Run with ``python -m benchmarks.formatting [count]``.
+"""
+import sys
+import timeit
+from typing import List, Tuple
+
+from benchmarks.generator import generate_packages
+from tracker import batch, formatting
+from workout_tracker import InfoMessage
+
+DEFAULT_COUNT = 100_000
+REPEAT = 5
+
+
+def run(count: int = DEFAULT_COUNT) -> List[Tuple[str, float]]:
+    names, result = batch.compute_packages(generate_packages(count))
+    rows = list(zip(names, *(column.tolist() for column in result)))
+    cases = [
+        ('InfoMessage.get_message',
+         lambda: '\n'.join(InfoMessage(*row).get_message() for row in rows)),
+        ('format_messages',
+         lambda: '\n'.join(formatting.format_messages(names, result))),
+        ('render_messages',
+         lambda: formatting.render_messages(names, result)),
+    ]
+    return [(name, min(timeit.repeat(case, number=1, repeat=REPEAT)))
+            for name, case in cases]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    print(f'{count} messages, best of {REPEAT}')
+    for name, seconds in run(count):
+        print(f'{name:28} {seconds * 1000:9.1f} ms '
+              f'{count / seconds / 1e6:6.2f} M lines/s')
+
+
+if __name__ == '__main__':
+    main()
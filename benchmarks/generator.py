@@ -0,0 +1,29 @@
+"""Seeded synthetic sensor packages."""
+import random
+from typing import List, Sequence
+
+from tracker import Package
+
+WORKOUT_TYPES = ('RUN', 'WLK', 'SWM')
+
+
+def generate_packages(count: int, seed: int = 0,
+                      workout_types: Sequence[str] = WORKOUT_TYPES
+                      ) -> List[Package]:
+    """Return ``count`` plausible packages, the same for the same seed."""
+    rng = random.Random(seed)
+    packages = []
+    for _ in range(count):
+        workout_type = rng.choice(workout_types)
+        action = rng.randint(100, 30_000)
+        duration = round(rng.uniform(0.2, 3), 3)
+        weight = round(rng.uniform(40, 120), 1)
+        if workout_type == 'RUN':
+            data = [action, duration, weight]
+        elif workout_type == 'WLK':
+            data = [action, duration, weight, round(rng.uniform(140, 210))]
+        else:
+            data = [action, duration, weight, rng.choice((25, 50)),
+                    rng.randint(1, 80)]
+        packages.append((workout_type, data))
+    return packages
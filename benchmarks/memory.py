@@ -0,0 +1,54 @@
+"""Compare memory held by different representations of workouts.
+
+Run with ``python -m benchmarks.memory [count]``.
+"""
+import sys
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import workout_tracker
+from tracker import compact
+
+DEFAULT_COUNT = 100_000
+
+
+def _rows(count: int) -> List[List[float]]:
+    return [[9000 + i % 1000, 1 + i % 7 / 10, 60 + i % 40, 150 + i % 50]
+            for i in range(count)]
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Return the number of bytes still allocated by ``build()``."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def run(count: int = DEFAULT_COUNT) -> List[Tuple[str, int]]:
+    rows = _rows(count)
+    cases = [
+        ('workout_tracker.SportsWalking',
+         lambda: [workout_tracker.SportsWalking(*data) for data in rows]),
+        ('compact.SportsWalking',
+         lambda: [compact.SportsWalking(*data) for data in rows]),
+        ('compact.TrainingTable',
+         lambda: compact.TrainingTable('WLK', rows)),
+    ]
+    return [(name, measure(build)) for name, build in cases]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    print(f'{count} SportsWalking sessions')
+    for name, size in run(count):
+        print(f'{name:32} {size / 2**20:9.2f} MiB '
+              f'{size / count:7.1f} B/session')
+
+
+if __name__ == '__main__':
+    main()
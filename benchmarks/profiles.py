@@ -0,0 +1,63 @@
+"""Compare the workout classes with per-user profile scoring.
+
+The feed has many sessions per user, whose weight and height stay the
+same, as in real histories. Run with
+``python -m benchmarks.profiles [count] [users]``.
+"""
+import random
+import sys
+import timeit
+from typing import List, Tuple
+
+from benchmarks.generator import generate_packages
+from tracker.profile import ProfileScorer
+from workout_tracker import read_package
+
+DEFAULT_COUNT = 100_000
+DEFAULT_USERS = 100
+REPEAT = 5
+
+
+def generate_feed(count: int, users: int, seed: int = 0) -> list:
+    """Return ``(user, workout_type, data)`` with a fixed body per user."""
+    rng = random.Random(seed)
+    bodies = [(round(rng.uniform(40, 120), 1), round(rng.uniform(140, 210)))
+              for _ in range(users)]
+    feed = []
+    for workout_type, data in generate_packages(count, seed):
+        user = rng.randrange(users)
+        weight, height = bodies[user]
+        data[2] = weight
+        if workout_type == 'WLK':
+            data[3] = height
+        feed.append((user, workout_type, data))
+    return feed
+
+
+def run(count: int = DEFAULT_COUNT,
+        users: int = DEFAULT_USERS) -> List[Tuple[str, float]]:
+    feed = generate_feed(count, users)
+    scorer = ProfileScorer()
+    cases = [
+        ('read_package+show_training_info',
+         lambda: [read_package(workout_type, data).show_training_info()
+                  for _, workout_type, data in feed]),
+        ('ProfileScorer.score',
+         lambda: [scorer.score(user, workout_type, data)
+                  for user, workout_type, data in feed]),
+    ]
+    return [(name, min(timeit.repeat(case, number=1, repeat=REPEAT)))
+            for name, case in cases]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_USERS
+    print(f'{count} sessions of {users} users, best of {REPEAT}')
+    for name, seconds in run(count, users):
+        print(f'{name:32} {seconds * 1000:9.1f} ms '
+              f'{seconds / count * 1e9:8.0f} ns/session')
+
+
+if __name__ == '__main__':
+    main()
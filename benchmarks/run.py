@@ -0,0 +1,239 @@
+"""Benchmark suite of the hot paths.
+
+Every case reports the best time per package over several repeats.
+Results can be saved as a baseline and compared with a later run; the
+comparison fails when a case got slower than ``--max-slowdown`` times
+its baseline. Cases with a reference case, such as the cached
+``show_training_info`` and the plain calculation it replaced, fail the
+same way when they are slower than their reference in the same run.
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --compare baseline.json --max-slowdown 1.2
+    python -m benchmarks.run --sizes 10000 1000000 --only pipeline
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from benchmarks.generator import generate_packages
+from workout_tracker import InfoMessage, read_package
+
+MICRO_SIZE = 10_000
+SIZES = (10_000, 100_000)
+REPEAT = 5
+MAX_SLOWDOWN = 1.25
+
+
+class Case(NamedTuple):
+    """A benchmark: ``prepare(count)`` returns the function to time.
+
+    ``reference`` names a case of the same run this one may not be
+    slower than.
+    """
+    name: str
+    prepare: Callable[[int], Callable[[], object]]
+    reference: Optional[str] = None
+
+
+def _fresh(trainings):
+    """Drop cached metrics so that every run calculates them again."""
+    for training in trainings:
+        training._metrics = None
+    return trainings
+
+
+def _read_package(count):
+    packages = generate_packages(count)
+    return lambda: [read_package(*package) for package in packages]
+
+
+def _calories(workout_type):
+    def prepare(count):
+        trainings = [read_package(*package) for package in
+                     generate_packages(count, workout_types=[workout_type])]
+        return lambda: [training.get_spent_calories()
+                        for training in trainings]
+    return prepare
+
+
+def _info_message(count):
+    trainings = [read_package(*package)
+                 for package in generate_packages(count)]
+    return lambda: [training.show_training_info().get_message()
+                    for training in _fresh(trainings)]
+
+
+def _one_pass(count):
+    packages = generate_packages(count)
+    return lambda: [read_package(*package).show_training_info()
+                    for package in packages]
+
+
+def _uncached_info(training):
+    """The body of ``show_training_info`` before metrics were cached."""
+    calories = training.get_spent_calories()
+    distance = training.get_distance()
+    speed = training.get_mean_speed()
+    return InfoMessage(
+        training_type=training.__class__.__name__,
+        duration=training.duration,
+        distance=distance,
+        speed=speed,
+        calories=calories
+    )
+
+
+def _one_pass_uncached(count):
+    packages = generate_packages(count)
+    return lambda: [_uncached_info(read_package(*package))
+                    for package in packages]
+
+
+def _pipeline_scalar(count):
+    packages = generate_packages(count)
+    return lambda: [
+        read_package(*package).show_training_info().get_message()
+        for package in packages
+    ]
+
+
+def _pipeline_batch(count):
+    from tracker.batch import compute_packages
+    from tracker.formatting import format_messages
+
+    packages = generate_packages(count)
+    return lambda: format_messages(*compute_packages(packages))
+
+
+def _pipeline_validated(count):
+    from tracker.batch import compute_packages
+    from tracker.formatting import format_messages
+
+    packages = generate_packages(count)
+    return lambda: format_messages(*compute_packages(packages, []))
+
+
+MICRO_CASES = [
+    Case('read_package', _read_package),
+    Case('Running.get_spent_calories', _calories('RUN')),
+    Case('SportsWalking.get_spent_calories', _calories('WLK')),
+    Case('Swimming.get_spent_calories', _calories('SWM')),
+    Case('show_training_info+get_message', _info_message),
+    Case('read_package+show_training_info.uncached', _one_pass_uncached),
+    Case('read_package+show_training_info', _one_pass,
+         'read_package+show_training_info.uncached'),
+]
+PIPELINE_CASES = [
+    Case('pipeline.scalar', _pipeline_scalar),
+    Case('pipeline.batch', _pipeline_batch),
+    Case('pipeline.batch.validated', _pipeline_validated),
+]
+
+
+def measure(function: Callable[[], object], count: int,
+            repeat: int = REPEAT) -> float:
+    """Return the best time per item in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best / count
+
+
+def run(sizes: Sequence[int] = SIZES, repeat: int = REPEAT,
+        only: Optional[str] = None) -> Dict[str, float]:
+    """Run all cases, returning seconds per package by case name.
+
+    The cases take turns in every repeat, so that a case and its
+    reference see the same load of the machine.
+    """
+    planned = [(case.name, case, MICRO_SIZE) for case in MICRO_CASES]
+    planned += [(f'{case.name}[{size}]', case, size)
+                for case in PIPELINE_CASES for size in sizes]
+    prepared = {name: (case.prepare(count), count)
+                for name, case, count in planned
+                if only is None or only in name}
+    results = dict.fromkeys(prepared, float('inf'))
+    for _ in range(repeat):
+        for name, (function, count) in prepared.items():
+            results[name] = min(results[name], measure(function, count, 1))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            max_slowdown: float = MAX_SLOWDOWN) -> List[str]:
+    """Return the names of cases slower than allowed."""
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * max_slowdown]
+
+
+def check_references(results: Dict[str, float],
+                     max_slowdown: float = MAX_SLOWDOWN) -> List[str]:
+    """Return the names of cases slower than allowed by their reference
+    case of the same run.
+    """
+    references = {case.name: case.reference
+                  for case in MICRO_CASES + PIPELINE_CASES if case.reference}
+    return [name for name, seconds in results.items()
+            if references.get(name) in results
+            and seconds > results[references[name]] * max_slowdown]
+
+
+def report(results: Dict[str, float],
+           baseline: Optional[Dict[str, float]] = None) -> str:
+    lines = [f'{"case":42} {"ns/package":>12} {"baseline":>12} '
+             f'{"ratio":>7}']
+    for name, seconds in results.items():
+        line = f'{name:42} {seconds * 1e9:12.1f}'
+        if baseline and name in baseline:
+            line += (f' {baseline[name] * 1e9:12.1f}'
+                     f' {seconds / baseline[name]:7.2f}')
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog=prog, description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help='package counts of the pipeline cases')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--only', help='run cases containing this text')
+    parser.add_argument('--save', help='write results to a JSON file')
+    parser.add_argument('--compare', help='baseline JSON file')
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.only)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+    print(report(results, baseline))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'results': results}, file, indent=2)
+    status = 0
+    slower = check_references(results, args.max_slowdown)
+    if slower:
+        print(f'Slower than {args.max_slowdown}x the reference case: '
+              + ', '.join(slower))
+        status = 1
+    if baseline is not None:
+        slower = compare(results, baseline, args.max_slowdown)
+        if slower:
+            print(f'Slower than {args.max_slowdown}x the baseline: '
+                  + ', '.join(slower))
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
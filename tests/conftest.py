@@ -2,9 +2,23 @@ import sys
 from pathlib import Path
 from io import StringIO
 
+import pytest
+
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR))
 
+# The packages of the demo run of ``workout_tracker.py``.
+DEMO_PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+# Long durations, a low weight and fractional values.
+MORE_PACKAGES = [
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+]
+
 
 class Capturing(list):
     """
@@ -27,5 +41,24 @@ class Capturing(list):
         sys.stdout = self._stdout
 
 
+@pytest.fixture
+def cycling():
+    """Register a ``CYC`` workout type for the duration of a test."""
+    import workout_tracker
+
+    class Cycling(workout_tracker.Training):
+        """Workout: cycling."""
+        LEN_STEP = 5.5
+        CALORIES_PER_KM = 20
+
+        def get_spent_calories(self) -> float:
+            return (self.get_distance() * self.CALORIES_PER_KM
+                    * self.weight / 70)
+
+    workout_tracker.register('CYC')(Cycling)
+    yield Cycling
+    del workout_tracker.TRAINING_TYPES['CYC']
+
+
 def pytest_make_parametrize_id(config, val):
     return repr(val)
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from tracker import batch
+from tracker.aggregation import DAY, Aggregator
+from workout_tracker import read_package
+
+# Monday 2024-01-01 00:00 UTC.
+MONDAY = 1_704_067_200
+SESSIONS = [
+    ('ann', MONDAY + 3600, ('RUN', [15000, 1, 75])),
+    ('ann', MONDAY + DAY, ('WLK', [9000, 1, 75, 180])),
+    ('bob', MONDAY + DAY, ('SWM', [720, 1, 80, 25, 40])),
+    ('ann', MONDAY + 8 * DAY, ('RUN', [1206, 12, 6])),
+]
+
+
+def build(sessions=SESSIONS, **options):
+    aggregator = Aggregator(**options)
+    for user, timestamp, package in sessions:
+        info = read_package(*package).show_training_info()
+        aggregator.add(user, timestamp, info)
+    return aggregator
+
+
+def test_totals_per_user_and_type():
+    aggregator = build()
+    run = aggregator.totals('ann', 'Running')
+    assert run.count == 2
+    assert run.calories == pytest.approx(
+        read_package('RUN', [15000, 1, 75]).get_spent_calories()
+        + read_package('RUN', [1206, 12, 6]).get_spent_calories())
+    assert aggregator.totals('ann').count == 3
+    assert aggregator.totals('carl').count == 0
+
+
+def test_rolling_windows():
+    aggregator = build()
+    now = MONDAY + 8 * DAY + 60
+    assert aggregator.daily('ann', now).count == 1
+    assert aggregator.daily('ann', now, 'SportsWalking').count == 0
+    assert aggregator.daily('ann', now - DAY, 'SportsWalking').count == 1
+    assert aggregator.weekly('ann', now).count == 3
+    assert aggregator.weekly('ann', MONDAY + 7 * DAY - 1).count == 2
+    assert aggregator.daily('ann', now + 30 * DAY).count == 0
+
+
+def test_old_sessions_leave_bounded_windows():
+    aggregator = build(days=2)
+    aggregator.add('ann', MONDAY - 30 * DAY,
+                   read_package('RUN', [100, 1, 70]).show_training_info())
+    entry = aggregator.entries[('ann', 'Running')]
+    assert len(entry.daily.buckets) == 2
+    assert aggregator.totals('ann', 'Running').count == 3
+    assert aggregator.daily('ann', MONDAY + 8 * DAY).count == 1
+
+
+def test_merge_equals_single_pass():
+    whole = build()
+    left, right = build(SESSIONS[::2]), build(SESSIONS[1::2])
+    left.merge(right)
+    assert sorted(left.snapshot()['entries']) == sorted(
+        whole.snapshot()['entries'])
+    now = MONDAY + 8 * DAY
+    assert left.weekly('ann', now) == whole.weekly('ann', now)
+    with pytest.raises(ValueError):
+        left.merge(Aggregator(days=3))
+
+
+def test_snapshot_round_trip():
+    aggregator = build()
+    state = json.loads(json.dumps(aggregator.snapshot()))
+    restored = Aggregator.restore(state)
+    assert restored.snapshot() == aggregator.snapshot()
+    now = MONDAY + 8 * DAY
+    assert restored.daily('ann', now) == aggregator.daily('ann', now)
+
+
+def test_add_columns_matches_add():
+    packages = [package for _, _, package in SESSIONS]
+    names, result = batch.compute_packages(packages)
+    aggregator = Aggregator()
+    aggregator.add_columns([user for user, _, _ in SESSIONS],
+                           [timestamp for _, timestamp, _ in SESSIONS],
+                           names, result)
+    assert aggregator.snapshot() == build().snapshot()
@@ -0,0 +1,114 @@
+import io
+
+import numpy as np
+import pytest
+
+from benchmarks.generator import generate_packages
+from tracker import archive, batch
+from tracker.aggregation import DAY
+from workout_tracker import read_package
+
+# Monday 2024-01-01 00:00 UTC.
+MONDAY = 1_704_067_200
+PACKAGES = generate_packages(3000, seed=9)
+STARTS = [MONDAY + 300 * i for i in range(len(PACKAGES))]
+
+
+@pytest.fixture(params=sorted(archive.CODECS))
+def archive_path(tmp_path, request):
+    path = str(tmp_path / 'history.trka')
+    archive.write_archive(path, STARTS, PACKAGES, codec=request.param,
+                          block_rows=256, block_seconds=DAY)
+    return path
+
+
+def expected(workout_types=None, start=None, stop=None):
+    return sorted(
+        (begin, workout_type, data)
+        for begin, (workout_type, data) in zip(STARTS, PACKAGES)
+        if (workout_types is None or workout_type in workout_types)
+        and (start is None or begin >= start)
+        and (stop is None or begin < stop))
+
+
+def test_round_trip(archive_path):
+    with archive.ArchiveReader(archive_path) as reader:
+        assert len(reader) == len(PACKAGES)
+        assert sorted(reader.iter_packages()) == expected()
+        assert all(block.count <= 256 for block in reader.blocks)
+
+
+def test_blocks_group_type_and_day(archive_path):
+    with archive.ArchiveReader(archive_path) as reader:
+        for block in reader.blocks:
+            assert block.first // DAY == block.last // DAY
+        assert {block.workout_type for block in reader.blocks} == {
+            'RUN', 'WLK', 'SWM'}
+
+
+@pytest.mark.parametrize('workout_types, start, stop', [
+    (['SWM'], None, None),
+    (None, MONDAY + 2 * DAY, MONDAY + 3 * DAY),
+    (['RUN', 'WLK'], MONDAY + 2 * DAY + 3600, MONDAY + 4 * DAY + 17),
+    (None, MONDAY + 100 * DAY, None),
+])
+def test_selection_reads_only_needed_blocks(archive_path, workout_types,
+                                            start, stop):
+    with archive.ArchiveReader(archive_path) as reader:
+        selected = reader.select(workout_types, start, stop)
+        assert len(selected) < len(reader.blocks)
+        found = sorted(reader.iter_packages(workout_types, start, stop))
+    assert found == expected(workout_types, start, stop)
+
+
+def test_results_feed_batch(archive_path):
+    start, stop = MONDAY + DAY, MONDAY + 2 * DAY
+    with archive.ArchiveReader(archive_path) as reader:
+        for workout_type, starts, result in reader.iter_results(
+                start=start, stop=stop):
+            assert ((starts >= start) & (starts < stop)).all()
+            packages = [(workout_type, data) for begin, code, data
+                        in expected([workout_type], start, stop)]
+            assert len(packages) == len(starts)
+            _, reference = batch.compute_packages(packages)
+            for column, values in zip(result, reference):
+                np.testing.assert_array_equal(column, values)
+
+
+def test_compression(tmp_path):
+    path = tmp_path / 'history.trka'
+    archive.write_archive(str(path), STARTS, PACKAGES, codec='lzma')
+    raw = sum(8 * (1 + len(data)) for _, data in PACKAGES)
+    assert path.stat().st_size < raw / 2
+
+
+def test_batch_cli(archive_path, tmp_path):
+    output = tmp_path / 'report.txt'
+    batch.main([archive_path, '--archive', '--types', 'RUN', '--start',
+                str(MONDAY), '--stop', str(MONDAY + DAY), '-o', str(output)])
+    lines = output.read_text().splitlines()
+    assert sorted(lines) == sorted(
+        read_package(code, data).show_training_info().get_message()
+        for _, code, data in expected(['RUN'], MONDAY, MONDAY + DAY))
+
+
+@pytest.mark.parametrize('content, message', [
+    (b'not an archive at all', 'not a session archive'),
+    (archive.MAGIC + b'\0' * 4, 'truncated'),
+])
+def test_bad_files(tmp_path, content, message):
+    path = tmp_path / 'bad.trka'
+    path.write_bytes(content)
+    with pytest.raises(ValueError, match=message):
+        archive.ArchiveReader(str(path))
+
+
+def test_writer_errors(tmp_path):
+    with pytest.raises(ValueError, match='codec'):
+        archive.ArchiveWriter(io.BytesIO(), codec='zstd')
+    with archive.ArchiveWriter(open(tmp_path / 'y', 'wb'),
+                               close_target=True) as writer:
+        with pytest.raises(ValueError, match='not supported'):
+            writer.add(MONDAY, 'XYZ', [1, 2, 3])
+        with pytest.raises(ValueError, match='expects 3'):
+            writer.add(MONDAY, 'RUN', [1, 2])
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from conftest import DEMO_PACKAGES, MORE_PACKAGES
+from tracker import batch
+from workout_tracker import TRAINING_TYPES, read_package
+
+PACKAGES = DEMO_PACKAGES + MORE_PACKAGES + [('SWM', [420, 4, 20, 42, 4])]
+
+
+def expected_values(packages):
+    infos = [read_package(*package).show_training_info()
+             for package in packages]
+    return [
+        [getattr(info, field) for info in infos]
+        for field in batch.BatchResult._fields
+    ]
+
+
+@pytest.mark.parametrize('workout_type', ['SWM', 'RUN', 'WLK'])
+def test_compute_batch_matches_scalar(workout_type):
+    packages = [p for p in PACKAGES if p[0] == workout_type]
+    fields = TRAINING_TYPES[workout_type].fields
+    columns = {
+        field: [data[i] for _, data in packages]
+        for i, field in enumerate(fields)
+    }
+    result = batch.compute_batch(workout_type, columns)
+    for column, expected in zip(result, expected_values(packages)):
+        np.testing.assert_array_equal(column, expected)
+
+
+def test_walking_squares_speed_like_the_class():
+    # Here speed_ms ** 2 and speed_ms * speed_ms differ in the last bit.
+    package = ('WLK', [15455, 2.503, 98.8, 170])
+    columns = dict(zip(TRAINING_TYPES['WLK'].fields,
+                       ([value] for value in package[1])))
+    result = batch.compute_batch('WLK', columns)
+    assert result.calories[0] == (
+        read_package(*package).show_training_info().calories)
+
+
+@pytest.mark.parametrize('package', [
+    ('RUN', [15000, 0, 75]),
+    ('RUN', [0, 0, 75]),
+    ('WLK', [9000, 1, 75, 0]),
+    ('SWM', [720, 0, 80, 25, 40]),
+])
+def test_zero_divisor_raises_like_the_class(package):
+    workout_type, data = package
+    with pytest.raises(ZeroDivisionError):
+        read_package(workout_type, data).show_training_info()
+    columns = dict(zip(TRAINING_TYPES[workout_type].fields,
+                       ([1, value] for value in data)))
+    with pytest.raises(ZeroDivisionError, match=workout_type):
+        batch.compute_batch(workout_type, columns)
+
+
+def test_compute_mixed_matches_scalar():
+    columns = {
+        field: [
+            data[TRAINING_TYPES[code].fields.index(field)]
+            if field in TRAINING_TYPES[code].fields else np.nan
+            for code, data in PACKAGES
+        ]
+        for field in TRAINING_TYPES['SWM'].fields + ('height',)
+    }
+    result = batch.compute_mixed([code for code, _ in PACKAGES], columns)
+    for column, expected in zip(result, expected_values(PACKAGES)):
+        np.testing.assert_array_equal(column, expected)
+
+
+def test_compute_packages_keeps_order():
+    names, result = batch.compute_packages(PACKAGES)
+    assert names == [
+        read_package(*package).__class__.__name__ for package in PACKAGES
+    ]
+    for column, expected in zip(result, expected_values(PACKAGES)):
+        np.testing.assert_array_equal(column, expected)
+
+
+def test_compute_batch_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        batch.compute_batch('BOX', {})
+
+
+def test_compute_batch_requires_columns():
+    with pytest.raises(ValueError):
+        batch.compute_batch('RUN', {'action': [1], 'duration': [1]})
@@ -0,0 +1,41 @@
+import json
+
+from benchmarks import run
+from benchmarks.generator import generate_packages
+from workout_tracker import read_package
+
+
+def test_generator_is_seeded():
+    assert generate_packages(50, seed=1) == generate_packages(50, seed=1)
+    assert generate_packages(50, seed=1) != generate_packages(50, seed=2)
+    for package in generate_packages(300):
+        read_package(*package).show_training_info().get_message()
+
+
+def test_compare_flags_slow_cases():
+    baseline = {'a': 1.0, 'b': 1.0}
+    results = {'a': 1.1, 'b': 1.5, 'c': 9.0}
+    assert run.compare(results, baseline, 1.2) == ['b']
+
+
+def test_main_saves_and_compares(tmp_path, capsys):
+    path = tmp_path / 'baseline.json'
+    options = ['--only', 'pipeline', '--sizes', '50', '--repeat', '1']
+    assert run.main(options + ['--save', str(path)]) == 0
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert sorted(saved['results']) == [
+        'pipeline.batch.validated[50]', 'pipeline.batch[50]',
+        'pipeline.scalar[50]']
+    assert run.main(options + ['--compare', str(path),
+                               '--max-slowdown', '1000']) == 0
+    assert 'pipeline.scalar[50]' in capsys.readouterr().out
+
+
+def test_check_references_flags_slow_cases():
+    results = {'read_package+show_training_info.uncached': 1.0,
+               'read_package+show_training_info': 1.3}
+    assert run.check_references(results, 1.2) == [
+        'read_package+show_training_info']
+    assert run.check_references(results, 1.5) == []
+    only_cached = {'read_package+show_training_info': 9.0}
+    assert run.check_references(only_cached) == []
@@ -0,0 +1,71 @@
+from io import StringIO
+
+import pytest
+
+from conftest import DEMO_PACKAGES
+from tracker import streaming
+from tracker.cache import ResultCache
+from workout_tracker import read_package
+
+
+def message(package):
+    return read_package(*package).show_training_info().get_message()
+
+
+def test_hits_and_misses():
+    cache = ResultCache(maxsize=10)
+    for package in DEMO_PACKAGES * 3:
+        assert cache.get_info(*package).get_message() == message(package)
+    assert cache.stats() == {'hits': 6, 'misses': 3, 'size': 3,
+                             'maxsize': 10, 'hit_rate': 6 / 9}
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.get_info(*DEMO_PACKAGES[0])
+    cache.get_info(*DEMO_PACKAGES[1])
+    cache.get_info(*DEMO_PACKAGES[0])
+    cache.get_info(*DEMO_PACKAGES[2])
+    assert len(cache) == 2
+    cache.get_info(*DEMO_PACKAGES[0])
+    assert cache.hits == 2
+    cache.get_info(*DEMO_PACKAGES[1])
+    assert cache.misses == 4
+
+
+def test_results_are_copies():
+    cache = ResultCache()
+    package = DEMO_PACKAGES[1]
+    cache.get_info(*package).calories = 0
+    assert cache.get_info(*package).get_message() == message(package)
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    cache = ResultCache()
+    for package in DEMO_PACKAGES:
+        cache.get_info(*package)
+    cache.save(path)
+    loaded = ResultCache.open(path, maxsize=2)
+    assert len(loaded) == 2
+    assert loaded.get_info(*DEMO_PACKAGES[2]).get_message() == message(
+        DEMO_PACKAGES[2])
+    assert loaded.hits == 1
+    with pytest.raises(ValueError):
+        ResultCache(0)
+
+
+def test_streaming_with_cache(tmp_path):
+    log = 'RUN 15000 1 75\n' * 5 + 'WLK 9000 1 75 180\n'
+    cache = ResultCache()
+    target = StringIO()
+    assert streaming.process(StringIO(log), target, cache=cache) == 6
+    assert cache.hits == 4
+    assert target.getvalue().splitlines()[-1] == message(DEMO_PACKAGES[2])
+
+    source = tmp_path / 'log.txt'
+    source.write_text(log, encoding='utf-8')
+    cache_file = tmp_path / 'cache.json'
+    streaming.main([str(source), '-o', str(tmp_path / 'out.txt'),
+                    '--cache-file', str(cache_file)])
+    assert len(ResultCache.open(str(cache_file))) == 2
@@ -0,0 +1,91 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BASE_DIR, DEMO_PACKAGES
+from tracker import cli, wire
+from workout_tracker import read_package
+
+# Seconds the demo script may spend importing beyond a bare interpreter;
+# it only needs ``operator``, which takes a fraction of a millisecond.
+DEMO_IMPORT_BUDGET = 0.005
+LIGHT_MODULES = ('typing', 'json', 're')
+HEAVY_MODULES = ('numpy', 'asyncio', 'multiprocessing', 'concurrent.futures',
+                 'tracker.batch', 'tracker.server', 'tracker.parallel')
+
+
+def imported_modules(*args):
+    """Return the cumulative import time in seconds of every module
+    imported by ``python *args``, as reported by ``-X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args], cwd=BASE_DIR,
+        check=True, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+
+def test_demo_imports_nothing_from_tracker():
+    bare = imported_modules('-c', 'pass')
+    modules = imported_modules('workout_tracker.py')
+    # Nested modules count twice, which only makes the budget stricter.
+    extra = {name: modules[name] for name in set(modules) - set(bare)}
+    assert not [name for name in extra
+                if name == 'tracker' or name.startswith('tracker.')]
+    assert not set(LIGHT_MODULES + HEAVY_MODULES) & set(extra)
+    assert sum(extra.values()) < DEMO_IMPORT_BUDGET
+
+
+def test_cli_imports_stay_light():
+    modules = imported_modules('-c', 'import workout_tracker, tracker.cli')
+    assert not set(HEAVY_MODULES) & set(modules)
+
+
+def test_script_without_arguments_prints_demo():
+    result = subprocess.run(
+        [sys.executable, 'workout_tracker.py'], cwd=BASE_DIR, check=True,
+        capture_output=True, text=True)
+    assert result.stdout.splitlines()[0].startswith(
+        'Type of workout: Swimming;')
+
+
+def expected():
+    return [read_package(*package).show_training_info().get_message()
+            for package in DEMO_PACKAGES]
+
+
+def test_score_command(tmp_path):
+    source = tmp_path / 'log.txt'
+    source.write_text(''.join(
+        f'{code} {" ".join(map(str, data))}\n'
+        for code, data in DEMO_PACKAGES), encoding='utf-8')
+    output = tmp_path / 'out.txt'
+    assert cli.main(['score', str(source), '-o', str(output)]) == 0
+    assert output.read_text(encoding='utf-8').splitlines() == expected()
+
+
+def test_batch_command_binary(tmp_path):
+    source = tmp_path / 'archive.bin'
+    source.write_bytes(wire.encode_many(DEMO_PACKAGES * 3))
+    output = tmp_path / 'out.txt'
+    assert cli.main(['batch', str(source), '--binary', '--chunk-rows', '2',
+                     '-o', str(output)]) == 0
+    assert output.read_text(encoding='utf-8').splitlines() == expected() * 3
+
+
+@pytest.mark.parametrize('command', list(cli.COMMANDS))
+def test_usage_names_the_subcommand(command, capsys):
+    program = sys.argv[0]
+    with pytest.raises(SystemExit):
+        cli.main([command, '--help'])
+    assert capsys.readouterr().out.startswith(f'usage: tracker {command} ')
+    assert sys.argv[0] == program
+
+
+def test_unknown_command():
+    with pytest.raises(SystemExit):
+        cli.main(['dance'])
@@ -0,0 +1,72 @@
+import pytest
+
+from conftest import DEMO_PACKAGES, MORE_PACKAGES
+from tracker import compact
+import workout_tracker
+
+PACKAGES = DEMO_PACKAGES + MORE_PACKAGES[1:]
+
+
+def message(training):
+    return training.show_training_info().get_message()
+
+
+@pytest.mark.parametrize('package', PACKAGES)
+def test_slotted_classes_match(package):
+    slotted = compact.read_package(*package)
+    original = workout_tracker.read_package(*package)
+    assert not hasattr(slotted, '__dict__')
+    assert type(slotted).__name__ == type(original).__name__
+    assert message(slotted) == message(original)
+
+
+def test_info_message_has_no_dict():
+    info = workout_tracker.InfoMessage('Running', 1, 2, 3, 4)
+    assert not hasattr(info, '__dict__')
+
+
+def test_slotted_constants_and_signature():
+    assert compact.Swimming.LEN_STEP == 1.38
+    assert compact.Training.LEN_STEP == 0.65
+    assert (list(compact.inspect.signature(compact.SportsWalking).parameters)
+            == ['action', 'duration', 'weight', 'height'])
+
+
+def test_training_table_views():
+    rows = [data for code, data in PACKAGES if code == 'WLK']
+    table = compact.TrainingTable('WLK', rows)
+    assert len(table) == 2
+    assert list(table.column('height')) == [180, 180.1]
+    assert [message(view) for view in table] == [
+        message(workout_tracker.SportsWalking(*data)) for data in rows
+    ]
+    view = table[-1]
+    view.weight = 80
+    assert table.column('weight')[1] == 80
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_training_table_checks_arity():
+    table = compact.TrainingTable('RUN')
+    with pytest.raises(ValueError):
+        table.append([1, 2])
+
+
+def test_slotted_metrics_are_cached():
+    training = compact.Running(15000, 1, 75)
+    info = training.show_training_info()
+    assert training._metrics[-1] == info.calories
+    training.duration = 2
+    assert training.show_training_info().calories == (
+        workout_tracker.Running(15000, 2, 75).get_spent_calories())
+
+
+def test_views_see_column_changes():
+    table = compact.TrainingTable('RUN', [[15000, 1, 75]])
+    view = table[0]
+    view.show_training_info()
+    table.column('duration')[0] = 2
+    assert view.show_training_info().get_message() == (
+        workout_tracker.Running(15000, 2, 75).show_training_info()
+        .get_message())
@@ -0,0 +1,83 @@
+import pytest
+
+from benchmarks import differential
+from benchmarks.generator import generate_packages
+from workout_tracker import read_package
+
+PACKAGES = (generate_packages(1500, seed=21)
+            + differential.generate_edge_packages(1500, seed=21))
+
+
+def test_edge_packages_are_valid():
+    packages = differential.generate_edge_packages(500, seed=4)
+    assert packages == differential.generate_edge_packages(500, seed=4)
+    for package in packages:
+        read_package(*package).show_training_info().get_message()
+
+
+def test_all_engines_agree_with_reference():
+    reports = differential.run(PACKAGES)
+    names = [report.name for report in reports]
+    assert names == [engine.name for engine in differential.ENGINES] + [
+        'messages']
+    for report in reports:
+        assert report.skipped is None
+        assert report.compared == len(PACKAGES)
+        assert report.ok, differential.format_report([report])
+
+
+def drifting(packages):
+    rows = differential._scalar(packages)
+    return [(name, duration, distance, speed,
+             calories * (1 + 1e-9 * (position % 3)))
+            for position, (name, duration, distance, speed, calories)
+            in enumerate(rows)]
+
+
+def test_drift_is_reported_worst_first():
+    packages = PACKAGES[:30]
+    engines = [differential.Engine('drifting', drifting),
+               differential.Engine('tolerant', drifting, 1e-6)]
+    strict, tolerant, _ = differential.run(packages, engines, worst=3)
+    assert not strict.ok
+    assert strict.failures == 20
+    assert strict.max_error == pytest.approx(2e-9, rel=1e-3)
+    assert len(strict.worst) == 3
+    errors = [mismatch.error for mismatch in strict.worst]
+    assert errors == sorted(errors, reverse=True)
+    assert all(mismatch.field == 'calories' for mismatch in strict.worst)
+    assert strict.worst[0].package == packages[strict.worst[0].position]
+    assert tolerant.ok
+    report = differential.format_report([strict, tolerant])
+    assert 'drifting #' in report
+    assert 'tolerant #' not in report
+
+
+def test_wrong_type_and_missing_rows():
+    packages = PACKAGES[:3]
+    expected = differential._scalar(packages)
+    renamed = [('Other',) + row[1:] for row in expected]
+    report = differential.compare_rows('x', 0.0, packages, expected, renamed)
+    assert report.failures == 3
+    assert report.worst[0].field == 'training_type'
+    short = differential.compare_rows('x', 0.0, packages, expected,
+                                      expected[:2])
+    assert not short.ok
+
+
+@pytest.mark.parametrize('value, other, error', [
+    (1.0, 1.0, 0.0),
+    (2.0, 2.0000000002, 1e-10),
+    (-1.0, 1.0, 2.0),
+    (float('nan'), 1.0, float('inf')),
+])
+def test_relative_error(value, other, error):
+    assert differential.relative_error(value, other) == pytest.approx(error)
+
+
+def test_main(capsys):
+    assert differential.main(['--count', '200', '--only', 'batch',
+                              'compact']) == 0
+    output = capsys.readouterr().out
+    assert 'batch' in output and 'compact' in output
+    assert 'parallel' not in output
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from conftest import DEMO_PACKAGES, MORE_PACKAGES
+from tracker import batch, export
+
+PACKAGES = DEMO_PACKAGES + MORE_PACKAGES
+
+
+def write(directory, **options):
+    with export.ColumnWriter(str(directory), **options) as writer:
+        writer.write_packages(PACKAGES)
+    return writer
+
+
+def test_round_trip(tmp_path):
+    writer = write(tmp_path, chunk_rows=2)
+    assert writer.chunks == [2, 2, 1]
+    data = export.read_columns(str(tmp_path))
+    names = export.training_type_names(str(tmp_path), data['training_type'])
+    expected_names, expected = batch.compute_packages(PACKAGES)
+    assert names == expected_names
+    for row, (workout_type, values) in enumerate(PACKAGES):
+        fields = dict(zip(batch.TRAINING_TYPES[workout_type].fields, values))
+        for field in export.input_columns():
+            if field in fields:
+                assert data[field][row] == fields[field]
+            else:
+                assert np.isnan(data[field][row])
+    for name in export.RESULT_COLUMNS:
+        np.testing.assert_array_equal(data[name], getattr(expected, name))
+
+
+def test_batches_and_packages_keep_order(tmp_path):
+    runs = [package for package in PACKAGES if package[0] == 'RUN']
+    with export.ColumnWriter(str(tmp_path), chunk_rows=3) as writer:
+        writer.write_batch('RUN', {
+            'action': [data[0] for _, data in runs],
+            'duration': [data[1] for _, data in runs],
+            'weight': [data[2] for _, data in runs],
+        })
+        writer.write_packages(PACKAGES)
+    data = export.read_columns(str(tmp_path), ['calories'])
+    _, expected = batch.compute_packages(runs + PACKAGES)
+    np.testing.assert_array_equal(data['calories'], expected.calories)
+
+
+def test_selected_columns_with_mmap(tmp_path):
+    write(tmp_path)
+    chunks = list(export.iter_chunks(str(tmp_path), ['speed'], mmap=True))
+    assert len(chunks) == 1
+    assert list(chunks[0]) == ['speed']
+    assert isinstance(chunks[0]['speed'], np.memmap)
+    manifest = export.read_manifest(str(tmp_path))
+    assert manifest['format'] == 'npy'
+    assert manifest['columns']['training_type'] == 'uint8'
+
+
+def test_empty_dataset(tmp_path):
+    with export.ColumnWriter(str(tmp_path)):
+        pass
+    assert export.read_columns(str(tmp_path))['calories'].size == 0
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export.ColumnWriter(str(tmp_path), fmt='csv')
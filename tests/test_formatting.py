@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from tracker import batch, formatting
+from workout_tracker import InfoMessage, read_package
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1.5, 75, 180]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+    ('RUN', [1206, 12, 6]),
+]
+
+
+def reference():
+    return [read_package(*package).show_training_info().get_message()
+            for package in PACKAGES]
+
+
+def test_format_messages_from_batch():
+    names, result = batch.compute_packages(PACKAGES)
+    assert formatting.format_messages(names, result) == reference()
+
+
+def test_render_messages_bytes():
+    names, result = batch.compute_packages(PACKAGES)
+    rendered = formatting.render_messages(names, result)
+    assert rendered.decode('utf-8').splitlines() == reference()
+    assert rendered.endswith(b'\n')
+
+
+@pytest.mark.parametrize('values', [
+    ('Running', 1, 2, 3, 4),
+    ('Swimming', 0.0005, 1e9, 2.0004999, -1.5),
+    ('SportsWalking', 12.3456789, 0.1, np.float64(0.2), 7),
+])
+def test_template_matches_get_message(values):
+    name, *numbers = values
+    lines = formatting.format_messages([name], [[n] for n in numbers])
+    assert lines == [InfoMessage(*values).get_message()]
+
+
+def test_render_empty():
+    assert formatting.render_messages([], [[], [], [], []]) == b''
@@ -0,0 +1,55 @@
+import json
+import pstats
+from io import StringIO
+
+import workout_tracker
+from tracker import instrument, streaming
+
+LOG = 'RUN 15000 1 75\nWLK 9000 1 75 180\nSWM 720 1 80 25 40\n'
+
+
+def test_disabled_functions_are_untouched():
+    original = workout_tracker.read_package
+    with instrument.instrumented():
+        assert workout_tracker.read_package is not original
+        assert streaming.read_package is workout_tracker.read_package
+    assert workout_tracker.read_package is original
+    assert streaming.read_package is original
+    assert not hasattr(workout_tracker.Training.show_training_info,
+                       '__instrumented__')
+
+
+def test_stage_counters():
+    with instrument.instrumented() as stats:
+        streaming.process(StringIO(LOG), StringIO())
+        for package in [('RUN', [15000, 1, 75])]:
+            workout_tracker.main(workout_tracker.read_package(*package),
+                                 sink=streaming.SINKS['text'](StringIO()))
+    counts = {name: stage.count for name, stage in stats.stages.items()}
+    assert counts == {'read_package': 4, 'show_training_info': 4,
+                      'get_message': 4, 'main': 1, 'parse_line': 3}
+    data = json.loads(stats.dump_json())
+    assert data['stages']['read_package']['per_second'] > 0
+    assert 'show_training_info' in stats.dump_text()
+
+
+def test_histogram_quantiles():
+    stage = instrument.StageStats()
+    for elapsed in [100] * 98 + [10_000, 1_000_000]:
+        stage.record(elapsed)
+    assert stage.quantile(0.5) == 128
+    assert stage.quantile(1.0) == 1_000_000
+    assert stage.min_ns == 100
+
+
+def test_cli_stats_and_profile(tmp_path):
+    source = tmp_path / 'log.txt'
+    source.write_text(LOG, encoding='utf-8')
+    stats_path = tmp_path / 'stats.json'
+    profile_path = tmp_path / 'run.prof'
+    streaming.main([str(source), '-o', str(tmp_path / 'out.txt'),
+                    '--stats', str(stats_path), '--stats-format', 'json',
+                    '--profile', str(profile_path)])
+    stats = json.loads(stats_path.read_text(encoding='utf-8'))
+    assert stats['stages']['get_message']['count'] == 3
+    assert pstats.Stats(str(profile_path)).total_calls > 0
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from tracker import batch, live
+from workout_tracker import TRAINING_TYPES, Running, read_package, register
+
+FIELDS = ('duration', 'distance', 'speed', 'calories')
+
+
+def feed(session, ticks, seed=0):
+    """Tick a session once per second with random deltas."""
+    rng = random.Random(seed)
+    for _ in range(ticks):
+        if session.code == 'SWM':
+            session.tick(rng.randint(0, 2), 1, rng.random() < 0.03)
+        else:
+            session.tick(rng.randint(0, 4))
+    return session
+
+
+@pytest.mark.parametrize('workout_type, profile', [
+    ('RUN', (75,)),
+    ('WLK', (75, 180)),
+    ('SWM', (80, 25)),
+])
+@pytest.mark.parametrize('ticks', [1, 59, 3600, 5000])
+def test_final_info_matches_batch(workout_type, profile, ticks):
+    session = feed(live.start_session(workout_type, *profile), ticks)
+    code, data = session.package()
+    assert code == workout_type
+    info = session.info()
+    reference = read_package(code, data).show_training_info()
+    assert info.get_message() == reference.get_message()
+    result = batch.compute_batch(code, dict(zip(
+        batch.TRAINING_TYPES[code].fields, ([value] for value in data))))
+    for field in FIELDS:
+        assert getattr(info, field) == getattr(reference, field)
+        assert getattr(info, field) == getattr(result, field)[0]
+
+
+def test_values_grow_per_tick():
+    session = live.start_session('RUN', 75)
+    assert session.info().speed == 0.0
+    assert session.info().calories == 0.0
+    session.tick(3)
+    first = session.info()
+    session.tick(3)
+    second = session.info()
+    assert second.distance == pytest.approx(2 * first.distance)
+    assert second.speed == pytest.approx(first.speed)
+    assert second.calories > first.calories
+
+
+def test_laps_drive_swimming_speed():
+    session = live.start_session('SWM', 80, 25)
+    session.tick(30, 60, 2)
+    assert session.package() == ('SWM', [30, 60 / 3600, 80, 25, 2])
+    assert session.info().speed == pytest.approx(50 / 1000 / (1 / 60))
+
+
+def test_tracker():
+    tracker = live.LiveTracker()
+    tracker.start('a', 'RUN', 75)
+    tracker.start('b', 'WLK', 75, 180)
+    for _ in range(10):
+        tracker.tick('a', 4)
+        tracker.tick('b', 2, 1.0)
+    assert tracker.info('a').distance == pytest.approx(
+        40 * read_package('RUN', [1, 1, 1]).LEN_STEP / 1000)
+    with pytest.raises(ValueError, match='already live'):
+        tracker.start('a', 'RUN', 75)
+    final = tracker.finish('b')
+    assert final.training_type == 'SportsWalking'
+    assert len(tracker) == 1
+    with pytest.raises(ValueError, match='not supported'):
+        tracker.start('c', 'XYZ', 75)
+
+
+def test_profile_must_match_type():
+    with pytest.raises(ValueError, match=r'starts with 2 values'):
+        live.start_session('WLK', 75)
+
+
+def test_registered_types_are_live(cycling):
+    session = live.start_session('CYC', 70)
+    session.tick(2000, 600)
+    code, data = session.package()
+    assert session.info().get_message() == (
+        read_package(code, data).show_training_info().get_message())
+
+
+@pytest.mark.parametrize('workout_type, profile', [
+    ('RUN', (75,)), ('WLK', (75, 180)), ('SWM', (80, 25))])
+def test_sessions_are_slotted(workout_type, profile):
+    assert not hasattr(live.start_session(workout_type, *profile),
+                       '__dict__')
+
+
+def test_types_without_action_and_duration_are_rejected():
+    class Rowing(Running):
+        def __init__(self, strokes, duration, weight):
+            super().__init__(strokes, duration, weight)
+
+    register('ROW', tag='O')(Rowing)
+    try:
+        with pytest.raises(ValueError, match="'ROW' .* no 'action'"):
+            live.start_session('ROW', 70)
+    finally:
+        del TRAINING_TYPES['ROW']
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from conftest import DEMO_PACKAGES, MORE_PACKAGES
+from tracker import batch, wire
+from tracker.mapped import MappedArchive
+
+PACKAGES = DEMO_PACKAGES + MORE_PACKAGES
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = tmp_path / 'sessions.bin'
+    path.write_bytes(wire.encode_many(PACKAGES))
+    return path
+
+
+def test_iteration_and_random_access(archive_path):
+    with MappedArchive(str(archive_path)) as archive:
+        assert list(archive) == PACKAGES
+        assert len(archive) == len(PACKAGES)
+        assert archive[2] == PACKAGES[2]
+        assert archive[-1] == PACKAGES[-1]
+
+
+def test_column_slices(archive_path):
+    _, expected = batch.compute_packages(PACKAGES[1:4])
+    with MappedArchive(str(archive_path)) as archive:
+        columns = archive.columns(1, 4)
+        assert sorted(columns) == ['RUN', 'WLK']
+        for workout_type, (positions, group) in columns.items():
+            result = batch.compute_batch(workout_type, group)
+            for column, reference in zip(result, expected):
+                np.testing.assert_array_equal(column, reference[positions])
+        del columns, group
+
+
+def test_empty_archive(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    with MappedArchive(str(path)) as archive:
+        assert len(archive) == 0
+        assert list(archive) == []
+        assert archive.columns() == {}
+
+
+@pytest.mark.parametrize('start, stop', [(0, 5), (1, 4), (3, 3), (4, 9)])
+def test_spans(archive_path, start, stop):
+    with MappedArchive(str(archive_path)) as archive:
+        begin, end = archive.span(start, stop)
+        assert list(archive.iter_span(begin, end)) == PACKAGES[start:stop]
+
+
+def test_offsets_of_one_type_are_computed(tmp_path):
+    path = tmp_path / 'runs.bin'
+    runs = [package for package in PACKAGES if package[0] == 'RUN']
+    path.write_bytes(wire.encode_many(runs))
+    with MappedArchive(str(path)) as archive:
+        assert archive.offsets == range(0, 2 * 25, 25)
+        assert archive[-1] == runs[-1]
+        assert archive.span(1, 2) == (25, 50)
+
+
+def test_offsets_of_mixed_types_are_scanned(archive_path):
+    with MappedArchive(str(archive_path)) as archive:
+        assert list(archive.offsets) == [0, 41, 66, 99, 124]
+        assert archive.offsets.typecode == 'q'
+
+
+def test_truncated_archive(tmp_path):
+    path = tmp_path / 'truncated.bin'
+    path.write_bytes(wire.encode_many(PACKAGES)[:-1])
+    with MappedArchive(str(path)) as archive:
+        with pytest.raises(ValueError, match='truncated'):
+            for _ in archive:
+                pass
+        with pytest.raises(ValueError, match='middle of a record'):
+            len(archive)
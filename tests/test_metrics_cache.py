@@ -0,0 +1,74 @@
+import pytest
+
+from conftest import DEMO_PACKAGES
+import workout_tracker
+
+
+@pytest.mark.parametrize('package', DEMO_PACKAGES)
+def test_metrics_are_computed_once(package, monkeypatch):
+    training = workout_tracker.read_package(*package)
+    first = training.show_training_info().get_message()
+    calls = []
+    cls = type(training)
+    original = cls.get_spent_calories
+
+    def counting(self):
+        calls.append(self)
+        return original(self)
+    monkeypatch.setattr(cls, 'get_spent_calories', counting)
+    training._metrics = None
+    for _ in range(3):
+        assert training.show_training_info().get_message() == first
+    assert len(calls) == 1
+
+
+def test_assignment_is_not_intercepted():
+    assert '__setattr__' not in vars(workout_tracker.Training)
+
+
+@pytest.mark.parametrize('package, field, value', [
+    (DEMO_PACKAGES[0], 'length_pool', 50),
+    (DEMO_PACKAGES[0], 'count_pool', 20),
+    (DEMO_PACKAGES[1], 'action', 10000),
+    (DEMO_PACKAGES[1], 'duration', 2),
+    (DEMO_PACKAGES[1], 'weight', 90),
+    (DEMO_PACKAGES[2], 'height', 170),
+])
+def test_mutation_invalidates_metrics(package, field, value):
+    workout_type, data = package
+    training = workout_tracker.read_package(workout_type, data)
+    training.show_training_info()
+    setattr(training, field, value)
+    fresh = workout_tracker.read_package(workout_type, data)
+    setattr(fresh, field, value)
+    assert (training.show_training_info().get_message()
+            == fresh.show_training_info().get_message())
+
+
+class Variadic(workout_tracker.Running):
+    """Passes its arguments on without naming them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+
+class Renamed(workout_tracker.SportsWalking):
+    """Stores the height under another name than the argument."""
+
+    def __init__(self, action, duration, weight, height_cm):
+        super().__init__(action, duration, weight, height_cm)
+
+
+@pytest.mark.parametrize('training_class, data', [
+    (Variadic, [15000, 1, 75]),
+    (Renamed, [9000, 1, 75, 180]),
+])
+def test_subclasses_without_readable_arguments(training_class, data):
+    training = training_class(*data)
+    base = training_class.__mro__[1](*data)
+    assert (training.show_training_info().calories
+            == base.show_training_info().calories)
+    training.action *= 2
+    base.action *= 2
+    assert (training.show_training_info().calories
+            == base.show_training_info().calories)
@@ -0,0 +1,34 @@
+from conftest import DEMO_PACKAGES
+from tracker import parallel
+from workout_tracker import read_package
+
+PACKAGES = DEMO_PACKAGES * 7
+
+
+def expected_messages(packages):
+    return [read_package(*package).show_training_info().get_message()
+            for package in packages]
+
+
+def test_score_parallel_ordered():
+    messages, stats = parallel.score_parallel(
+        PACKAGES, workers=2, chunk_size=4, serial_threshold=0)
+    assert [info.get_message() for info in messages] == (
+        expected_messages(PACKAGES))
+    assert stats.records == len(PACKAGES)
+    assert stats.workers == 2
+
+
+def test_score_parallel_unordered():
+    messages, _ = parallel.score_parallel(
+        PACKAGES, workers=2, chunk_size=4, ordered=False,
+        serial_threshold=0)
+    assert sorted(info.get_message() for info in messages) == sorted(
+        expected_messages(PACKAGES))
+
+
+def test_small_input_runs_serial():
+    messages, stats = parallel.score_parallel(PACKAGES, workers=4)
+    assert stats.workers == 1
+    assert len(messages) == len(PACKAGES)
+    assert stats.per_second > 0
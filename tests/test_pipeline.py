@@ -0,0 +1,82 @@
+import json
+import threading
+from collections import Counter
+from io import StringIO
+
+import pytest
+
+from benchmarks.generator import generate_packages
+from tracker import pipeline
+from tracker.sinks import JsonLinesSink, TextSink
+from workout_tracker import read_package
+
+
+def write_logs(directory, count, size):
+    paths, packages = [], []
+    for number in range(count):
+        chunk = generate_packages(size, seed=number)
+        path = directory / f'log-{number}.txt'
+        path.write_text(''.join(json.dumps(package) + '\n'
+                                for package in chunk))
+        paths.append(str(path))
+        packages.extend(chunk)
+    return paths, packages
+
+
+@pytest.mark.parametrize('mode', pipeline.MODES)
+def test_all_logs_are_calculated(tmp_path, mode):
+    paths, packages = write_logs(tmp_path, 5, 300)
+    target = StringIO()
+    stats = pipeline.Pipeline(readers=3, mode=mode, chunk_rows=64,
+                              queue_size=2).run(paths, TextSink(target))
+    expected = Counter(read_package(*package).show_training_info()
+                       .get_message() for package in packages)
+    assert Counter(target.getvalue().splitlines()) == expected
+    assert stats.records == 1500
+    assert stats.chunks == 5 * 5
+    chunks = stats.queues['chunks']
+    assert chunks.puts == stats.chunks + 1
+    assert chunks.max_depth <= 2
+    assert stats.to_dict()['queues']['results']['gets'] == stats.chunks + 1
+
+
+def test_file_order_is_kept(tmp_path):
+    paths, packages = write_logs(tmp_path, 1, 500)
+    target = StringIO()
+    pipeline.Pipeline(chunk_rows=50).run(paths, JsonLinesSink(target))
+    calories = [json.loads(line)['calories']
+                for line in target.getvalue().splitlines()]
+    assert calories == pytest.approx([
+        read_package(*package).get_spent_calories() for package in packages])
+
+
+@pytest.mark.parametrize('broken', ['reader', 'compute'])
+def test_error_stops_all_stages(tmp_path, broken):
+    paths, _ = write_logs(tmp_path, 4, 2000)
+    if broken == 'reader':
+        with open(paths[1], 'a') as file:
+            file.write('RUN not-a-number 1 75\n')
+        expected = 'not a valid package'
+    else:
+        with open(paths[1], 'a') as file:
+            file.write('XYZ 1 2 3\n')
+        expected = 'not supported'
+    before = threading.active_count()
+    with pytest.raises(ValueError, match=expected):
+        pipeline.Pipeline(readers=2, chunk_rows=100, queue_size=1).run(
+            paths, TextSink(StringIO()))
+    assert threading.active_count() == before
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError, match='compute mode'):
+        pipeline.Pipeline(mode='gpu')
+
+
+def test_main(tmp_path, capsys):
+    paths, packages = write_logs(tmp_path, 2, 10)
+    output = tmp_path / 'report.csv'
+    pipeline.main([*paths, '-o', str(output), '-f', 'csv', '--stats',
+                   '--mode', 'serial'])
+    assert len(output.read_text().splitlines()) == 1 + len(packages)
+    assert json.loads(capsys.readouterr().err)['records'] == len(packages)
@@ -0,0 +1,95 @@
+import pytest
+
+from benchmarks import profiles
+from benchmarks.generator import generate_packages
+from tracker.profile import ProfileScorer, UserProfile
+from workout_tracker import TRAINING_TYPES, Running, read_package, register
+
+FIELDS = ('duration', 'distance', 'speed', 'calories')
+
+
+def assert_same_info(info, package):
+    reference = read_package(*package).show_training_info()
+    assert info.training_type == reference.training_type
+    for field in FIELDS:
+        assert getattr(info, field) == pytest.approx(
+            getattr(reference, field), rel=1e-12)
+
+
+def test_profile_matches_classes():
+    for package in generate_packages(300, seed=11):
+        workout_type, data = package
+        profile = UserProfile(data[2], 175)
+        assert_same_info(profile.score(workout_type, data), package)
+
+
+def test_registered_types_use_their_class(cycling):
+    profile = UserProfile(75, 180)
+    assert_same_info(profile.score('CYC', [100, 1, 70]),
+                     ('CYC', [100, 1, 70]))
+    assert_same_info(ProfileScorer().score('ann', 'CYC', [100, 1, 70]),
+                     ('CYC', [100, 1, 70]))
+
+
+def test_subclasses_use_their_class():
+    class Sprint(Running):
+        CALORIES_MEAN_SPEED_SHIFT = 3.0
+
+    register('SPR', tag='P')(Sprint)
+    try:
+        info = UserProfile(75).score('SPR', [15000, 1, 75])
+    finally:
+        del TRAINING_TYPES['SPR']
+    assert info.training_type == 'Sprint'
+    assert info.calories == Sprint(15000, 1, 75).get_spent_calories()
+
+
+def test_coefficients_are_reused_until_the_profile_changes():
+    profile = UserProfile(75, 180)
+    coefficients = profile.coefficients
+    profile.running(15000, 1)
+    assert profile.coefficients is coefficients
+    profile.weight = 80
+    assert profile.coefficients is not coefficients
+    assert profile.coefficients.run_duration == pytest.approx(
+        coefficients.run_duration * 80 / 75)
+    assert_same_info(profile.running(15000, 1), ('RUN', [15000, 1, 80]))
+
+
+def test_package_updates_profile():
+    profile = UserProfile(75, 180)
+    before = profile.coefficients
+    profile.score('WLK', [9000, 1, 75, 180])
+    assert profile.coefficients is before
+    info = profile.score('WLK', [9000, 1, 70, 170])
+    assert (profile.weight, profile.height) == (70, 170)
+    assert_same_info(info, ('WLK', [9000, 1, 70, 170]))
+
+
+def test_walking_needs_height():
+    with pytest.raises(ValueError, match='height'):
+        UserProfile(75).sports_walking(9000, 1)
+
+
+def test_unknown_type():
+    with pytest.raises(ValueError, match='not supported'):
+        UserProfile(75).score('XYZ', [1, 1, 75])
+
+
+def test_package_size_is_checked():
+    with pytest.raises(ValueError, match='expects 3 values'):
+        UserProfile(75).score('RUN', [15000, 1, 75, 180])
+
+
+def test_scorer_keeps_a_profile_per_user():
+    feed = profiles.generate_feed(500, users=7)
+    scorer = ProfileScorer()
+    for user, workout_type, data in feed:
+        assert_same_info(scorer.score(user, workout_type, data),
+                         (workout_type, data))
+    assert len(scorer.profiles) == 7
+
+
+def test_benchmark_runs():
+    names = [name for name, _ in profiles.run(count=50, users=3)]
+    assert names == ['read_package+show_training_info', 'ProfileScorer.score']
@@ -0,0 +1,104 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+
+import workout_tracker
+from tracker import batch, streaming, wire
+
+
+def test_builtin_types():
+    types = workout_tracker.TRAINING_TYPES
+    assert sorted(types) == ['RUN', 'SWM', 'WLK']
+    assert types['SWM'].fields == (
+        'action', 'duration', 'weight', 'length_pool', 'count_pool')
+    assert types['WLK'].arity == 4
+
+
+@pytest.mark.parametrize('package', [
+    ('RUN', [15000, 1]),
+    ('WLK', [9000, 1, 75, 180, 1]),
+])
+def test_read_package_checks_arity(package):
+    with pytest.raises(ValueError, match='expects'):
+        workout_tracker.read_package(*package)
+
+
+@pytest.mark.parametrize('workout_type', ['XYZ', ['RUN'], None])
+def test_unknown_code_is_rejected(workout_type):
+    with pytest.raises(workout_tracker.UnsupportedWorkoutType) as error:
+        workout_tracker.read_package(workout_type, [15000, 1, 75])
+    assert isinstance(error.value, ValueError)
+    assert str(error.value) == (
+        f"The '{workout_type}' workout type is not supported.")
+
+
+def test_duplicate_code_is_rejected(cycling):
+    with pytest.raises(ValueError):
+        workout_tracker.register('RUN')(cycling)
+
+
+def test_record_tag_clash_is_rejected_on_registration(cycling):
+    with pytest.raises(ValueError, match="'S' is used by 'SWM'"):
+        workout_tracker.register('SKI')(cycling)
+    assert 'SKI' not in workout_tracker.TRAINING_TYPES
+    package = ('RUN', [15000.0, 1.0, 75.0])
+    assert wire.decode(wire.encode(*package)) == (package, 25)
+
+
+def test_explicit_record_tag(cycling):
+    workout_tracker.register('SKI', tag='K')(cycling)
+    try:
+        record = wire.encode('SKI', [100, 1, 70])
+        assert record[:1] == b'K'
+        assert list(wire.iter_decode(record)) == [
+            ('SKI', [100.0, 1.0, 70.0])]
+    finally:
+        del workout_tracker.TRAINING_TYPES['SKI']
+
+
+@pytest.mark.parametrize('tag', ['', 'KK', '€'])
+def test_record_tag_must_be_one_byte(cycling, tag):
+    with pytest.raises(ValueError, match='one byte'):
+        workout_tracker.register('SKI', tag=tag)(cycling)
+
+
+def test_constructor_arguments_must_be_named():
+    class Variadic(workout_tracker.Running):
+        def __init__(self, *args):
+            super().__init__(*args)
+
+    with pytest.raises(ValueError, match='positional arguments only'):
+        workout_tracker.register('VAR')(Variadic)
+    assert 'VAR' not in workout_tracker.TRAINING_TYPES
+
+
+def test_registered_type_in_all_paths(cycling):
+    training = workout_tracker.read_package('CYC', [100, 1, 70])
+    assert isinstance(training, cycling)
+    message = training.show_training_info().get_message()
+
+    names, result = batch.compute_packages(
+        [('CYC', [100, 1, 70]), ('RUN', [15000, 1, 75])])
+    assert names == ['Cycling', 'Running']
+    assert result.calories[0] == training.get_spent_calories()
+
+    output = StringIO()
+    streaming.process(StringIO('CYC 100 1 70\n'), output)
+    assert output.getvalue() == message + '\n'
+
+    assert list(wire.iter_decode(wire.encode('CYC', [100, 1, 70]))) == [
+        ('CYC', [100.0, 1.0, 70.0])]
+
+
+def test_registered_kernel_is_used(cycling):
+    calls = []
+
+    def kernel(action, duration, weight):
+        calls.append(len(action))
+        zeros = np.zeros(len(action))
+        return batch.BatchResult(duration, zeros, zeros, zeros)
+    workout_tracker.TRAINING_TYPES['CYC'].kernel = kernel
+    batch.compute_batch('CYC', {'action': [1, 2], 'duration': [1, 1],
+                                'weight': [70, 70]})
+    assert calls == [2]
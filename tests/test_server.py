@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from tracker.server import IngestServer, info_from_json
+from workout_tracker import read_package
+
+LINES = [
+    '["SWM", [720, 1, 80, 25, 40]]',
+    'RUN 15000 1 75',
+    'BOX 1 2 3',
+    'WLK 9000 1 75 180',
+    'RUN 1 0 75',
+]
+
+
+async def exchange(lines, **options):
+    server = IngestServer(**options)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        await writer.drain()
+        writer.write_eof()
+        responses = [line.decode() async for line in reader]
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        await server.close()
+    return server, responses
+
+
+def test_responses_keep_request_order():
+    server, responses = asyncio.run(exchange(LINES, batch_size=2))
+    assert len(responses) == len(LINES)
+    assert info_from_json(responses[0]).get_message() == (
+        read_package('SWM', [720, 1, 80, 25, 40])
+        .show_training_info().get_message())
+    assert info_from_json(responses[3]).training_type == 'SportsWalking'
+    assert 'BOX' in json.loads(responses[2])['error']
+    assert 'error' in json.loads(responses[4])
+    assert server.processed == 5
+    assert server.batches >= 2
+
+
+def test_many_packages_with_small_queue():
+    lines = ['RUN 15000 1 75'] * 200
+    server, responses = asyncio.run(
+        exchange(lines, batch_size=16, queue_size=4))
+    assert len(responses) == 200
+    assert server.processed == 200
+
+
+async def abort_while_busy(lines, **options):
+    server = IngestServer(**options)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+    current = asyncio.current_task()
+
+    def connection_tasks():
+        return [task for task in asyncio.all_tasks()
+                if task is not current and task is not server._batcher]
+    try:
+        _, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        # The responses are never read, so the server soon waits on the
+        # client; disconnect while it does.
+        while not server.processed:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        writer.transport.abort()
+        for _ in range(500):
+            await asyncio.sleep(0.01)
+            if not connection_tasks():
+                break
+        return connection_tasks()
+    finally:
+        await server.close()
+
+
+def test_abrupt_disconnect_releases_the_connection():
+    lines = ['RUN 15000 1 75'] * 200_000
+    assert asyncio.run(abort_while_busy(lines, batch_size=64)) == []
@@ -0,0 +1,145 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from benchmarks.generator import generate_packages
+from tracker import shard, wire
+from tracker.aggregation import Totals
+from workout_tracker import read_package
+
+PACKAGES = generate_packages(2000, seed=5)
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = tmp_path / 'history.bin'
+    path.write_bytes(wire.encode_many(PACKAGES))
+    return str(path)
+
+
+def expected_totals(packages=PACKAGES):
+    totals = {}
+    for package in packages:
+        info = read_package(*package).show_training_info()
+        totals.setdefault(info.training_type, Totals()).add(
+            info.duration, info.distance, info.speed, info.calories)
+    return totals
+
+
+def assert_totals(result, expected):
+    assert sorted(result) == sorted(expected)
+    for name, totals in expected.items():
+        assert result[name].count == totals.count
+        assert result[name].calories == pytest.approx(totals.calories)
+        assert result[name].distance == pytest.approx(totals.distance)
+
+
+def start_workers(address, count):
+    threads = [threading.Thread(target=shard.run_worker, args=(address,))
+               for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_plan_covers_archive(archive_path):
+    with shard.Coordinator(archive_path, shard_rows=300) as coordinator:
+        shards = coordinator.shards
+    assert len(shards) == 7
+    assert [item.start for item in shards] == list(range(0, 2000, 300))
+    assert shards[-1].stop == 2000
+    assert all(left.end == right.begin
+               for left, right in zip(shards, shards[1:]))
+
+
+def test_workers_merge_to_single_pass(archive_path):
+    with shard.Coordinator(archive_path, shard_rows=300) as coordinator:
+        coordinator.start()
+        workers = start_workers(coordinator.address, 3)
+        result = coordinator.run(timeout=30)
+    for worker in workers:
+        worker.join()
+    assert (result.records, result.shards, result.retries) == (2000, 7, 0)
+    assert_totals(result.totals, expected_totals())
+
+
+def crash_after_first_shard(address):
+    with socket.create_connection(address) as connection:
+        connection.makefile('rb').readline()
+
+
+def test_shard_of_lost_worker_is_retried(archive_path):
+    with shard.Coordinator(archive_path, shard_rows=500) as coordinator:
+        coordinator.start()
+        crash_after_first_shard(coordinator.address)
+        workers = start_workers(coordinator.address, 1)
+        result = coordinator.run(timeout=30)
+    workers[0].join()
+    assert result.retries == 1
+    assert_totals(result.totals, expected_totals())
+
+
+def test_invalid_packages_are_rejected(tmp_path):
+    packages = [('RUN', [15000, 1, 75]), ('RUN', [100, 0, 70]),
+                ('WLK', [9000, 1, 75, 180]), ('WLK', [9000, 1, 75, -1])]
+    path = tmp_path / 'mixed.bin'
+    path.write_bytes(wire.encode_many(packages))
+    with shard.Coordinator(str(path), shard_rows=2) as coordinator:
+        coordinator.start()
+        workers = start_workers(coordinator.address, 2)
+        result = coordinator.run(timeout=30)
+    for worker in workers:
+        worker.join()
+    assert result.retries == 0
+    assert [reject.position for reject in result.rejects] == [1, 3]
+    assert 'duration' in result.rejects[0].reason
+    assert_totals(result.totals, expected_totals(packages[::2]))
+
+
+def fail_with(error):
+    def score_shard(*args):
+        raise error
+    return score_shard
+
+
+def test_data_errors_are_not_retried(archive_path, monkeypatch):
+    monkeypatch.setattr(shard, 'score_shard',
+                        fail_with(ValueError('broken record')))
+    with shard.Coordinator(archive_path, retries=2) as coordinator:
+        coordinator.start()
+        workers = start_workers(coordinator.address, 2)
+        with pytest.raises(RuntimeError, match='Shard 0 failed: .*broken'):
+            coordinator.run(timeout=30)
+    for worker in workers:
+        worker.join()
+
+
+def test_failing_shard_gives_up(archive_path, monkeypatch):
+    monkeypatch.setattr(shard, 'score_shard',
+                        fail_with(OSError('disk unavailable')))
+    with shard.Coordinator(archive_path, retries=1) as coordinator:
+        coordinator.start()
+        workers = start_workers(coordinator.address, 2)
+        with pytest.raises(RuntimeError, match='failed 2 times.*disk'):
+            coordinator.run(timeout=30)
+    for worker in workers:
+        worker.join()
+
+
+def test_timeout_without_workers(archive_path):
+    with shard.Coordinator(archive_path) as coordinator:
+        with pytest.raises(TimeoutError, match='0 of 1 shards'):
+            coordinator.run(timeout=0.1)
+
+
+def test_main_with_worker_processes(archive_path, capsys):
+    assert shard.main(['coordinate', archive_path, '--workers', '2',
+                       '--shard-rows', '400', '--timeout', '60']) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report['shards'] == 5
+    assert report['rejects'] == 0
+    assert_totals({name: Totals(*values)
+                   for name, values in report['totals'].items()},
+                  expected_totals())
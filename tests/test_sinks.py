@@ -0,0 +1,82 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+
+from tracker import batch, sinks
+from workout_tracker import main, read_package
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [3000.33, 2.512, 75.8, 180.1]),
+]
+
+
+def infos():
+    return [read_package(*package).show_training_info()
+            for package in PACKAGES]
+
+
+def test_text_sink_buffers_until_flush():
+    target = StringIO()
+    sink = sinks.TextSink(target, buffer_size=1 << 20)
+    for package in PACKAGES:
+        main(read_package(*package), sink)
+    assert target.getvalue() == ''
+    sink.close()
+    assert target.getvalue().splitlines() == [
+        info.get_message() for info in infos()]
+    assert sink.count == 3
+
+
+def test_small_buffer_writes_in_blocks():
+    writes = []
+
+    class Target:
+        def write(self, text):
+            writes.append(text)
+
+    with sinks.TextSink(Target(), buffer_size=200) as sink:
+        sink.write_many(infos() * 3)
+    assert 1 < len(writes) < 9
+    assert len(''.join(writes).splitlines()) == 9
+
+
+def test_json_sink_matches_json_dumps():
+    target = StringIO()
+    with sinks.JsonLinesSink(target) as sink:
+        sink.write_many(infos())
+    for line, info in zip(target.getvalue().splitlines(), infos()):
+        assert line == json.dumps(
+            {field: getattr(info, field) for field in sinks.FIELDS})
+
+
+def test_csv_sink_from_columns():
+    names, result = batch.compute_packages(PACKAGES)
+    target = StringIO()
+    with sinks.CsvSink(target) as sink:
+        sink.write_columns(names, result)
+    rows = list(csv.DictReader(StringIO(target.getvalue())))
+    assert [row['training_type'] for row in rows] == names
+    assert [float(row['calories']) for row in rows] == [
+        info.calories for info in infos()]
+
+
+def test_text_sink_from_columns_matches_get_message():
+    names, result = batch.compute_packages(PACKAGES)
+    target = StringIO()
+    with sinks.TextSink(target) as sink:
+        sink.write_columns(names, result)
+    assert target.getvalue().splitlines() == [
+        info.get_message() for info in infos()]
+
+
+def test_open_sink_file(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    with sinks.open_sink('json', str(path)) as sink:
+        sink.write_many(infos())
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 3
+    with pytest.raises(ValueError):
+        sinks.open_sink('xml')
@@ -0,0 +1,117 @@
+import pytest
+
+from benchmarks.generator import generate_packages
+from tracker.aggregation import DAY, Totals
+from tracker.store import Session, SessionStore, day_start
+from workout_tracker import read_package
+
+# Monday 2024-01-01 00:00 UTC.
+MONDAY = 1_704_067_200
+SESSIONS = [
+    ('ann', MONDAY + 3600, ('RUN', [15000, 1, 75])),
+    ('ann', MONDAY + DAY + 60, ('WLK', [9000, 1, 75, 180])),
+    ('bob', MONDAY + DAY, ('SWM', [720, 1, 80, 25, 40])),
+    ('ann', MONDAY + 2 * DAY + 7200, ('RUN', [1206, 12, 6])),
+]
+
+
+def build(sessions=SESSIONS):
+    store = SessionStore()
+    for user, start, package in sessions:
+        store.add(user, start, read_package(*package).show_training_info())
+    return store
+
+
+def calories(*packages):
+    return sum(read_package(*package).get_spent_calories()
+               for package in packages)
+
+
+def test_sessions_in_range():
+    store = build()
+    found = store.sessions('ann', MONDAY, MONDAY + 2 * DAY)
+    assert [session.training_type for session in found] == [
+        'Running', 'SportsWalking']
+    assert found[0] == Session('ann', MONDAY + 3600, 'Running',
+                               *found[0][3:])
+    info = read_package('RUN', [15000, 1, 75]).show_training_info()
+    assert found[0].info().get_message() == info.get_message()
+    assert store.sessions('ann', MONDAY, MONDAY + 3600) == []
+    assert len(store.sessions('ann', 0, MONDAY * 2, 'Running')) == 2
+    assert len(store) == 4
+
+
+@pytest.mark.parametrize('start, stop, expected', [
+    (MONDAY, MONDAY + 3 * DAY, SESSIONS[0:2] + SESSIONS[3:]),
+    (MONDAY + 3600, MONDAY + 3601, SESSIONS[0:1]),
+    (MONDAY + 3601, MONDAY + 2 * DAY + 7201, SESSIONS[1:2] + SESSIONS[3:]),
+    (MONDAY + DAY, MONDAY + 2 * DAY, SESSIONS[1:2]),
+    (MONDAY - DAY, MONDAY, []),
+])
+def test_totals_match_raw_sessions(start, stop, expected):
+    totals = build().totals('ann', start, stop)
+    assert totals.count == len(expected)
+    assert totals.calories == pytest.approx(
+        calories(*(package for _, _, package in expected)))
+
+
+def test_totals_by_type():
+    store = build()
+    totals = store.totals('ann', MONDAY, MONDAY + 7 * DAY, 'Running')
+    assert totals.count == 2
+    assert store.totals('bob', MONDAY, MONDAY + 7 * DAY).count == 1
+    assert store.totals('carl', MONDAY, MONDAY + 7 * DAY) == Totals()
+
+
+def test_daily_rollups():
+    store = build()
+    days = store.daily('ann', MONDAY + 60, MONDAY + 7 * DAY)
+    assert [day for day, _ in days] == [
+        MONDAY, MONDAY + DAY, MONDAY + 2 * DAY]
+    assert [totals.count for _, totals in days] == [1, 1, 1]
+    assert days[1][1].calories == pytest.approx(
+        calories(('WLK', [9000, 1, 75, 180])))
+    assert store.daily('ann', MONDAY, MONDAY + DAY, 'SportsWalking') == []
+    assert day_start(MONDAY + DAY - 1) == MONDAY
+
+
+def test_bulk_insert_from_batch():
+    packages = generate_packages(1000, seed=3)
+    users = ['ann', 'bob'] * 500
+    starts = [MONDAY + 600 * i for i in range(1000)]
+    store = SessionStore()
+    assert store.add_packages(users, starts, packages) == 1000
+
+    expected = Totals()
+    for user, start, package in zip(users, starts, packages):
+        if user == 'ann' and MONDAY + 3000 <= start < MONDAY + 5 * DAY:
+            info = read_package(*package).show_training_info()
+            expected.add(info.duration, info.distance, info.speed,
+                         info.calories)
+    totals = store.totals('ann', MONDAY + 3000, MONDAY + 5 * DAY)
+    assert totals.count == expected.count
+    assert totals.calories == pytest.approx(expected.calories)
+    assert totals.distance == pytest.approx(expected.distance)
+    rollup = sum(totals.count
+                 for _, totals in store.daily('ann', 0, MONDAY * 2))
+    assert rollup == 500
+
+
+def test_duplicate_start_stores_nothing():
+    store = build()
+    rows = [('ann', MONDAY + 5 * DAY, 'Running', 1, 1, 1, 1),
+            ('ann', MONDAY + 3600, 'Running', 1, 1, 1, 1)]
+    with pytest.raises(ValueError, match='same time'):
+        store.add_many(rows)
+    assert len(store) == 4
+    assert store.totals('ann', MONDAY + 5 * DAY, MONDAY + 6 * DAY).count == 0
+
+
+def test_file_store_persists(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite')
+    with SessionStore(path) as store:
+        store.add('ann', MONDAY, read_package(
+            'RUN', [15000, 1, 75]).show_training_info())
+    with SessionStore(path) as store:
+        assert len(store) == 1
+        assert store.daily('ann', MONDAY, MONDAY + DAY)[0][1].count == 1
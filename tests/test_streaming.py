@@ -0,0 +1,59 @@
+import json
+from io import StringIO
+
+import pytest
+
+from conftest import DEMO_PACKAGES
+from tracker import streaming
+from workout_tracker import read_package
+
+LOG = (
+    '# sensor log\n'
+    '["SWM", [720, 1, 80, 25, 40]]\n'
+    '\n'
+    'RUN 15000 1 75\n'
+    '["WLK", [9000, 1, 75, 180]]\n'
+)
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('["RUN", [15000, 1, 75]]', ('RUN', [15000, 1, 75])),
+    ('WLK 9000 1 75 180\n', ('WLK', [9000.0, 1.0, 75.0, 180.0])),
+    ('   \n', None),
+    ('# comment', None),
+])
+def test_parse_line(line, expected):
+    assert streaming.parse_line(line) == expected
+
+
+def test_process_text():
+    target = StringIO()
+    count = streaming.process(StringIO(LOG), target, chunk_size=16)
+    assert count == 3
+    assert target.getvalue().splitlines() == [
+        read_package(*package).show_training_info().get_message()
+        for package in DEMO_PACKAGES
+    ]
+
+
+def test_process_json():
+    target = StringIO()
+    streaming.process(StringIO(LOG), target, 'json')
+    records = [json.loads(line) for line in target.getvalue().splitlines()]
+    assert [record['training_type'] for record in records] == [
+        'Swimming', 'Running', 'SportsWalking'
+    ]
+    assert records[0]['calories'] == 336.0
+
+
+def test_process_reports_bad_line():
+    with pytest.raises(ValueError, match='Line 2'):
+        streaming.process(StringIO('RUN 1 1 1\nRUN 1 x 1\n'), StringIO())
+
+
+def test_main_writes_file(tmp_path):
+    source = tmp_path / 'log.txt'
+    source.write_text(LOG, encoding='utf-8')
+    output = tmp_path / 'out.txt'
+    streaming.main([str(source), '-o', str(output)])
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 3
@@ -0,0 +1,77 @@
+import json
+from io import StringIO
+
+import pytest
+
+from conftest import DEMO_PACKAGES
+from tracker import streaming, validation
+from tracker.cli import main as cli
+from workout_tracker import read_package
+
+VALID = DEMO_PACKAGES + [('RUN', [0, 0.5, 60])]
+INVALID = [
+    (('RUN', [15000, 0, 75]), 'duration must be > 0'),
+    (('WLK', [9000, 1, 75, 0]), 'height must be > 0'),
+    (('RUN', [15000, 1, -75]), 'weight must be > 0'),
+    (('SWM', [720, 1, 80, 25]), 'expects 5 values'),
+    (('RUN', [15000, float('nan'), 75]), 'duration must be finite'),
+    (('RUN', [15000, '1', 75]), 'duration must be a number'),
+    (('BOX', [1, 2, 3]), 'not supported'),
+    (('SWM', [720, 1, 80, 0, 40]), 'length_pool must be > 0'),
+    (('RUN', [-1, 1, 75]), 'action must be >= 0'),
+    (('RUN', [15000, [1], 75]), 'duration must be a number'),
+    ((['RUN'], [15000, 1, 75]), 'not supported'),
+]
+
+
+@pytest.mark.parametrize('package', VALID)
+def test_valid_packages(package):
+    assert validation.check_package(*package) is None
+    read_package(*package).show_training_info()
+
+
+@pytest.mark.parametrize('package, reason', INVALID)
+def test_invalid_packages(package, reason):
+    assert reason in validation.check_package(*package)
+
+
+def test_split_packages():
+    bad = [package for package, _ in INVALID]
+    packages = [item for pair in zip(VALID * 3, bad) for item in pair]
+    valid, rejects = validation.split_packages(packages)
+    assert valid == [item for item in packages if item not in bad]
+    assert [reject.position for reject in rejects] == list(
+        range(1, 2 * len(bad), 2))
+    assert [reject.reason for reject in rejects] == [
+        validation.check_package(*package) for package in bad]
+    assert json.loads(rejects[0].to_json())['workout_type'] == 'RUN'
+
+
+def test_nested_values_of_one_shape():
+    packages = [('RUN', [[15000], [1], [75]]), ('RUN', [15000, 1, 75])]
+    for group in (packages[:1], packages):
+        valid, rejects = validation.split_packages(group)
+        assert valid == group[1:]
+        assert 'action must be a number' in rejects[0].reason
+
+
+def test_streaming_rejects():
+    log = 'RUN 15000 1 75\nRUN 15000 0 75\nWLK 9000 1 75 0\nRUN 1 1 1\n'
+    rejects = StringIO()
+    target = StringIO()
+    assert streaming.process(StringIO(log), target, rejects=rejects) == 2
+    reasons = [json.loads(line) for line in rejects.getvalue().splitlines()]
+    assert [item['position'] for item in reasons] == [1, 2]
+
+
+def test_batch_command_rejects(tmp_path):
+    source = tmp_path / 'log.txt'
+    source.write_text('RUN 15000 1 75\nRUN 1 0 75\n' * 3, encoding='utf-8')
+    output = tmp_path / 'out.txt'
+    rejects = tmp_path / 'rejects.jsonl'
+    cli(['batch', str(source), '-o', str(output), '--chunk-rows', '4',
+         '--rejects', str(rejects)])
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 3
+    positions = [json.loads(line)['position'] for line in
+                 rejects.read_text(encoding='utf-8').splitlines()]
+    assert positions == [1, 3, 5]
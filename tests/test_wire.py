@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from conftest import DEMO_PACKAGES, MORE_PACKAGES
+from tracker import batch, wire
+
+PACKAGES = DEMO_PACKAGES + MORE_PACKAGES[:1]
+
+
+@pytest.mark.parametrize('workout_type, size', [
+    ('SWM', 41), ('RUN', 25), ('WLK', 33),
+])
+def test_record_size(workout_type, size):
+    assert wire.record_size(workout_type) == size
+
+
+def test_round_trip():
+    target = BytesIO()
+    assert wire.write_packages(target, PACKAGES) == len(PACKAGES)
+    assert list(wire.iter_decode(target.getvalue())) == PACKAGES
+
+
+@pytest.mark.parametrize('package', [('BOX', [1, 2, 3]), ('RUN', [1, 2])])
+def test_encode_rejects_bad_package(package):
+    with pytest.raises(ValueError):
+        wire.encode(*package)
+
+
+def test_scan_rejects_truncated_buffer():
+    data = wire.encode('RUN', [15000, 1, 75])
+    with pytest.raises(ValueError, match='middle of a record'):
+        wire.scan_offsets(data[:-1])
+    with pytest.raises(ValueError, match='Unknown record tag'):
+        wire.scan_offsets(b'X' + data)
+
+
+def test_decoders_reject_truncated_record():
+    data = wire.encode_many(PACKAGES)[:-1]
+    with pytest.raises(ValueError, match='offset 99 is truncated'):
+        list(wire.iter_decode(data))
+    with pytest.raises(ValueError, match='offset 99 is truncated'):
+        wire.decode(data, 99)
+
+
+def test_scan_offsets():
+    data = wire.encode_many(PACKAGES)
+    assert list(wire.scan_offsets(data)) == [0, 41, 66, 99]
+
+
+@pytest.mark.parametrize('packages, code', [
+    ([('RUN', [15000, 1, 75])] * 3, 'RUN'),
+    (PACKAGES, None),
+    ([('RUN', [15000, 1, 75])] * 3 + [('SWM', [720, 1, 80, 25, 40])], None),
+    ([], None),
+])
+def test_uniform_layout(packages, code):
+    layout = wire.uniform_layout(wire.encode_many(packages))
+    assert (layout and layout.code) == code
+
+
+def test_uniform_layout_needs_whole_records():
+    data = wire.encode_many([('RUN', [15000, 1, 75])] * 3)
+    assert wire.uniform_layout(data[:-1]) is None
+
+
+def test_frombuffer_is_zero_copy():
+    data = bytearray(wire.encode_many(
+        [package for package in PACKAGES if package[0] == 'RUN']))
+    records = wire.frombuffer(data, 'RUN')
+    assert list(records['action']) == [15000, 1206]
+    data[1:9] = wire.encode('RUN', [1, 1, 1])[1:9]
+    assert records['action'][0] == 1
+
+
+def test_read_columns_feeds_batch():
+    names, expected = batch.compute_packages(PACKAGES)
+    columns = wire.read_columns(wire.encode_many(PACKAGES))
+    assert sorted(columns) == ['RUN', 'SWM', 'WLK']
+    for workout_type, (positions, group) in columns.items():
+        result = batch.compute_batch(workout_type, group)
+        for column, reference in zip(result, expected):
+            np.testing.assert_array_equal(column, reference[positions])
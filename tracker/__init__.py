@@ -0,0 +1,11 @@
+"""Extensions for processing sensor packages in bulk.
+
+Submodules are imported on demand so that the plain
+``python workout_tracker.py`` run does not pay for NumPy or other
+heavy dependencies.
+"""
+from typing import List, Tuple
+
+# A sensor package: the workout type code and the constructor arguments
+# of its class, as taken by ``workout_tracker.read_package``.
+Package = Tuple[str, List[float]]
@@ -0,0 +1,256 @@
+"""Incremental per-user totals of workouts.
+
+``Aggregator`` keeps, for every user and workout type, all-time totals
+and rolling daily and weekly windows. Windows are rings of a fixed
+number of buckets, so adding a session is O(1) and memory does not grow
+with the number of sessions. Aggregators built from different parts of
+a stream, for example by parallel workers, can be merged, and the state
+can be saved as JSON-compatible data and restored.
+
+Timestamps are seconds since the epoch (UTC); weeks start on Monday.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from workout_tracker import InfoMessage
+
+DAY = 86_400
+DAYS = 7
+WEEKS = 4
+
+Key = Tuple[str, str]
+
+
+class Totals:
+    """Sums over a group of sessions."""
+    __slots__ = ('count', 'duration', 'distance', 'speed', 'calories')
+
+    def __init__(self, count: int = 0, duration: float = 0.0,
+                 distance: float = 0.0, speed: float = 0.0,
+                 calories: float = 0.0) -> None:
+        self.count = count
+        self.duration = duration
+        self.distance = distance
+        self.speed = speed
+        self.calories = calories
+
+    def add(self, duration: float, distance: float, speed: float,
+            calories: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.distance += distance
+        self.speed += speed
+        self.calories += calories
+
+    def merge(self, other: 'Totals') -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.distance += other.distance
+        self.speed += other.speed
+        self.calories += other.calories
+
+    @property
+    def mean_speed(self) -> float:
+        """Average of the mean speeds of the sessions, km/h."""
+        return self.speed / self.count if self.count else 0.0
+
+    def to_list(self) -> list:
+        return [self.count, self.duration, self.distance, self.speed,
+                self.calories]
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, Totals)
+                and self.to_list() == other.to_list())
+
+    def __repr__(self) -> str:
+        return (f'Totals(count={self.count}, duration={self.duration}, '
+                f'distance={self.distance}, speed={self.speed}, '
+                f'calories={self.calories})')
+
+
+class RollingWindow:
+    """Totals of the last ``size`` periods of ``period`` seconds.
+
+    Bucket ``i`` holds the period whose number modulo ``size`` is ``i``;
+    a bucket is reset when a newer period reuses it. Sessions older than
+    the buckets they map to are dropped.
+    """
+    __slots__ = ('period', 'offset', 'periods', 'buckets')
+
+    def __init__(self, period: int, size: int, offset: int = 0) -> None:
+        self.period = period
+        self.offset = offset
+        self.periods: List[Optional[int]] = [None] * size
+        self.buckets: List[Totals] = [Totals() for _ in range(size)]
+
+    def index(self, timestamp: float) -> int:
+        """Return the number of the period holding the timestamp."""
+        return int((timestamp + self.offset) // self.period)
+
+    def _bucket(self, number: int) -> Optional[Totals]:
+        slot = number % len(self.buckets)
+        current = self.periods[slot]
+        if current is None or current < number:
+            self.periods[slot] = number
+            self.buckets[slot] = Totals()
+        elif current > number:
+            return None
+        return self.buckets[slot]
+
+    def add(self, timestamp: float, duration: float, distance: float,
+            speed: float, calories: float) -> None:
+        bucket = self._bucket(self.index(timestamp))
+        if bucket is not None:
+            bucket.add(duration, distance, speed, calories)
+
+    def merge(self, other: 'RollingWindow') -> None:
+        for number, totals in zip(other.periods, other.buckets):
+            if number is not None:
+                bucket = self._bucket(number)
+                if bucket is not None:
+                    bucket.merge(totals)
+
+    def history(self, now: float) -> List[Tuple[int, Totals]]:
+        """Return ``(period start, totals)`` of the window ending at
+        ``now``, oldest first, including empty periods.
+        """
+        last = self.index(now)
+        result = []
+        for number in range(last - len(self.buckets) + 1, last + 1):
+            slot = number % len(self.buckets)
+            totals = (self.buckets[slot] if self.periods[slot] == number
+                      else Totals())
+            result.append((number * self.period - self.offset, totals))
+        return result
+
+    def total(self, now: float) -> Totals:
+        result = Totals()
+        for _, totals in self.history(now):
+            result.merge(totals)
+        return result
+
+    def to_list(self) -> list:
+        return [[number, totals.to_list()]
+                for number, totals in zip(self.periods, self.buckets)
+                if number is not None]
+
+    def load(self, items: Iterable[list]) -> None:
+        for number, values in items:
+            slot = number % len(self.buckets)
+            self.periods[slot] = number
+            self.buckets[slot] = Totals(*values)
+
+
+class _Entry:
+    __slots__ = ('totals', 'daily', 'weekly')
+
+    def __init__(self, days: int, weeks: int) -> None:
+        self.totals = Totals()
+        self.daily = RollingWindow(DAY, days)
+        # 1970-01-01 was a Thursday: shift so that weeks start on Monday.
+        self.weekly = RollingWindow(7 * DAY, weeks, offset=3 * DAY)
+
+
+class Aggregator:
+    """Running totals per user and workout type."""
+
+    def __init__(self, days: int = DAYS, weeks: int = WEEKS) -> None:
+        self.days = days
+        self.weeks = weeks
+        self.entries: Dict[Key, _Entry] = {}
+
+    def _entry(self, key: Key) -> _Entry:
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = _Entry(self.days, self.weeks)
+        return entry
+
+    def add_values(self, user: str, timestamp: float, training_type: str,
+                   duration: float, distance: float, speed: float,
+                   calories: float) -> None:
+        """Add one session given by its ``InfoMessage`` values."""
+        entry = self._entry((user, training_type))
+        entry.totals.add(duration, distance, speed, calories)
+        entry.daily.add(timestamp, duration, distance, speed, calories)
+        entry.weekly.add(timestamp, duration, distance, speed, calories)
+
+    def add(self, user: str, timestamp: float, info: InfoMessage) -> None:
+        """Add the result of ``Training.show_training_info``."""
+        self.add_values(user, timestamp, info.training_type, info.duration,
+                        info.distance, info.speed, info.calories)
+
+    def add_columns(self, users: Sequence[str], timestamps: Sequence[float],
+                    training_types: Sequence[str],
+                    columns: Sequence[Sequence[float]]) -> None:
+        """Add sessions given as columns, e.g. a ``BatchResult``."""
+        values = [column.tolist() if hasattr(column, 'tolist') else column
+                  for column in (timestamps, *columns)]
+        add = self.add_values
+        for user, timestamp, training_type, *metrics in zip(
+                users, values[0], training_types, *values[1:]):
+            add(user, timestamp, training_type, *metrics)
+
+    def _select(self, user: str,
+                training_type: Optional[str]) -> List[_Entry]:
+        if training_type is not None:
+            entry = self.entries.get((user, training_type))
+            return [entry] if entry is not None else []
+        return [entry for (owner, _), entry in self.entries.items()
+                if owner == user]
+
+    def totals(self, user: str,
+               training_type: Optional[str] = None) -> Totals:
+        """All-time totals of a user, optionally of one workout type."""
+        result = Totals()
+        for entry in self._select(user, training_type):
+            result.merge(entry.totals)
+        return result
+
+    def daily(self, user: str, now: float,
+              training_type: Optional[str] = None) -> Totals:
+        """Totals of the last ``days`` days up to ``now``."""
+        result = Totals()
+        for entry in self._select(user, training_type):
+            result.merge(entry.daily.total(now))
+        return result
+
+    def weekly(self, user: str, now: float,
+               training_type: Optional[str] = None) -> Totals:
+        """Totals of the last ``weeks`` weeks up to ``now``."""
+        result = Totals()
+        for entry in self._select(user, training_type):
+            result.merge(entry.weekly.total(now))
+        return result
+
+    def merge(self, other: 'Aggregator') -> None:
+        """Add the state of an aggregator of another part of the stream."""
+        if (other.days, other.weeks) != (self.days, self.weeks):
+            raise ValueError('Aggregators with different windows '
+                             'can not be merged.')
+        for key, theirs in other.entries.items():
+            entry = self._entry(key)
+            entry.totals.merge(theirs.totals)
+            entry.daily.merge(theirs.daily)
+            entry.weekly.merge(theirs.weekly)
+
+    def snapshot(self) -> dict:
+        """Return the state as JSON-compatible data."""
+        return {
+            'days': self.days,
+            'weeks': self.weeks,
+            'entries': [
+                [user, training_type, entry.totals.to_list(),
+                 entry.daily.to_list(), entry.weekly.to_list()]
+                for (user, training_type), entry in self.entries.items()
+            ],
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> 'Aggregator':
+        """Create an aggregator from a ``snapshot``."""
+        aggregator = cls(state['days'], state['weeks'])
+        for user, training_type, totals, daily, weekly in state['entries']:
+            entry = aggregator._entry((user, training_type))
+            entry.totals = Totals(*totals)
+            entry.daily.load(daily)
+            entry.weekly.load(weekly)
+        return aggregator
@@ -0,0 +1,276 @@
+"""Compressed archive of timestamped packages in independent blocks.
+
+Packages are buffered per workout type and written in blocks of up to
+``block_rows`` packages (and, optionally, of one ``block_seconds``
+period), each compressed on its own with ``zlib`` or ``lzma``. A block
+stores the start times followed by the constructor fields as
+little-endian ``float64`` columns, so a decompressed block is viewed as
+NumPy columns for ``tracker.batch`` without parsing.
+
+The file ends with a block index and a fixed-size footer::
+
+    MAGIC  block  block  ...  index (JSON)  footer
+
+The footer holds the offset and size of the index and the magic again.
+The index lists for every block its workout type, first and last start
+time, number of packages, offset and compressed size. Readers load only
+the index and then seek to and decompress just the blocks of the
+requested types and time range.
+"""
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from typing import (BinaryIO, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Sequence, Tuple)
+
+import numpy as np
+
+from tracker import Package
+from tracker.batch import BatchResult, compute_batch
+from workout_tracker import TRAINING_TYPES, get_workout_type
+
+MAGIC = b'TRKARC1\n'
+FOOTER = struct.Struct('<QQ8s')
+BLOCK_ROWS = 1 << 16
+CODECS = {
+    'zlib': (zlib.compress, zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+
+class Block(NamedTuple):
+    """Index entry of one compressed block."""
+    workout_type: str
+    first: float
+    last: float
+    count: int
+    offset: int
+    size: int
+
+
+class _Buffer:
+    __slots__ = ('period', 'starts', 'columns')
+
+    def __init__(self, period: Optional[int], arity: int) -> None:
+        self.period = period
+        self.starts = array('d')
+        self.columns = [array('d') for _ in range(arity)]
+
+
+class ArchiveWriter:
+    """Write timestamped packages to a block archive."""
+
+    def __init__(self, target: BinaryIO, codec: str = 'zlib',
+                 block_rows: int = BLOCK_ROWS,
+                 block_seconds: Optional[int] = None,
+                 close_target: bool = False) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"The '{codec}' codec is not supported.")
+        self.target = target
+        self.codec = codec
+        self.block_rows = block_rows
+        self.block_seconds = block_seconds
+        self.close_target = close_target
+        self.blocks: List[Block] = []
+        self._compress = CODECS[codec][0]
+        self._buffers: Dict[str, _Buffer] = {}
+        self._offset = target.write(MAGIC)
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _period(self, start: float) -> Optional[int]:
+        if self.block_seconds is None:
+            return None
+        return int(start // self.block_seconds)
+
+    def add(self, start: float, workout_type: str,
+            data: Sequence[float]) -> None:
+        """Add one package that started at ``start`` (epoch seconds)."""
+        buffer = self._buffers.get(workout_type)
+        period = self._period(start)
+        if buffer is not None and buffer.period != period:
+            self._flush(workout_type)
+            buffer = None
+        if buffer is None:
+            workout = get_workout_type(workout_type)
+            buffer = self._buffers[workout_type] = _Buffer(
+                period, workout.arity)
+        if len(data) != len(buffer.columns):
+            raise ValueError(
+                f"The '{workout_type}' workout type expects "
+                f'{len(buffer.columns)} values, got {len(data)}.')
+        buffer.starts.append(start)
+        for column, value in zip(buffer.columns, data):
+            column.append(value)
+        if len(buffer.starts) >= self.block_rows:
+            self._flush(workout_type)
+
+    def add_many(self, starts: Iterable[float],
+                 packages: Iterable[Package]) -> None:
+        for start, (workout_type, data) in zip(starts, packages):
+            self.add(start, workout_type, data)
+
+    def _flush(self, workout_type: str) -> None:
+        buffer = self._buffers.pop(workout_type)
+        starts = buffer.starts
+        if not starts:
+            return
+        columns = [starts, *buffer.columns]
+        if sys.byteorder == 'big':
+            # Blocks are little-endian on every platform.
+            for column in columns:
+                column.byteswap()
+        raw = b''.join(column.tobytes() for column in columns)
+        payload = self._compress(raw)
+        self.target.write(payload)
+        self.blocks.append(Block(workout_type, min(starts), max(starts),
+                                 len(starts), self._offset, len(payload)))
+        self._offset += len(payload)
+
+    def close(self) -> None:
+        """Write the remaining blocks, the index and the footer.
+
+        ``target`` is closed as well when the writer was created with
+        ``close_target``.
+        """
+        if self.target is None:
+            return
+        for workout_type in list(self._buffers):
+            self._flush(workout_type)
+        index = json.dumps({
+            'codec': self.codec,
+            'fields': {code: list(workout.fields)
+                       for code, workout in TRAINING_TYPES.items()},
+            'blocks': [list(block) for block in self.blocks],
+        }).encode()
+        self.target.write(index)
+        self.target.write(FOOTER.pack(self._offset, len(index), MAGIC))
+        if self.close_target:
+            self.target.close()
+        self.target = None
+
+
+def write_archive(path: str, starts: Iterable[float],
+                  packages: Iterable[Package], **options) -> List[Block]:
+    """Write packages with their start times to a new archive."""
+    with ArchiveWriter(open(path, 'wb'), close_target=True,
+                       **options) as writer:
+        writer.add_many(starts, packages)
+    return writer.blocks
+
+
+class ArchiveReader:
+    """Random access to the blocks of an archive."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._read_index()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_index(self) -> None:
+        file = self._file
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{self.path} is not a session archive.')
+        end = file.seek(0, 2)
+        if end < len(MAGIC) + FOOTER.size:
+            raise ValueError(f'{self.path} is truncated.')
+        file.seek(end - FOOTER.size)
+        offset, size, magic = FOOTER.unpack(file.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{self.path} is truncated.')
+        file.seek(offset)
+        index = json.loads(file.read(size))
+        self.codec = index['codec']
+        self._decompress = CODECS[self.codec][1]
+        self.fields: Dict[str, Tuple[str, ...]] = {
+            code: tuple(fields) for code, fields in index['fields'].items()}
+        self.blocks = [Block(*block) for block in index['blocks']]
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return sum(block.count for block in self.blocks)
+
+    def select(self, workout_types: Optional[Iterable[str]] = None,
+               start: Optional[float] = None,
+               stop: Optional[float] = None) -> List[Block]:
+        """Return the blocks that may hold packages of the given types
+        starting in ``[start, stop)``.
+        """
+        types = set(workout_types) if workout_types is not None else None
+        return [block for block in self.blocks
+                if (types is None or block.workout_type in types)
+                and (start is None or block.last >= start)
+                and (stop is None or block.first < stop)]
+
+    def read_block(self, block: Block) -> Tuple[np.ndarray,
+                                                Dict[str, np.ndarray]]:
+        """Decompress a block into start times and input columns."""
+        self._file.seek(block.offset)
+        raw = self._decompress(self._file.read(block.size))
+        fields = self.fields[block.workout_type]
+        matrix = np.frombuffer(raw, dtype='<f8').reshape(
+            len(fields) + 1, block.count)
+        return matrix[0], dict(zip(fields, matrix[1:]))
+
+    def iter_columns(self, workout_types: Optional[Iterable[str]] = None,
+                     start: Optional[float] = None,
+                     stop: Optional[float] = None
+                     ) -> Iterator[Tuple[str, np.ndarray,
+                                         Dict[str, np.ndarray]]]:
+        """Yield ``(workout_type, starts, columns)`` block by block,
+        keeping only the packages that start in ``[start, stop)``.
+        """
+        for block in self.select(workout_types, start, stop):
+            starts, columns = self.read_block(block)
+            if ((start is not None and block.first < start)
+                    or (stop is not None and block.last >= stop)):
+                mask = np.ones(block.count, dtype=bool)
+                if start is not None:
+                    mask &= starts >= start
+                if stop is not None:
+                    mask &= starts < stop
+                starts = starts[mask]
+                columns = {name: values[mask]
+                           for name, values in columns.items()}
+            yield block.workout_type, starts, columns
+
+    def iter_packages(self, workout_types: Optional[Iterable[str]] = None,
+                      start: Optional[float] = None,
+                      stop: Optional[float] = None
+                      ) -> Iterator[Tuple[float, str, List[float]]]:
+        """Yield ``(start, workout_type, data)`` in block order."""
+        for workout_type, starts, columns in self.iter_columns(
+                workout_types, start, stop):
+            rows = zip(*(values.tolist() for values in columns.values()))
+            for begin, row in zip(starts.tolist(), rows):
+                yield begin, workout_type, list(row)
+
+    def iter_results(self, workout_types: Optional[Iterable[str]] = None,
+                     start: Optional[float] = None,
+                     stop: Optional[float] = None
+                     ) -> Iterator[Tuple[str, np.ndarray, BatchResult]]:
+        """Calculate the selected packages with ``tracker.batch``, block
+        by block, yielding ``(workout_type, starts, result)``.
+        """
+        for workout_type, starts, columns in self.iter_columns(
+                workout_types, start, stop):
+            yield workout_type, starts, compute_batch(workout_type, columns)
@@ -0,0 +1,301 @@
+"""Vectorized calculation of workouts stored in NumPy columns.
+
+Workout types come from the ``workout_tracker.TRAINING_TYPES`` registry.
+A type is calculated with the kernel it was registered with, with the
+built-in kernel of this module, or, failing both, row by row with its
+class.
+"""
+from typing import (Callable, Dict, Iterable, List, Mapping, NamedTuple,
+                    Optional, Sequence, Tuple)
+
+import numpy as np
+
+from workout_tracker import (TRAINING_TYPES, Running, SportsWalking,
+                             Swimming, WorkoutType, get_workout_type)
+
+CHUNK_ROWS = 1 << 16
+
+
+class BatchResult(NamedTuple):
+    """Columns with the ``InfoMessage`` values of many workouts."""
+    duration: np.ndarray
+    distance: np.ndarray
+    speed: np.ndarray
+    calories: np.ndarray
+
+
+def _running(action, duration, weight) -> BatchResult:
+    cls = Running
+    distance = action * cls.LEN_STEP / cls.M_IN_KM
+    speed = distance / duration
+    calories = ((cls.CALORIES_MEAN_SPEED_MULTIPLIER * speed
+                 + cls.CALORIES_MEAN_SPEED_SHIFT)
+                * weight / cls.M_IN_KM * duration * cls.H_M)
+    return BatchResult(duration, distance, speed, calories)
+
+
+def _sports_walking(action, duration, weight, height) -> BatchResult:
+    cls = SportsWalking
+    distance = action * cls.LEN_STEP / cls.M_IN_KM
+    speed = distance / duration
+    speed_ms = speed * cls.KMH_MS
+    duration_m = duration * cls.H_M
+    height_m = height / cls.CM_M
+    # ``**`` on floats calls the C ``pow``, while NumPy turns ``**2`` into
+    # a multiplication that can round differently.
+    calories = ((cls.COEF_W_1 * weight
+                 + (np.float_power(speed_ms, 2) / height_m)
+                 * cls.COEF_W_2 * weight)
+                * duration_m)
+    return BatchResult(duration, distance, speed, calories)
+
+
+def _swimming(action, duration, weight,
+              length_pool, count_pool) -> BatchResult:
+    cls = Swimming
+    distance = action * cls.LEN_STEP / cls.M_IN_KM
+    speed = length_pool * count_pool / cls.M_IN_KM / duration
+    calories = (speed + cls.COEF_SP) * cls.COEF_CAL * weight * duration
+    return BatchResult(duration, distance, speed, calories)
+
+
+KERNELS: Dict[type, Callable[..., BatchResult]] = {
+    Swimming: _swimming,
+    Running: _running,
+    SportsWalking: _sports_walking,
+}
+
+
+def _scalar_kernel(workout: WorkoutType) -> Callable[..., BatchResult]:
+    """Calculate rows one by one with the workout class."""
+    def kernel(*arrays: np.ndarray) -> BatchResult:
+        infos = [workout.training_class(*row).show_training_info()
+                 for row in zip(*(array.tolist() for array in arrays))]
+        return BatchResult(*(
+            np.array([getattr(info, field) for info in infos],
+                     dtype=np.float64)
+            for field in BatchResult._fields))
+    return kernel
+
+
+def get_kernel(workout_type: str) -> Callable[..., BatchResult]:
+    """Return the vectorized calculation of a registered type."""
+    workout = get_workout_type(workout_type)
+    return (workout.kernel or KERNELS.get(workout.training_class)
+            or _scalar_kernel(workout))
+
+
+def _empty_result(size: int) -> BatchResult:
+    return BatchResult(*(np.empty(size) for _ in BatchResult._fields))
+
+
+def compute_batch(workout_type: str,
+                  columns: Mapping[str, Sequence[float]]) -> BatchResult:
+    """Calculate duration, distance, speed and calories for one type.
+
+    ``columns`` maps the constructor argument names of the workout class
+    to equally sized sequences. The formulas match the scalar classes
+    operation for operation, so the results are identical to calling
+    ``read_package(workout_type, data).show_training_info()`` per row.
+    Like the classes, a zero divisor such as a zero ``duration`` raises
+    ``ZeroDivisionError`` instead of giving ``inf`` or ``nan``.
+    """
+    workout = get_workout_type(workout_type)
+    arrays = []
+    for field in workout.fields:
+        if field not in columns:
+            raise ValueError(
+                f"The '{field}' column is required for '{workout_type}'.")
+        arrays.append(np.asarray(columns[field], dtype=np.float64))
+    kernel = get_kernel(workout_type)
+    try:
+        with np.errstate(divide='raise', invalid='raise'):
+            return kernel(*arrays)
+    except FloatingPointError as exc:
+        raise ZeroDivisionError(
+            f"A '{workout_type}' workout divides by zero.") from exc
+
+
+def compute_mixed(workout_types: Sequence[str],
+                  columns: Mapping[str, Sequence[float]]) -> BatchResult:
+    """Calculate metrics for rows of different workout types.
+
+    Rows are grouped by type code, every group is calculated with its own
+    kernel and the results are scattered back in the input order. Columns
+    that a type does not use may hold any value for its rows.
+    """
+    codes = np.asarray(workout_types)
+    size = len(codes)
+    result = _empty_result(size)
+    arrays = {name: np.asarray(values, dtype=np.float64)
+              for name, values in columns.items()}
+    for code in np.unique(codes):
+        mask = codes == code
+        group = {name: values[mask] for name, values in arrays.items()}
+        partial = compute_batch(str(code), group)
+        for target, values in zip(result, partial):
+            target[mask] = values
+    return result
+
+
+def group_packages(
+        packages: Iterable[Tuple[str, List[float]]]
+) -> Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Split ``(workout_type, data)`` packages into per-type columns.
+
+    Returns a mapping of type code to the input positions of its rows and
+    the columns built from their data.
+    """
+    rows: Dict[str, List[List[float]]] = {}
+    positions: Dict[str, List[int]] = {}
+    for index, (workout_type, data) in enumerate(packages):
+        get_workout_type(workout_type)
+        rows.setdefault(workout_type, []).append(data)
+        positions.setdefault(workout_type, []).append(index)
+    groups = {}
+    for workout_type, data in rows.items():
+        matrix = np.asarray(data, dtype=np.float64)
+        fields = TRAINING_TYPES[workout_type].fields
+        if matrix.ndim != 2 or matrix.shape[1] != len(fields):
+            raise ValueError(
+                f"'{workout_type}' packages must have {len(fields)} values.")
+        groups[workout_type] = (
+            np.asarray(positions[workout_type], dtype=np.intp),
+            {field: matrix[:, i] for i, field in enumerate(fields)},
+        )
+    return groups
+
+
+def compute_groups(
+        groups: Mapping[str, Tuple[np.ndarray, Mapping[str, np.ndarray]]],
+        size: int
+) -> Tuple[List[str], BatchResult]:
+    """Calculate per-type groups and merge them in the input order.
+
+    ``groups`` maps type codes to the input positions of their rows and
+    their columns, as returned by ``group_packages`` or
+    ``tracker.wire.read_columns``. Returns the class name of every
+    workout (as used in ``InfoMessage``) and the metric columns.
+    """
+    names = [''] * size
+    result = _empty_result(size)
+    for workout_type, (index, columns) in groups.items():
+        partial = compute_batch(workout_type, columns)
+        for target, values in zip(result, partial):
+            target[index] = values
+        name = TRAINING_TYPES[workout_type].training_class.__name__
+        for position in index.tolist():
+            names[position] = name
+    return names, result
+
+
+def compute_packages(
+        packages: Iterable[Tuple[str, List[float]]],
+        rejects: Optional[list] = None
+) -> Tuple[List[str], BatchResult]:
+    """Calculate a sequence of packages in bulk, keeping the input order.
+
+    Returns the class name of every workout (as used in ``InfoMessage``)
+    and the metric columns. When a ``rejects`` list is given, packages
+    are validated with ``tracker.validation`` first: invalid ones are
+    appended to it as ``Reject`` records and left out of the result.
+    """
+    packages = list(packages)
+    if rejects is None:
+        return compute_groups(group_packages(packages), len(packages))
+    from tracker.validation import group_valid
+
+    groups, size, rejected = group_valid(packages)
+    rejects.extend(rejected)
+    return compute_groups(groups, size)
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> None:
+    """Command line entry point: calculate a whole file in batches."""
+    import argparse
+    import sys
+    from itertools import islice
+
+    from tracker.sinks import SINKS, open_sink
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Calculate a sensor log or a binary archive with NumPy.')
+    parser.add_argument('input', help="log file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-',
+                        help="result file, '-' for stdout")
+    parser.add_argument('-f', '--format', choices=sorted(SINKS),
+                        default='text')
+    parser.add_argument('--binary', action='store_true',
+                        help='the input is a tracker.wire archive')
+    parser.add_argument('--archive', action='store_true',
+                        help='the input is a tracker.archive block archive')
+    parser.add_argument('--types', nargs='+', metavar='TYPE',
+                        help='only these workout types of a block archive')
+    parser.add_argument('--start', type=float,
+                        help='only packages of a block archive starting at '
+                             'or after this time')
+    parser.add_argument('--stop', type=float,
+                        help='only packages of a block archive starting '
+                             'before this time')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help='packages calculated at once')
+    parser.add_argument('--rejects',
+                        help='write invalid packages of a log to a file '
+                             'instead of stopping')
+    args = parser.parse_args(argv)
+
+    with open_sink(args.format, args.output) as sink:
+        if args.archive:
+            from tracker.archive import ArchiveReader
+
+            with ArchiveReader(args.input) as archive:
+                for workout_type, _, result in archive.iter_results(
+                        args.types, args.start, args.stop):
+                    name = TRAINING_TYPES[
+                        workout_type].training_class.__name__
+                    sink.write_columns([name] * len(result.duration), result)
+            return
+        if args.binary:
+            from tracker.mapped import MappedArchive
+
+            with MappedArchive(args.input) as archive:
+                for start in range(0, len(archive), args.chunk_rows):
+                    groups = archive.columns(start, start + args.chunk_rows)
+                    size = min(args.chunk_rows, len(archive) - start)
+                    sink.write_columns(*compute_groups(groups, size))
+                    del groups
+            return
+
+        from tracker.streaming import iter_packages
+
+        source = (sys.stdin if args.input == '-'
+                  else open(args.input, encoding='utf-8'))
+        rejects = (open(args.rejects, 'w', encoding='utf-8')
+                   if args.rejects else None)
+        try:
+            packages = iter_packages(source)
+            start = 0
+            while True:
+                chunk = list(islice(packages, args.chunk_rows))
+                if not chunk:
+                    break
+                if rejects is None:
+                    sink.write_columns(*compute_packages(chunk))
+                    continue
+                rejected = []
+                sink.write_columns(*compute_packages(chunk, rejected))
+                for reject in rejected:
+                    reject = reject._replace(position=start + reject.position)
+                    rejects.write(reject.to_json() + '\n')
+                start += len(chunk)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if rejects is not None:
+                rejects.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""LRU cache of calculated packages.
+
+Devices often resend the same package. ``ResultCache`` keeps the results
+of the most recent distinct packages, keyed by ``(workout_type,
+tuple(data))``, and calculates only the packages it has not seen. The
+cache can be saved to a JSON file and loaded in the next run.
+"""
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from workout_tracker import InfoMessage, read_package
+
+MAXSIZE = 65_536
+
+Key = Tuple[str, Tuple[float, ...]]
+InfoValues = Tuple[str, float, float, float, float]
+
+
+class ResultCache:
+    """Bounded cache in front of ``read_package(...).show_training_info()``.
+
+    Every lookup returns a new ``InfoMessage``, so callers may modify the
+    result without affecting the cache.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        if maxsize <= 0:
+            raise ValueError('The cache size must be positive.')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: 'OrderedDict[Key, InfoValues]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get_info(self, workout_type: str,
+                 data: Sequence[float]) -> InfoMessage:
+        """Return the information message of a package."""
+        key = (workout_type, tuple(data))
+        results = self._results
+        values = results.get(key)
+        if values is not None:
+            self.hits += 1
+            results.move_to_end(key)
+            return InfoMessage(*values)
+        self.misses += 1
+        info = read_package(workout_type, data).show_training_info()
+        results[key] = (info.training_type, info.duration, info.distance,
+                        info.speed, info.calories)
+        if len(results) > self.maxsize:
+            results.popitem(last=False)
+        return info
+
+    def clear(self) -> None:
+        self._results.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path: str) -> None:
+        """Write the cached results to a JSON file, least recent first."""
+        entries: List[list] = [
+            [workout_type, list(data), list(values)]
+            for (workout_type, data), values in self._results.items()
+        ]
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'maxsize': self.maxsize, 'entries': entries}, file)
+        os.replace(temporary, path)
+
+    def load(self, path: str) -> None:
+        """Add the results saved in a JSON file.
+
+        Only the most recent ``maxsize`` entries are kept.
+        """
+        with open(path, encoding='utf-8') as file:
+            state = json.load(file)
+        for workout_type, data, values in state['entries']:
+            key = (workout_type, tuple(data))
+            self._results[key] = tuple(values)
+            self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    @classmethod
+    def open(cls, path: Optional[str],
+             maxsize: int = MAXSIZE) -> 'ResultCache':
+        """Create a cache, loading ``path`` if the file exists."""
+        cache = cls(maxsize)
+        if path is not None and os.path.exists(path):
+            cache.load(path)
+        return cache
@@ -0,0 +1,46 @@
+"""Command line interface of the workout tracker.
+
+Every subcommand lives in its own module, which is imported only when
+the subcommand runs; ``tracker.cli`` itself imports nothing heavy, so
+short-lived invocations start fast.
+"""
+import argparse
+import importlib
+from typing import Optional, Sequence
+
+COMMANDS = {
+    'score': ('tracker.streaming',
+              'calculate a sensor log package by package'),
+    'batch': ('tracker.batch',
+              'calculate a log or binary archive with NumPy'),
+    'ingest': ('tracker.pipeline',
+               'calculate many logs at once with reader threads'),
+    'shard': ('tracker.shard',
+              'score an archive on coordinated worker processes'),
+    'serve': ('tracker.server', 'receive live packages over a socket'),
+    'bench': ('benchmarks.run', 'run the benchmark suite'),
+    'verify': ('benchmarks.differential',
+               'compare all calculation engines with the classes'),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='tracker',
+        description='Workout tracker. '
+                    'Run "tracker COMMAND --help" for command options.',
+        epilog='commands:\n' + '\n'.join(
+            f'  {name:8} {summary}'
+            for name, (_, summary) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=COMMANDS, metavar='COMMAND')
+    parser.add_argument('args', nargs=argparse.REMAINDER,
+                        help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a subcommand and return the exit status."""
+    args = build_parser().parse_args(argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    return module.main(args.args, prog=f'tracker {args.command}') or 0
@@ -0,0 +1,156 @@
+"""Memory efficient representations of workouts.
+
+The classes here mirror the ``workout_tracker`` hierarchy with the same
+constructor signatures, constants and methods, but their instances use
+``__slots__`` instead of a per-instance ``__dict__``. ``TrainingTable``
+goes further and keeps the sessions of one type in typed columns.
+"""
+import inspect
+from array import array
+from typing import Iterable, Iterator, List, Sequence, Tuple, Type
+
+import workout_tracker
+
+_NOT_COPIED = {'__dict__', '__weakref__', '__module__', '__qualname__',
+               '__slots__', '__init_subclass__', '_metrics'}
+
+
+def _mirror(original: type):
+    """Copy constants and methods of ``original`` into a slotted class.
+
+    Attributes defined in the decorated class body take precedence, which
+    is needed for methods relying on ``super()`` of the original class.
+    """
+    def decorate(cls: type) -> type:
+        for name, value in vars(original).items():
+            if name not in _NOT_COPIED and name not in vars(cls):
+                setattr(cls, name, value)
+        return cls
+    return decorate
+
+
+@_mirror(workout_tracker.Training)
+class Training:
+    __slots__ = ('action', 'duration', 'weight', '_metrics')
+
+    def __init__(self, action, duration, weight):
+        self._metrics = None
+        self.action = action
+        self.duration = duration
+        self.weight = weight
+
+
+@_mirror(workout_tracker.Running)
+class Running(Training):
+    __slots__ = ()
+
+
+@_mirror(workout_tracker.SportsWalking)
+class SportsWalking(Training):
+    __slots__ = ('height',)
+
+    def __init__(self, action, duration, weight, height):
+        super().__init__(action, duration, weight)
+        self.height = height
+
+
+@_mirror(workout_tracker.Swimming)
+class Swimming(Training):
+    __slots__ = ('length_pool', 'count_pool')
+
+    def __init__(self, action, duration, weight, length_pool, count_pool):
+        super().__init__(action, duration, weight)
+        self.length_pool = length_pool
+        self.count_pool = count_pool
+
+
+TRAINING_CLASSES = {
+    'SWM': Swimming,
+    'RUN': Running,
+    'WLK': SportsWalking,
+}
+
+
+def read_package(workout_type: str, data: list) -> Training:
+    """Read data received from sensors into a slotted workout."""
+    if workout_type in TRAINING_CLASSES:
+        return TRAINING_CLASSES[workout_type](*data)
+    raise workout_tracker.UnsupportedWorkoutType(workout_type)
+
+
+def _column_property(position: int) -> property:
+    def getter(view):
+        return view._columns[position][view._index]
+
+    def setter(view, value):
+        view._columns[position][view._index] = value
+    return property(getter, setter)
+
+
+def _view_class(training_class: Type[Training],
+                fields: Sequence[str]) -> type:
+    """Build a class whose instances read their fields from table rows."""
+    namespace = {
+        field: _column_property(position)
+        for position, field in enumerate(fields)
+    }
+    namespace['__slots__'] = ('_columns', '_index')
+    return type(training_class.__name__, (training_class,), namespace)
+
+
+class TrainingTable:
+    """Sessions of one workout type stored in ``array('d')`` columns.
+
+    Iteration and indexing return views: objects of a subclass of the
+    slotted workout class that read and write their fields directly in
+    the columns, so no per-session data is copied. Metrics cached by a
+    view are recalculated once its fields change, whether it is written
+    through or a column is modified directly.
+    """
+    __slots__ = ('training_class', 'fields', 'columns', '_view')
+
+    def __init__(self, workout_type: str,
+                 rows: Iterable[Sequence[float]] = ()) -> None:
+        if workout_type not in TRAINING_CLASSES:
+            raise workout_tracker.UnsupportedWorkoutType(workout_type)
+        self.training_class = TRAINING_CLASSES[workout_type]
+        self.fields: Tuple[str, ...] = tuple(
+            inspect.signature(self.training_class).parameters)
+        self.columns: List[array] = [array('d') for _ in self.fields]
+        self._view = _view_class(self.training_class, self.fields)
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def append(self, data: Sequence[float]) -> None:
+        """Add one session given as the constructor arguments."""
+        if len(data) != len(self.fields):
+            raise ValueError(
+                f'{self.training_class.__name__} needs '
+                f'{len(self.fields)} values, got {len(data)}.')
+        for column, value in zip(self.columns, data):
+            column.append(value)
+
+    def extend(self, rows: Iterable[Sequence[float]]) -> None:
+        for data in rows:
+            self.append(data)
+
+    def column(self, field: str) -> array:
+        """Return the column of one constructor argument."""
+        return self.columns[self.fields.index(field)]
+
+    def __getitem__(self, index: int) -> Training:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('TrainingTable index out of range')
+        view = object.__new__(self._view)
+        view._metrics = None
+        view._columns = self.columns
+        view._index = index
+        return view
+
+    def __iter__(self) -> Iterator[Training]:
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,209 @@
+"""Columnar export of calculated sessions.
+
+A dataset is a directory of chunks. Every chunk stores each column in a
+separate file, so readers load only the columns they need and never
+parse rows. With the default ``npy`` format the layout is::
+
+    manifest.json
+    chunk-00000.training_type.npy    uint8 index into "training_types"
+    chunk-00000.action.npy           float64, one file per column
+    ...
+
+``manifest.json`` lists the columns with their dtypes, the workout class
+names that ``training_type`` indexes, and the number of rows of every
+chunk. Input fields that a workout type does not have are NaN. The
+``parquet`` format writes one ``chunk-NNNNN.parquet`` file per chunk
+instead and needs ``pyarrow``.
+"""
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tracker import Package
+from tracker.batch import BatchResult, compute_batch, group_packages
+from workout_tracker import TRAINING_TYPES
+
+CHUNK_ROWS = 1 << 20
+MANIFEST = 'manifest.json'
+FORMATS = ('npy', 'parquet')
+RESULT_COLUMNS = ('distance', 'speed', 'calories')
+
+
+def input_columns() -> Tuple[str, ...]:
+    """Constructor fields of all registered workout types."""
+    fields: List[str] = []
+    for workout in TRAINING_TYPES.values():
+        fields.extend(field for field in workout.fields
+                      if field not in fields)
+    return tuple(fields)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError('The parquet format requires pyarrow.') from exc
+    return pyarrow
+
+
+class ColumnWriter:
+    """Write calculated sessions to a columnar dataset."""
+
+    def __init__(self, directory: str, chunk_rows: int = CHUNK_ROWS,
+                 fmt: str = 'npy') -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"The '{fmt}' export format is not supported.")
+        if fmt == 'parquet':
+            _pyarrow()
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.format = fmt
+        self.inputs = input_columns()
+        self.columns = ('training_type',) + self.inputs + RESULT_COLUMNS
+        self.training_types: List[str] = []
+        self.chunks: List[int] = []
+        self._pending: Dict[str, List[np.ndarray]] = {
+            name: [] for name in self.columns}
+        self._pending_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self) -> 'ColumnWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _type_index(self, training_type: str) -> int:
+        if training_type not in self.training_types:
+            self.training_types.append(training_type)
+        return self.training_types.index(training_type)
+
+    def write_batch(self, workout_type: str,
+                    columns: Dict[str, Sequence[float]],
+                    result: Optional[BatchResult] = None) -> None:
+        """Write sessions of one type given as input columns.
+
+        ``result`` is calculated with ``compute_batch`` when omitted.
+        """
+        if result is None:
+            result = compute_batch(workout_type, columns)
+        rows = len(result.duration)
+        index = self._type_index(
+            TRAINING_TYPES[workout_type].training_class.__name__)
+        chunk = {'training_type': np.full(rows, index, np.uint8)}
+        for name in self.inputs:
+            chunk[name] = (np.asarray(columns[name], dtype=np.float64)
+                           if name in columns else np.full(rows, np.nan))
+        for name in RESULT_COLUMNS:
+            chunk[name] = getattr(result, name)
+        self._append(chunk, rows)
+
+    def write_packages(self, packages: Iterable[Package]) -> None:
+        """Calculate and write packages, keeping their order.
+
+        Packages are calculated per workout type and their rows are
+        scattered back to the input positions.
+        """
+        packages = list(packages)
+        rows = len(packages)
+        chunk = {'training_type': np.empty(rows, np.uint8)}
+        for name in self.inputs + RESULT_COLUMNS:
+            chunk[name] = np.full(rows, np.nan)
+        for workout_type, (positions, columns) in group_packages(
+                packages).items():
+            result = compute_batch(workout_type, columns)
+            chunk['training_type'][positions] = self._type_index(
+                TRAINING_TYPES[workout_type].training_class.__name__)
+            for name, values in columns.items():
+                chunk[name][positions] = values
+            for name in RESULT_COLUMNS:
+                chunk[name][positions] = getattr(result, name)
+        self._append(chunk, rows)
+
+    def _append(self, chunk: Dict[str, np.ndarray], rows: int) -> None:
+        for name, values in chunk.items():
+            self._pending[name].append(values)
+        self._pending_rows += rows
+        while self._pending_rows >= self.chunk_rows:
+            self._flush(self.chunk_rows)
+
+    def _flush(self, rows: int) -> None:
+        chunk: Dict[str, np.ndarray] = {}
+        for name, parts in self._pending.items():
+            values = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            chunk[name] = values[:rows]
+            self._pending[name] = [values[rows:]] if len(values) > rows else []
+        self._pending_rows -= rows
+        prefix = os.path.join(self.directory, f'chunk-{len(self.chunks):05d}')
+        if self.format == 'npy':
+            for name, values in chunk.items():
+                np.save(f'{prefix}.{name}.npy', values)
+        else:
+            pyarrow = _pyarrow()
+            pyarrow.parquet.write_table(
+                pyarrow.table(chunk), f'{prefix}.parquet')
+        self.chunks.append(rows)
+
+    def close(self) -> None:
+        """Write the remaining rows and the manifest."""
+        if self._pending_rows:
+            self._flush(self._pending_rows)
+        manifest = {
+            'format': self.format,
+            'columns': {
+                name: 'uint8' if name == 'training_type' else 'float64'
+                for name in self.columns
+            },
+            'training_types': self.training_types,
+            'chunks': self.chunks,
+        }
+        with open(os.path.join(self.directory, MANIFEST), 'w',
+                  encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def iter_chunks(directory: str, columns: Optional[Sequence[str]] = None,
+                mmap: bool = False) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the chunks of a dataset as dicts of column arrays.
+
+    With ``mmap`` the ``npy`` files are memory-mapped instead of read.
+    """
+    manifest = read_manifest(directory)
+    names = list(columns or manifest['columns'])
+    for number in range(len(manifest['chunks'])):
+        prefix = os.path.join(directory, f'chunk-{number:05d}')
+        if manifest['format'] == 'npy':
+            yield {name: np.load(f'{prefix}.{name}.npy',
+                                 mmap_mode='r' if mmap else None)
+                   for name in names}
+        else:
+            table = _pyarrow().parquet.read_table(
+                f'{prefix}.parquet', columns=names)
+            yield {name: table.column(name).to_numpy() for name in names}
+
+
+def read_columns(directory: str,
+                 columns: Optional[Sequence[str]] = None
+                 ) -> Dict[str, np.ndarray]:
+    """Read whole columns of a dataset."""
+    dtypes = read_manifest(directory)['columns']
+    chunks = list(iter_chunks(directory, columns))
+    return {
+        name: (np.concatenate([chunk[name] for chunk in chunks])
+               if chunks else np.empty(0, dtype=dtypes[name]))
+        for name in columns or dtypes
+    }
+
+
+def training_type_names(directory: str, codes: np.ndarray) -> List[str]:
+    """Turn a ``training_type`` column into workout class names."""
+    names = read_manifest(directory)['training_types']
+    return [names[code] for code in codes.tolist()]
@@ -0,0 +1,211 @@
+"""Opt-in timing of the pipeline stages.
+
+``enable()`` replaces the stage functions with timed wrappers everywhere
+they are referenced, and ``disable()`` puts the originals back, so the
+instrumentation costs nothing while it is off. Timings are inclusive: the
+``main`` stage also contains the ``show_training_info`` and
+``get_message`` calls it makes.
+
+    with instrumented() as stats:
+        streaming.process(source, target)
+    print(stats.dump_text())
+
+``profile(path)`` runs a block under ``cProfile`` and writes the profile
+file for ``pstats`` or snakeviz.
+"""
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import workout_tracker
+
+Stage = Tuple[str, object, str]
+
+
+class StageStats:
+    """Counter and latency histogram of one stage.
+
+    Bucket ``i`` counts calls that took from ``2 ** (i - 1)`` up to
+    ``2 ** i`` nanoseconds.
+    """
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.buckets: List[int] = [0] * 64
+
+    def record(self, elapsed_ns: int) -> None:
+        if not self.count or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), 63)] += 1
+
+    def quantile(self, fraction: float) -> int:
+        """Upper bound of the bucket holding the quantile, ns."""
+        threshold = fraction * self.count
+        seen = 0
+        for index, amount in enumerate(self.buckets):
+            seen += amount
+            if amount and seen >= threshold:
+                return min(2 ** index, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'min_ns': self.min_ns,
+            'max_ns': self.max_ns,
+            'p50_ns': self.quantile(0.5),
+            'p99_ns': self.quantile(0.99),
+            'histogram': {str(2 ** index): amount
+                          for index, amount in enumerate(self.buckets)
+                          if amount},
+        }
+
+
+class Stats:
+    """Statistics of all stages since ``start``."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.started = time.perf_counter()
+        self.stopped: Optional[float] = None
+
+    def stage(self, name: str) -> StageStats:
+        if name not in self.stages:
+            self.stages[name] = StageStats()
+        return self.stages[name]
+
+    @property
+    def seconds(self) -> float:
+        end = self.stopped if self.stopped is not None else (
+            time.perf_counter())
+        return end - self.started
+
+    def to_dict(self) -> dict:
+        seconds = self.seconds
+        return {
+            'seconds': seconds,
+            'stages': {
+                name: dict(stage.to_dict(),
+                           per_second=stage.count / seconds if seconds else 0)
+                for name, stage in self.stages.items()
+            },
+        }
+
+    def dump_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def dump_text(self) -> str:
+        seconds = self.seconds
+        lines = [f'{"stage":24} {"count":>10} {"total ms":>10} '
+                 f'{"mean us":>9} {"p50 us":>9} {"p99 us":>9} '
+                 f'{"per s":>11}']
+        for name, stage in self.stages.items():
+            mean = stage.total_ns / stage.count if stage.count else 0
+            rate = stage.count / seconds if seconds else 0
+            lines.append(
+                f'{name:24} {stage.count:10} {stage.total_ns / 1e6:10.1f} '
+                f'{mean / 1e3:9.2f} {stage.quantile(0.5) / 1e3:9.2f} '
+                f'{stage.quantile(0.99) / 1e3:9.2f} {rate:11.0f}')
+        return '\n'.join(lines)
+
+
+def _timed(function: Callable, stage: StageStats) -> Callable:
+    clock = time.perf_counter_ns
+    record = stage.record
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(clock() - start)
+    wrapper.__instrumented__ = function
+    return wrapper
+
+
+def stages() -> List[Stage]:
+    """Return ``(stage name, owner, attribute)`` of the timed stages."""
+    result = [
+        ('read_package', workout_tracker, 'read_package'),
+        ('show_training_info', workout_tracker.Training,
+         'show_training_info'),
+        ('get_message', workout_tracker.InfoMessage, 'get_message'),
+        ('main', workout_tracker, 'main'),
+    ]
+    streaming = sys.modules.get('tracker.streaming')
+    if streaming is not None:
+        result.append(('parse_line', streaming, 'parse_line'))
+    return result
+
+
+_active: Optional[Stats] = None
+_patched: List[Tuple[object, str, Callable]] = []
+
+
+def enable() -> Stats:
+    """Start timing the stages and return the statistics object."""
+    global _active
+    if _active is not None:
+        return _active
+    stats = Stats()
+    for name, owner, attribute in stages():
+        original = getattr(owner, attribute)
+        wrapper = _timed(original, stats.stage(name))
+        # Modules that imported the function by name get the wrapper too.
+        owners = [owner] + [
+            module for module in list(sys.modules.values())
+            if module is not owner
+            and getattr(module, attribute, None) is original
+        ]
+        for target in owners:
+            setattr(target, attribute, wrapper)
+            _patched.append((target, attribute, original))
+    _active = stats
+    return stats
+
+
+def disable() -> Optional[Stats]:
+    """Restore the original functions and return the statistics."""
+    global _active
+    while _patched:
+        target, attribute, original = _patched.pop()
+        setattr(target, attribute, original)
+    stats, _active = _active, None
+    if stats is not None:
+        stats.stopped = time.perf_counter()
+    return stats
+
+
+@contextmanager
+def instrumented() -> Iterator[Stats]:
+    stats = enable()
+    try:
+        yield stats
+    finally:
+        disable()
+
+
+@contextmanager
+def profile(path: str) -> Iterator[cProfile.Profile]:
+    """Run the block under ``cProfile`` and write the profile to a file."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,145 @@
+"""Live workouts fed by per-tick sensor deltas.
+
+A live session keeps the running totals of a workout (steps or strokes,
+elapsed seconds and, for swimming, pool laps) as the constructor
+arguments of its registered workout type. A tick adds to the totals in
+O(1), and ``info()`` calculates the message from them with the workout
+class itself, so it is identical to
+``read_package(...).show_training_info()`` for the same totals and to
+the ``tracker.batch`` result. Every type in ``TRAINING_TYPES`` whose
+constructor takes ``action`` and ``duration`` arguments can be followed
+live; other types are rejected with ``ValueError`` when a session starts.
+
+Sessions use ``__slots__``, so thousands of concurrent sessions take
+little memory. ``LiveTracker`` keeps them by session id.
+"""
+from typing import Dict, Hashable, List, Tuple
+
+from workout_tracker import InfoMessage, get_workout_type, read_package
+
+SECONDS_IN_HOUR = 3600
+# Constructor fields that count up during a workout like ``action``; the
+# other fields, such as the weight, are given when the session starts.
+COUNTERS = frozenset({'count_pool'})
+
+# Per workout type: the index of ``action``, of ``duration`` and of the
+# other counters among the constructor fields.
+_Plan = Tuple[int, int, Tuple[int, ...]]
+_plans: Dict[object, _Plan] = {}
+
+
+def _plan(workout) -> _Plan:
+    plan = _plans.get(workout)
+    if plan is None:
+        fields = workout.fields
+        missing = [field for field in ('action', 'duration')
+                   if field not in fields]
+        if missing:
+            names = ' and '.join(repr(field) for field in missing)
+            raise ValueError(
+                f"The '{workout.code}' workout type can not be followed "
+                f'live: its constructor has no {names} argument.')
+        plan = _plans[workout] = (
+            fields.index('action'), fields.index('duration'),
+            tuple(index for index, field in enumerate(fields)
+                  if field in COUNTERS))
+    return plan
+
+
+class LiveSession:
+    """Totals of a workout in progress.
+
+    ``profile`` holds the fixed values of the workout in constructor
+    order: the weight, plus the height for walking or the pool length
+    for swimming.
+    """
+    __slots__ = ('code', 'seconds', 'values', '_plan')
+
+    def __init__(self, workout_type: str, *profile: float) -> None:
+        workout = get_workout_type(workout_type)
+        plan = _plan(workout)
+        action, duration, counters = plan
+        fixed = [index for index in range(workout.arity)
+                 if index not in (action, duration, *counters)]
+        if len(profile) != len(fixed):
+            names = ', '.join(workout.fields[index] for index in fixed)
+            raise ValueError(
+                f"The '{workout_type}' workout type starts with "
+                f'{len(fixed)} values ({names}), got {len(profile)}.')
+        values: List[float] = [0] * workout.arity
+        values[duration] = 0.0
+        for index, value in zip(fixed, profile):
+            values[index] = value
+        self.code = workout_type
+        self.seconds = 0.0
+        self.values = values
+        self._plan = plan
+
+    def tick(self, action: int = 0, seconds: float = 1.0,
+             *counts: int) -> None:
+        """Add the steps or strokes of the last ``seconds`` seconds.
+
+        ``counts`` are added to the other counters, e.g. the finished
+        laps of a swimming session.
+        """
+        action_index, duration_index, counters = self._plan
+        values = self.values
+        values[action_index] += action
+        self.seconds += seconds
+        values[duration_index] = self.seconds / SECONDS_IN_HOUR
+        for index, count in zip(counters, counts):
+            values[index] += count
+
+    @property
+    def duration(self) -> float:
+        """Elapsed time in hours."""
+        return self.seconds / SECONDS_IN_HOUR
+
+    def info(self) -> InfoMessage:
+        """Return the message of the workout as of the last tick.
+
+        Before any time has passed the speed and calories are 0.
+        """
+        training = read_package(*self.package())
+        if not self.seconds:
+            return InfoMessage(training.__class__.__name__, 0.0,
+                               training.get_distance(), 0.0, 0.0)
+        return training.show_training_info()
+
+    def package(self) -> Tuple[str, List[float]]:
+        """Return the ``(workout_type, data)`` package of the totals."""
+        return self.code, list(self.values)
+
+
+def start_session(workout_type: str, *profile: float) -> LiveSession:
+    """Start a live session of a type code."""
+    return LiveSession(workout_type, *profile)
+
+
+class LiveTracker:
+    """Live sessions by id."""
+
+    def __init__(self) -> None:
+        self.sessions: Dict[Hashable, LiveSession] = {}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def start(self, session_id: Hashable, workout_type: str,
+              *profile: float) -> LiveSession:
+        if session_id in self.sessions:
+            raise ValueError(f'The session {session_id!r} is already live.')
+        session = self.sessions[session_id] = start_session(
+            workout_type, *profile)
+        return session
+
+    def tick(self, session_id: Hashable, *deltas: float) -> None:
+        """Pass the deltas of a tick to ``LiveSession.tick``."""
+        self.sessions[session_id].tick(*deltas)
+
+    def info(self, session_id: Hashable) -> InfoMessage:
+        return self.sessions[session_id].info()
+
+    def finish(self, session_id: Hashable) -> InfoMessage:
+        """End a session and return its final message."""
+        return self.sessions.pop(session_id).info()
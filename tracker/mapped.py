@@ -0,0 +1,98 @@
+"""Memory-mapped access to archives of binary packages.
+
+An archive is a file of ``tracker.wire`` records. The file is mapped
+into memory instead of being read, so the operating system loads only
+the pages that are actually touched.
+"""
+import mmap
+from typing import Iterator, Optional, Sequence, Tuple
+
+from tracker import wire
+
+
+class MappedArchive:
+    """Lazy reader of a binary session archive.
+
+    Supports iteration, ``len()``, random access by record index and
+    NumPy column slices for ``tracker.batch``. Arrays returned by
+    ``columns`` point into the mapping and must be released before the
+    archive is closed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map: Optional[mmap.mmap] = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped.
+            self._map = None
+        self._view = memoryview(self._map if self._map is not None else b'')
+        self._offsets: Optional[Sequence[int]] = None
+
+    def __enter__(self) -> 'MappedArchive':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        """Byte offsets of all records, found on first use.
+
+        Archives of one workout type get a ``range``; others are scanned
+        once into an ``array('q')``.
+        """
+        if self._offsets is None:
+            layout = wire.uniform_layout(self._view)
+            if layout is not None:
+                self._offsets = range(0, len(self._view), layout.packer.size)
+            else:
+                self._offsets = wire.scan_offsets(self._view)
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> wire.Package:
+        offsets = self.offsets
+        package, _ = wire.decode(self._view, offsets[index])
+        return package
+
+    def __iter__(self) -> Iterator[wire.Package]:
+        return wire.iter_decode(self._view)
+
+    def _offset(self, index: int) -> int:
+        offsets = self.offsets
+        return offsets[index] if index < len(offsets) else len(self._view)
+
+    def span(self, start: int, stop: int) -> Tuple[int, int]:
+        """Return the byte range of the records ``start:stop``."""
+        return self._offset(start), self._offset(stop)
+
+    def iter_span(self, begin: int, end: int) -> Iterator[wire.Package]:
+        """Yield the packages of a byte range returned by ``span``.
+
+        Only the range is decoded, the record index is not built.
+        """
+        return wire.iter_decode(self._view[begin:end])
+
+    def columns(self, start: int = 0, stop: Optional[int] = None):
+        """Return the records ``start:stop`` as per-type columns.
+
+        The result has the layout of ``tracker.wire.read_columns`` with
+        positions counted from ``start``. Archives holding one workout
+        type are viewed without copying.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return {}
+        return wire.read_columns(
+            self._view[self._offset(start):self._offset(stop)])
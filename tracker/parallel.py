@@ -0,0 +1,82 @@
+"""Multi-core calculation of large package batches."""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from tracker import Package
+from workout_tracker import InfoMessage, read_package
+
+CHUNK_SIZE = 10_000
+SERIAL_THRESHOLD = 50_000
+
+InfoValues = Tuple[str, float, float, float, float]
+
+
+class Throughput(NamedTuple):
+    """Statistics of one run."""
+    records: int
+    seconds: float
+    workers: int
+
+    @property
+    def per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+
+def score_chunk(packages: Sequence[Package]) -> List[InfoValues]:
+    """Calculate a chunk of packages.
+
+    Plain tuples are returned instead of ``InfoMessage`` objects because
+    they are cheaper to send between processes.
+    """
+    result = []
+    for workout_type, data in packages:
+        info = read_package(workout_type, data).show_training_info()
+        result.append((info.training_type, info.duration, info.distance,
+                       info.speed, info.calories))
+    return result
+
+
+def _chunks(packages: Sequence[Package],
+            chunk_size: int) -> List[Sequence[Package]]:
+    return [packages[start:start + chunk_size]
+            for start in range(0, len(packages), chunk_size)]
+
+
+def score_parallel(packages: Iterable[Package],
+                   workers: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE,
+                   ordered: bool = True,
+                   serial_threshold: int = SERIAL_THRESHOLD
+                   ) -> Tuple[List[InfoMessage], Throughput]:
+    """Calculate packages on several processes.
+
+    Packages are sent to the pool in chunks of ``chunk_size`` so that
+    pickling is paid per chunk rather than per package. With
+    ``ordered=False`` chunks are collected as soon as they are ready and
+    the output order is not defined. Inputs shorter than
+    ``serial_threshold`` are calculated in the current process, where
+    they finish before a pool would start.
+    """
+    packages = list(packages)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1 or len(packages) < serial_threshold:
+        workers = 1
+        values = score_chunk(packages)
+    else:
+        values = []
+        chunks = _chunks(packages, chunk_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            if ordered:
+                for part in executor.map(score_chunk, chunks):
+                    values.extend(part)
+            else:
+                futures = [executor.submit(score_chunk, chunk)
+                           for chunk in chunks]
+                for future in as_completed(futures):
+                    values.extend(future.result())
+    messages = [InfoMessage(*item) for item in values]
+    seconds = time.perf_counter() - start
+    return messages, Throughput(len(messages), seconds, workers)
@@ -0,0 +1,262 @@
+"""Threaded ingestion of many sensor logs at once.
+
+Reading and parsing logs is bound by I/O, so a pool of reader threads
+parses several files at the same time and feeds chunks of packages into
+a bounded queue. One compute thread calculates the chunks, package by
+package (``serial``) or with ``tracker.batch`` (``batch``), and hands the
+results to a writer thread through a second bounded queue. Full queues
+block the stages before them, so memory use is bounded by the queue
+depths whatever the input size.
+
+The first error in any stage stops all stages and is raised by
+``Pipeline.run``. Packages of one file keep their order; chunks of
+different files are interleaved in arrival order.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from tracker.sinks import SINKS, Sink, open_sink
+from tracker.streaming import iter_packages
+
+READERS = 4
+CHUNK_ROWS = 4096
+QUEUE_SIZE = 8
+MODES = ('serial', 'batch')
+# How often blocked stages check whether the pipeline was stopped.
+POLL = 0.05
+
+_DONE = object()
+
+
+class Cancelled(Exception):
+    """Raised in a stage when another stage failed."""
+
+
+class QueueStats:
+    """Traffic and waiting time of one queue."""
+    __slots__ = ('puts', 'gets', 'put_wait', 'get_wait', 'max_depth')
+
+    def __init__(self) -> None:
+        self.puts = self.gets = self.max_depth = 0
+        self.put_wait = self.get_wait = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MeteredQueue:
+    """Bounded queue that records how long producers and consumers wait.
+
+    ``put`` and ``get`` give up with ``Cancelled`` once ``stop`` is set.
+    """
+
+    def __init__(self, maxsize: int, stop: threading.Event) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.stop = stop
+        self.stats = QueueStats()
+        self._lock = threading.Lock()
+
+    def put(self, item) -> None:
+        if self.stop.is_set():
+            raise Cancelled
+        start = time.perf_counter()
+        while True:
+            try:
+                self.queue.put(item, timeout=POLL)
+                break
+            except queue.Full:
+                if self.stop.is_set():
+                    raise Cancelled from None
+        waited = time.perf_counter() - start
+        depth = self.queue.qsize()
+        with self._lock:
+            stats = self.stats
+            stats.puts += 1
+            stats.put_wait += waited
+            stats.max_depth = max(stats.max_depth, depth)
+
+    def get(self):
+        if self.stop.is_set():
+            raise Cancelled
+        start = time.perf_counter()
+        while True:
+            try:
+                item = self.queue.get(timeout=POLL)
+                break
+            except queue.Empty:
+                if self.stop.is_set():
+                    raise Cancelled from None
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.stats.gets += 1
+            self.stats.get_wait += waited
+        return item
+
+
+class PipelineStats:
+    """Statistics of one run."""
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.queues: Dict[str, QueueStats] = {}
+
+    @property
+    def per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {'records': self.records, 'chunks': self.chunks,
+                'seconds': self.seconds,
+                'queues': {name: stats.to_dict()
+                           for name, stats in self.queues.items()}}
+
+
+def _serial(chunk: list):
+    from workout_tracker import read_package
+
+    return [read_package(workout_type, data).show_training_info()
+            for workout_type, data in chunk]
+
+
+def _batch(chunk: list):
+    from tracker.batch import compute_packages
+
+    return compute_packages(chunk)
+
+
+class Pipeline:
+    """Reader pool, compute stage and writer stage joined by queues."""
+
+    def __init__(self, readers: int = READERS, mode: str = 'batch',
+                 chunk_rows: int = CHUNK_ROWS,
+                 queue_size: int = QUEUE_SIZE,
+                 result_queue_size: Optional[int] = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"The '{mode}' compute mode is not supported.")
+        self.readers = readers
+        self.mode = mode
+        self.chunk_rows = chunk_rows
+        self.queue_size = queue_size
+        self.result_queue_size = result_queue_size or queue_size
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def _guard(self, stage: Callable, *args) -> None:
+        """Run a stage, stopping the others when it fails."""
+        try:
+            stage(*args)
+        except Cancelled:
+            pass
+        except BaseException as exc:
+            self._errors.append(exc)
+            self._stop.set()
+
+    def _read(self, source: str, chunks: MeteredQueue) -> None:
+        with open(source, encoding='utf-8') as file:
+            packages = iter_packages(file)
+            while not self._stop.is_set():
+                chunk = list(islice(packages, self.chunk_rows))
+                if not chunk:
+                    return
+                chunks.put(chunk)
+
+    def _compute(self, chunks: MeteredQueue, results: MeteredQueue,
+                 stats: PipelineStats) -> None:
+        calculate = _batch if self.mode == 'batch' else _serial
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                results.put(_DONE)
+                return
+            results.put(calculate(chunk))
+            stats.records += len(chunk)
+            stats.chunks += 1
+
+    def _write(self, results: MeteredQueue, sink: Sink) -> None:
+        batch = self.mode == 'batch'
+        while True:
+            result = results.get()
+            if result is _DONE:
+                sink.flush()
+                return
+            if batch:
+                sink.write_columns(*result)
+            else:
+                sink.write_many(result)
+
+    def run(self, sources: Iterable[str], sink: Sink) -> PipelineStats:
+        """Calculate all sources and write the results to ``sink``."""
+        self._stop.clear()
+        self._errors.clear()
+        stats = PipelineStats()
+        chunks = MeteredQueue(self.queue_size, self._stop)
+        results = MeteredQueue(self.result_queue_size, self._stop)
+        stats.queues = {'chunks': chunks.stats, 'results': results.stats}
+        start = time.perf_counter()
+        stages = [
+            threading.Thread(target=self._guard, name='tracker-compute',
+                             args=(self._compute, chunks, results, stats)),
+            threading.Thread(target=self._guard, name='tracker-writer',
+                             args=(self._write, results, sink)),
+        ]
+        for thread in stages:
+            thread.start()
+        try:
+            with ThreadPoolExecutor(
+                    self.readers, thread_name_prefix='tracker-reader') as pool:
+                for source in sources:
+                    pool.submit(self._guard, self._read, source, chunks)
+            self._guard(chunks.put, _DONE)
+        except BaseException:
+            # E.g. KeyboardInterrupt: make the stages give up.
+            self._stop.set()
+            raise
+        finally:
+            for thread in stages:
+                thread.join()
+        stats.seconds = time.perf_counter() - start
+        if self._errors:
+            raise self._errors[0]
+        return stats
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Calculate many sensor logs with reader threads.')
+    parser.add_argument('inputs', nargs='+', help='log files')
+    parser.add_argument('-o', '--output', default='-',
+                        help="result file, '-' for stdout")
+    parser.add_argument('-f', '--format', choices=sorted(SINKS),
+                        default='text')
+    parser.add_argument('--readers', type=int, default=READERS,
+                        help='files read at the same time')
+    parser.add_argument('--mode', choices=MODES, default='batch')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help='chunks waiting between stages')
+    parser.add_argument('--stats', action='store_true',
+                        help='print queue statistics to stderr as JSON')
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(args.readers, args.mode, args.chunk_rows,
+                        args.queue_size)
+    with open_sink(args.format, args.output) as sink:
+        stats = pipeline.run(args.inputs, sink)
+    if args.stats:
+        print(json.dumps(stats.to_dict()), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""Per-user scoring with precomputed calorie coefficients.
+
+For one user the weight and height rarely change, so everything in the
+calorie formulas that depends only on them and on the class constants
+is multiplied out once per profile. Expanding the formulas with
+``speed = distance / duration`` leaves per session:
+
+========  ===================================================
+type      calories
+========  ===================================================
+Running   ``distance * run_distance + duration * run_duration``
+Walking   ``duration * walk_duration
+          + distance * distance / duration * walk_speed``
+Swimming  ``length_pool * count_pool * swim_pool
+          + duration * swim_duration``
+========  ===================================================
+
+Results match the workout classes up to floating point rounding, as the
+operations happen in a different order. Setting ``weight`` or
+``height`` drops the coefficients; they are calculated again on the
+next use.
+"""
+from typing import (Callable, Dict, Hashable, NamedTuple, Optional,
+                    Sequence)
+
+from workout_tracker import (InfoMessage, Running, SportsWalking, Swimming,
+                             get_workout_type)
+
+# Distance in km of one step or stroke.
+RUN_STEP = Running.LEN_STEP / Running.M_IN_KM
+WALK_STEP = SportsWalking.LEN_STEP / SportsWalking.M_IN_KM
+SWIM_STEP = Swimming.LEN_STEP / Swimming.M_IN_KM
+
+
+class Coefficients(NamedTuple):
+    """Per-profile factors of the calorie formulas."""
+    run_distance: float
+    run_duration: float
+    walk_duration: float
+    walk_speed: Optional[float]
+    swim_pool: float
+    swim_duration: float
+
+
+class UserProfile:
+    """Weight and height of a user with their calorie coefficients."""
+    __slots__ = ('weight', 'height', '_coefficients')
+
+    def __init__(self, weight: float, height: Optional[float] = None) -> None:
+        self.weight = weight
+        self.height = height
+
+    def __setattr__(self, name, value):
+        """Drop the coefficients whenever the profile changes."""
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            object.__setattr__(self, '_coefficients', None)
+
+    @property
+    def coefficients(self) -> Coefficients:
+        coefficients = self._coefficients
+        if coefficients is None:
+            coefficients = self._calculate()
+            object.__setattr__(self, '_coefficients', coefficients)
+        return coefficients
+
+    def _calculate(self) -> Coefficients:
+        weight = self.weight
+        run = Running
+        run_factor = weight / run.M_IN_KM * run.H_M
+        walk = SportsWalking
+        walk_speed = None
+        if self.height is not None:
+            walk_speed = (walk.KMH_MS**2 / (self.height / walk.CM_M)
+                          * walk.COEF_W_2 * weight * walk.H_M)
+        swim = Swimming
+        return Coefficients(
+            run_distance=run.CALORIES_MEAN_SPEED_MULTIPLIER * run_factor,
+            run_duration=run.CALORIES_MEAN_SPEED_SHIFT * run_factor,
+            walk_duration=walk.COEF_W_1 * weight * walk.H_M,
+            walk_speed=walk_speed,
+            swim_pool=swim.COEF_CAL * weight / swim.M_IN_KM,
+            swim_duration=swim.COEF_SP * swim.COEF_CAL * weight,
+        )
+
+    def running(self, action: int, duration: float) -> InfoMessage:
+        coefficients = self.coefficients
+        distance = action * RUN_STEP
+        return InfoMessage(
+            Running.__name__, duration, distance, distance / duration,
+            distance * coefficients.run_distance
+            + duration * coefficients.run_duration)
+
+    def sports_walking(self, action: int, duration: float) -> InfoMessage:
+        coefficients = self.coefficients
+        if coefficients.walk_speed is None:
+            raise ValueError('Sports walking needs the height of the user.')
+        distance = action * WALK_STEP
+        speed = distance / duration
+        return InfoMessage(
+            SportsWalking.__name__, duration, distance, speed,
+            duration * coefficients.walk_duration
+            + distance * speed * coefficients.walk_speed)
+
+    def swimming(self, action: int, duration: float, length_pool: float,
+                 count_pool: int) -> InfoMessage:
+        coefficients = self.coefficients
+        pool = length_pool * count_pool
+        return InfoMessage(
+            Swimming.__name__, duration, action * SWIM_STEP,
+            pool / Swimming.M_IN_KM / duration,
+            pool * coefficients.swim_pool
+            + duration * coefficients.swim_duration)
+
+    def score(self, workout_type: str, data: Sequence[float]) -> InfoMessage:
+        """Calculate a package, first updating the profile from it.
+
+        The weight (and, for walking, the height) in the package replaces
+        the one of the profile when they differ. Registered types without
+        a formula here are calculated with their workout class.
+        """
+        workout = get_workout_type(workout_type)
+        if len(data) != workout.arity:
+            raise ValueError(
+                f"The '{workout_type}' workout type expects "
+                f'{workout.arity} values, got {len(data)}.')
+        formula = _FORMULAS.get(workout.training_class)
+        if formula is None:
+            return workout.create(data).show_training_info()
+        return formula(self, *data)
+
+    def _score_running(self, action, duration, weight) -> InfoMessage:
+        if weight != self.weight:
+            self.weight = weight
+        return self.running(action, duration)
+
+    def _score_sports_walking(self, action, duration, weight,
+                              height) -> InfoMessage:
+        if weight != self.weight:
+            self.weight = weight
+        if height != self.height:
+            self.height = height
+        return self.sports_walking(action, duration)
+
+    def _score_swimming(self, action, duration, weight, length_pool,
+                        count_pool) -> InfoMessage:
+        if weight != self.weight:
+            self.weight = weight
+        return self.swimming(action, duration, length_pool, count_pool)
+
+
+# Workout class: the method scoring its constructor arguments. Other
+# classes, subclasses included, are calculated with the class itself.
+_FORMULAS: Dict[type, Callable[..., InfoMessage]] = {
+    Running: UserProfile._score_running,
+    SportsWalking: UserProfile._score_sports_walking,
+    Swimming: UserProfile._score_swimming,
+}
+
+
+class ProfileScorer:
+    """Score packages of many users, keeping a profile per user."""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[Hashable, UserProfile] = {}
+
+    def score(self, user: Hashable, workout_type: str,
+              data: Sequence[float]) -> InfoMessage:
+        profile = self.profiles.get(user)
+        if profile is None:
+            profile = self.profiles[user] = UserProfile(data[2])
+        return profile.score(workout_type, data)
@@ -0,0 +1,255 @@
+"""Asyncio service receiving live sensor packages.
+
+Clients send packages as lines in the ``tracker.streaming`` log format
+over TCP or a Unix socket and get one JSON line per package back, in the
+order of the requests: the ``InfoMessage`` fields or ``{"error": ...}``.
+
+Packages of all connections are collected into micro-batches of up to
+``batch_size`` packages, waiting no longer than ``max_latency`` seconds
+for a batch to fill, and calculated in an executor so the event loop
+keeps serving connections. The shared queue is bounded: when it is full,
+connections stop reading until the calculations catch up.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import Executor
+from typing import List, Optional, Sequence, Tuple
+
+from tracker.sinks import format_json
+from tracker.streaming import Package, parse_line
+from workout_tracker import InfoMessage, read_package
+
+BATCH_SIZE = 256
+MAX_LATENCY = 0.005
+QUEUE_SIZE = 4096
+
+Result = Tuple[bool, str]
+
+
+def score_packages(packages: Sequence[Package]) -> List[Result]:
+    """Calculate packages, reporting failures per package.
+
+    Returns ``(True, json_line)`` for calculated packages and
+    ``(False, reason)`` for the ones that could not be calculated.
+    """
+    results = []
+    for workout_type, data in packages:
+        try:
+            info = read_package(workout_type, data).show_training_info()
+        except (ValueError, TypeError, ZeroDivisionError) as exc:
+            results.append((False, str(exc)))
+        else:
+            results.append((True, format_json(info)))
+    return results
+
+
+class IngestServer:
+    """Micro-batching server for sensor packages."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE,
+                 max_latency: float = MAX_LATENCY,
+                 queue_size: int = QUEUE_SIZE,
+                 executor: Optional[Executor] = None) -> None:
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.queue_size = queue_size
+        self.executor = executor
+        self.processed = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1',
+                    port: int = 0) -> asyncio.AbstractServer:
+        """Listen on a TCP port, 0 picks a free one."""
+        self._start_batcher()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """Listen on a Unix socket."""
+        self._start_batcher()
+        self._server = await asyncio.start_unix_server(self._handle, path)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    def _start_batcher(self) -> None:
+        self._queue = asyncio.Queue(self.queue_size)
+        self._batcher = asyncio.get_running_loop().create_task(
+            self._run_batches())
+
+    async def submit(self, package: Package) -> Result:
+        """Queue one package and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((package, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_latency
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            # asyncio.wait_for may swallow a cancellation that arrives
+            # together with the item, which left close() waiting forever.
+            getter = loop.create_task(queue.get())
+            try:
+                await asyncio.wait((getter,), timeout=timeout)
+            finally:
+                getter.cancel()
+            if not getter.done():
+                break
+            batch.append(getter.result())
+        return batch
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            packages = [package for package, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, score_packages, packages)
+            except Exception as exc:
+                results = [(False, str(exc))] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self.processed += len(batch)
+            self.batches += 1
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        pending: asyncio.Queue = asyncio.Queue(self.batch_size)
+        responder = asyncio.get_running_loop().create_task(
+            self._respond(pending, writer))
+        try:
+            async for line in reader:
+                request = self._request(line.decode('utf-8'))
+                if not await self._put(pending, request, responder):
+                    request.cancel()
+                    break
+            else:
+                if await self._put(pending, None, responder):
+                    await responder
+        except ConnectionError:
+            pass
+        finally:
+            # The client may be gone: stop answering and drop the requests
+            # nobody is waiting for any more.
+            responder.cancel()
+            while not pending.empty():
+                request = pending.get_nowait()
+                if request is not None:
+                    request.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _put(pending: asyncio.Queue, request: Optional[asyncio.Future],
+                   responder: asyncio.Task) -> bool:
+        """Queue a request for the responder.
+
+        Returns False, without waiting any longer, once the responder has
+        stopped because the client disconnected.
+        """
+        if responder.done():
+            return False
+        if not pending.full():
+            pending.put_nowait(request)
+            return True
+        put = asyncio.ensure_future(pending.put(request))
+        await asyncio.wait((put, responder),
+                           return_when=asyncio.FIRST_COMPLETED)
+        if put.done():
+            return True
+        put.cancel()
+        return False
+
+    def _request(self, line: str) -> 'asyncio.Future[Result]':
+        try:
+            package = parse_line(line)
+        except ValueError as exc:
+            package, error = None, str(exc)
+        else:
+            error = 'Empty package.' if package is None else None
+        if error is not None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result((False, error))
+            return future
+        return asyncio.ensure_future(self.submit(package))
+
+    async def _respond(self, pending: asyncio.Queue,
+                       writer: asyncio.StreamWriter) -> None:
+        while True:
+            request = await pending.get()
+            if request is None:
+                return
+            ok, payload = await request
+            line = payload if ok else json.dumps({'error': payload})
+            writer.write(line.encode('utf-8') + b'\n')
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return
+
+
+def info_from_json(line: str) -> InfoMessage:
+    """Rebuild an ``InfoMessage`` from a response line."""
+    return InfoMessage(**json.loads(line))
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = IngestServer(args.batch_size, args.max_latency, args.queue_size)
+    if args.unix:
+        listener = await server.start_unix(args.unix)
+    else:
+        listener = await server.start(args.host, args.port)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Receive sensor packages over a socket.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Unix socket path instead of TCP')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--max-latency', type=float, default=MAX_LATENCY)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""Sharded scoring of a binary archive on worker processes.
+
+The coordinator splits a ``tracker.wire`` archive into shards of
+consecutive records and hands them to workers that connect to it over a
+TCP socket. A worker maps the archive itself, calculates every package
+of a shard with ``read_package`` and sends back per-type ``Totals``;
+the coordinator merges them. Invalid packages are left out and reported
+as ``tracker.validation`` rejects. Shards of workers that fail,
+disconnect or time out are handed to another worker, up to ``retries``
+more times; errors caused by the data itself fail the job right away.
+
+Messages are JSON lines. The coordinator sends ``{"shard": 3, "path":
+..., "start": ..., "begin": ..., "end": ...}`` (the first record and the
+byte range of the archive) or ``{"stop": true}``; the worker answers
+``{"shard": 3, "totals": {"Running": [count, ...]}, "rejects": [...]}``
+or ``{"shard": 3, "error": "...", "retry": false}``. Workers must see
+the archive at the same path, e.g. on the same machine or a shared file
+system.
+"""
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from tracker.aggregation import Totals
+from tracker.mapped import MappedArchive
+from tracker.validation import Reject, check_package
+from workout_tracker import read_package
+
+SHARD_ROWS = 100_000
+RETRIES = 2
+SHARD_TIMEOUT = 300.0
+# How often idle connections check whether the job has finished.
+POLL = 0.05
+
+Address = Tuple[str, int]
+
+
+class Shard(NamedTuple):
+    """Records ``start:stop`` of an archive, at bytes ``begin:end``."""
+    number: int
+    start: int
+    stop: int
+    begin: int
+    end: int
+
+
+class JobResult(NamedTuple):
+    """Merged totals of a job and how it went."""
+    totals: Dict[str, Totals]
+    records: int
+    shards: int
+    retries: int
+    seconds: float
+    rejects: List[Reject]
+
+
+def plan_shards(archive: MappedArchive,
+                shard_rows: int = SHARD_ROWS) -> List[Shard]:
+    """Split an archive into shards of ``shard_rows`` records."""
+    shards = []
+    for start in range(0, len(archive), shard_rows):
+        stop = min(start + shard_rows, len(archive))
+        shards.append(Shard(len(shards), start, stop,
+                            *archive.span(start, stop)))
+    return shards
+
+
+def score_shard(archive: MappedArchive, begin: int, end: int,
+                rejects: Optional[list] = None,
+                start: int = 0) -> Dict[str, Totals]:
+    """Calculate the packages of a byte range into per-type totals.
+
+    Invalid packages are left out; with a ``rejects`` list they are
+    appended to it as ``Reject`` records, counting positions from
+    ``start``.
+    """
+    totals: Dict[str, Totals] = {}
+    for position, (workout_type, data) in enumerate(
+            archive.iter_span(begin, end), start):
+        reason = check_package(workout_type, data)
+        if reason is not None:
+            if rejects is not None:
+                rejects.append(Reject(position, workout_type, data, reason))
+            continue
+        info = read_package(workout_type, data).show_training_info()
+        entry = totals.get(info.training_type)
+        if entry is None:
+            entry = totals[info.training_type] = Totals()
+        entry.add(info.duration, info.distance, info.speed, info.calories)
+    return totals
+
+
+def _send(file, message: dict) -> None:
+    file.write(json.dumps(message).encode() + b'\n')
+    file.flush()
+
+
+def _receive(file) -> Optional[dict]:
+    line = file.readline()
+    return json.loads(line) if line else None
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    coordinator: 'Coordinator'
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        coordinator = self.server.coordinator
+        self.request.settimeout(coordinator.shard_timeout)
+        while True:
+            shard = coordinator._next_shard()
+            if shard is None:
+                try:
+                    _send(self.wfile, {'stop': True})
+                except OSError:
+                    pass
+                return
+            try:
+                _send(self.wfile, {'shard': shard.number,
+                                   'path': coordinator.path,
+                                   'start': shard.start,
+                                   'begin': shard.begin, 'end': shard.end})
+                reply = _receive(self.rfile)
+            except (OSError, ValueError) as exc:
+                coordinator._failed(shard, f'connection lost: {exc}')
+                return
+            if reply is None:
+                coordinator._failed(shard, 'worker disconnected')
+                return
+            if 'error' in reply:
+                coordinator._failed(shard, reply['error'],
+                                    reply.get('retry', True))
+                continue
+            coordinator._done(shard, reply['totals'], reply['rejects'])
+
+
+class Coordinator:
+    """Hand out the shards of an archive and merge the results."""
+
+    def __init__(self, path: str, shard_rows: int = SHARD_ROWS,
+                 retries: int = RETRIES, address: Address = ('127.0.0.1', 0),
+                 shard_timeout: float = SHARD_TIMEOUT) -> None:
+        self.path = path
+        self.retries = retries
+        self.shard_timeout = shard_timeout
+        with MappedArchive(path) as archive:
+            self.records = len(archive)
+            self.shards = plan_shards(archive, shard_rows)
+        self._pending: queue.Queue = queue.Queue()
+        for shard in self.shards:
+            self._pending.put(shard)
+        self._attempts = [0] * len(self.shards)
+        self._results: Dict[int, Tuple[dict, list]] = {}
+        self._retried = 0
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not self.shards:
+            self._finished.set()
+        self._server = _Server(address, _Handler)
+        self._server.coordinator = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Address:
+        return self._server.server_address[:2]
+
+    def __enter__(self) -> 'Coordinator':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start accepting workers in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='tracker-coordinator',
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._finished.set()
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def _next_shard(self) -> Optional[Shard]:
+        while not self._finished.is_set():
+            try:
+                return self._pending.get(timeout=POLL)
+            except queue.Empty:
+                pass
+        return None
+
+    def _done(self, shard: Shard, totals: dict, rejects: list) -> None:
+        with self._lock:
+            self._results[shard.number] = totals, rejects
+            if len(self._results) == len(self.shards):
+                self._finished.set()
+
+    def _failed(self, shard: Shard, reason: str, retry: bool = True) -> None:
+        with self._lock:
+            self._attempts[shard.number] += 1
+            if not retry:
+                self._error = f'Shard {shard.number} failed: {reason}'
+                self._finished.set()
+                return
+            if self._attempts[shard.number] > self.retries:
+                self._error = (f'Shard {shard.number} failed '
+                               f'{self._attempts[shard.number]} times, '
+                               f'last error: {reason}')
+                self._finished.set()
+                return
+            self._retried += 1
+        self._pending.put(shard)
+
+    def run(self, timeout: Optional[float] = None) -> JobResult:
+        """Wait until every shard is calculated and merge the results.
+
+        Raises ``RuntimeError`` when a shard fails too often or because
+        of its data and ``TimeoutError`` when the job does not finish
+        within ``timeout``.
+        """
+        start = time.perf_counter()
+        if self._thread is None:
+            self.start()
+        if not self._finished.wait(timeout):
+            raise TimeoutError(
+                f'{len(self._results)} of {len(self.shards)} shards were '
+                f'calculated in {timeout} seconds.')
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        totals: Dict[str, Totals] = {}
+        rejects: List[Reject] = []
+        for number in range(len(self.shards)):
+            shard_totals, shard_rejects = self._results[number]
+            for training_type, values in shard_totals.items():
+                totals.setdefault(training_type, Totals()).merge(
+                    Totals(*values))
+            rejects.extend(Reject(*reject) for reject in shard_rejects)
+        return JobResult(totals, self.records, len(self.shards),
+                         self._retried, time.perf_counter() - start, rejects)
+
+
+def run_worker(address: Address) -> int:
+    """Calculate shards from a coordinator until it says stop.
+
+    Returns the number of calculated shards.
+    """
+    archives: Dict[str, MappedArchive] = {}
+    count = 0
+    try:
+        with socket.create_connection(address) as connection, \
+                connection.makefile('rb') as reader, \
+                connection.makefile('wb') as writer:
+            while True:
+                message = _receive(reader)
+                if message is None or message.get('stop'):
+                    return count
+                reply: dict = {'shard': message['shard']}
+                try:
+                    path = message['path']
+                    if path not in archives:
+                        archives[path] = MappedArchive(path)
+                    rejects: List[Reject] = []
+                    totals = score_shard(archives[path], message['begin'],
+                                         message['end'], rejects,
+                                         message['start'])
+                    reply['totals'] = {name: entry.to_list()
+                                       for name, entry in totals.items()}
+                    reply['rejects'] = [list(reject) for reject in rejects]
+                except ValueError as exc:
+                    # Broken records fail on every worker.
+                    reply['error'] = f'{type(exc).__name__}: {exc}'
+                    reply['retry'] = False
+                except Exception as exc:
+                    reply['error'] = f'{type(exc).__name__}: {exc}'
+                _send(writer, reply)
+                count += 1
+    finally:
+        for archive in archives.values():
+            archive.close()
+
+
+def spawn_workers(address: Address, count: int) -> List[subprocess.Popen]:
+    """Start ``count`` worker processes on this machine."""
+    host, port = address
+    return [subprocess.Popen([sys.executable, '-m', 'tracker.shard',
+                              'worker', f'{host}:{port}'])
+            for _ in range(count)]
+
+
+def _address(value: str) -> Address:
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Score a binary archive on worker processes.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinate = commands.add_parser(
+        'coordinate', help='split an archive and merge the results')
+    coordinate.add_argument('archive', help='tracker.wire archive')
+    coordinate.add_argument('--listen', type=_address,
+                            default=('127.0.0.1', 0), help='HOST:PORT')
+    coordinate.add_argument('--workers', type=int, default=2,
+                            help='local workers to start, 0 to only wait '
+                                 'for remote ones')
+    coordinate.add_argument('--shard-rows', type=int, default=SHARD_ROWS)
+    coordinate.add_argument('--retries', type=int, default=RETRIES)
+    coordinate.add_argument('--timeout', type=float,
+                            help='give up after this many seconds')
+    coordinate.add_argument('--rejects',
+                            help='write invalid packages to a file')
+    worker = commands.add_parser('worker', help='calculate shards')
+    worker.add_argument('address', type=_address, help='HOST:PORT')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        run_worker(args.address)
+        return 0
+
+    with Coordinator(args.archive, args.shard_rows, args.retries,
+                     args.listen) as coordinator:
+        coordinator.start()
+        host, port = coordinator.address
+        print(f'Coordinator listening on {host}:{port}', file=sys.stderr)
+        processes = spawn_workers(coordinator.address, args.workers)
+        try:
+            result = coordinator.run(args.timeout)
+        finally:
+            coordinator.close()
+            for process in processes:
+                process.wait()
+    if args.rejects:
+        with open(args.rejects, 'w', encoding='utf-8') as rejects:
+            for reject in result.rejects:
+                rejects.write(reject.to_json() + '\n')
+    print(json.dumps({
+        'records': result.records, 'shards': result.shards,
+        'retries': result.retries, 'seconds': result.seconds,
+        'rejects': len(result.rejects),
+        'totals': {name: totals.to_list()
+                   for name, totals in result.totals.items()},
+    }))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
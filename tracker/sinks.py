@@ -0,0 +1,164 @@
+"""Buffered destinations for workout results.
+
+A sink formats ``InfoMessage`` objects, or the columns produced by
+``tracker.batch``, and writes them to a text stream in large blocks
+instead of one write per record. Any object with a ``write`` method can
+be a target: ``sys.stdout``, an open file or a ``StringIO``.
+"""
+import json
+import sys
+from typing import IO, Iterable, List, Optional, Sequence
+
+from tracker.formatting import MESSAGE_TEMPLATE, format_messages
+from workout_tracker import InfoMessage
+
+BUFFER_SIZE = 1 << 16
+
+FIELDS = ('training_type', 'duration', 'distance', 'speed', 'calories')
+
+
+class Sink:
+    """Base class of sinks writing one line per workout.
+
+    Without a ``target`` the sink writes to the ``sys.stdout`` of the
+    moment of flushing. ``close_target`` closes the target with the sink.
+    """
+    header: Optional[str] = None
+
+    def __init__(self, target: Optional[IO[str]] = None,
+                 buffer_size: int = BUFFER_SIZE,
+                 close_target: bool = False) -> None:
+        self.target = target
+        self.buffer_size = buffer_size
+        self.close_target = close_target
+        self.count = 0
+        self._parts: List[str] = []
+        self._size = 0
+        if self.header is not None:
+            self._append(self.header)
+
+    def format(self, training_type: str, duration: float, distance: float,
+               speed: float, calories: float) -> str:
+        """Return the line of one workout without the line break."""
+        raise NotImplementedError('The format method '
+                                  'is overridden in child classes.')
+
+    def format_info(self, info: InfoMessage) -> str:
+        return self.format(info.training_type, info.duration,
+                           info.distance, info.speed, info.calories)
+
+    def _append(self, line: str) -> None:
+        self._parts.append(line)
+        self._size += len(line) + 1
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def write(self, info: InfoMessage) -> None:
+        self._append(self.format_info(info))
+        self.count += 1
+
+    def write_many(self, infos: Iterable[InfoMessage]) -> None:
+        for info in infos:
+            self.write(info)
+
+    def write_columns(self, training_types: Sequence[str],
+                      columns: Sequence[Sequence[float]]) -> None:
+        """Write workouts given as columns.
+
+        ``columns`` holds the duration, distance, speed and calories
+        columns, for example a ``tracker.batch.BatchResult``.
+        """
+        values = [getattr(column, 'tolist', lambda: column)()
+                  for column in columns]
+        fmt = self.format
+        for row in zip(training_types, *values):
+            self._append(fmt(*row))
+            self.count += 1
+
+    def flush(self) -> None:
+        """Write the buffered lines to the target."""
+        if self._parts:
+            target = self.target if self.target is not None else sys.stdout
+            target.write('\n'.join(self._parts) + '\n')
+            self._parts.clear()
+            self._size = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self.close_target and self.target is not None:
+            self.target.close()
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class TextSink(Sink):
+    """Lines produced by ``InfoMessage.get_message``."""
+
+    def format(self, training_type, duration, distance, speed, calories):
+        return MESSAGE_TEMPLATE % (training_type, duration, distance, speed,
+                                   calories)
+
+    def format_info(self, info: InfoMessage) -> str:
+        return info.get_message()
+
+    def write_columns(self, training_types, columns):
+        for line in format_messages(training_types, columns):
+            self._append(line)
+        self.count += len(training_types)
+
+
+class CsvSink(Sink):
+    """Comma separated values with a header line."""
+    header = ','.join(FIELDS)
+
+    def format(self, training_type, duration, distance, speed, calories):
+        return (f'{training_type},{duration!r},{distance!r},'
+                f'{speed!r},{calories!r}')
+
+
+class JsonLinesSink(Sink):
+    """One JSON object per line."""
+
+    def format(self, training_type, duration, distance, speed, calories):
+        return format_json_values(training_type, duration, distance,
+                                  speed, calories)
+
+
+def format_json_values(training_type: str, duration: float,
+                       distance: float, speed: float,
+                       calories: float) -> str:
+    """Render workout values as a JSON object without building a dict.
+
+    The output equals ``json.dumps`` of the corresponding dict for finite
+    numbers.
+    """
+    return (f'{{"training_type": {json.dumps(training_type)}, '
+            f'"duration": {duration!r}, "distance": {distance!r}, '
+            f'"speed": {speed!r}, "calories": {calories!r}}}')
+
+
+def format_json(info: InfoMessage) -> str:
+    return format_json_values(info.training_type, info.duration,
+                              info.distance, info.speed, info.calories)
+
+
+SINKS = {
+    'text': TextSink,
+    'csv': CsvSink,
+    'json': JsonLinesSink,
+}
+
+
+def open_sink(fmt: str = 'text', path: Optional[str] = None,
+              buffer_size: int = BUFFER_SIZE) -> Sink:
+    """Create a sink writing to a file, or to stdout without ``path``."""
+    if fmt not in SINKS:
+        raise ValueError(f"The '{fmt}' output format is not supported.")
+    if path is None or path == '-':
+        return SINKS[fmt](None, buffer_size)
+    return SINKS[fmt](open(path, 'w', encoding='utf-8'), buffer_size,
+                      close_target=True)
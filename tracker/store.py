@@ -0,0 +1,210 @@
+"""Embedded time-series store of calculated sessions.
+
+Sessions are kept in SQLite, clustered by user and start time, so that a
+range query for one user reads a contiguous part of the table. Every
+insert also updates per-day rollups (one row per user, day and workout
+type) in the same transaction; ``totals`` answers range queries from the
+rollups for whole days and reads raw sessions only for the partial days
+at the ends of the range.
+
+Times are seconds since the epoch (UTC), ranges are ``[start, stop)``
+and workout types are class names as in ``InfoMessage``.
+"""
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from tracker.aggregation import DAY, Totals
+from workout_tracker import InfoMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    user TEXT NOT NULL,
+    start REAL NOT NULL,
+    training_type TEXT NOT NULL,
+    duration REAL NOT NULL,
+    distance REAL NOT NULL,
+    speed REAL NOT NULL,
+    calories REAL NOT NULL,
+    PRIMARY KEY (user, start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    user TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    training_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    distance REAL NOT NULL,
+    speed REAL NOT NULL,
+    calories REAL NOT NULL,
+    PRIMARY KEY (user, day, training_type)
+) WITHOUT ROWID;
+"""
+
+_INSERT = 'INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)'
+_ROLLUP = """
+INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user, day, training_type) DO UPDATE SET
+    count = count + excluded.count,
+    duration = duration + excluded.duration,
+    distance = distance + excluded.distance,
+    speed = speed + excluded.speed,
+    calories = calories + excluded.calories
+"""
+_TOTALS = ('COUNT(*), TOTAL(duration), TOTAL(distance), TOTAL(speed), '
+           'TOTAL(calories)')
+_SUMS = ('TOTAL(count), TOTAL(duration), TOTAL(distance), TOTAL(speed), '
+         'TOTAL(calories)')
+
+
+class Session(NamedTuple):
+    """A stored session."""
+    user: str
+    start: float
+    training_type: str
+    duration: float
+    distance: float
+    speed: float
+    calories: float
+
+    def info(self) -> InfoMessage:
+        return InfoMessage(self.training_type, self.duration, self.distance,
+                           self.speed, self.calories)
+
+
+def day_start(timestamp: float) -> int:
+    """Return the start of the UTC day holding the timestamp."""
+    return int(timestamp // DAY) * DAY
+
+
+def _totals(row: tuple) -> Totals:
+    count, *values = row
+    return Totals(int(count), *values)
+
+
+def _type_filter(training_type: Optional[str]) -> Tuple[str, tuple]:
+    if training_type is None:
+        return '', ()
+    return ' AND training_type = ?', (training_type,)
+
+
+class SessionStore:
+    """Sessions and per-day rollups in a SQLite database."""
+
+    def __init__(self, path: str = ':memory:') -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        if path != ':memory:':
+            self.connection.execute('PRAGMA journal_mode = WAL')
+            self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'SessionStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add(self, user: str, start: float, info: InfoMessage) -> None:
+        """Store the result of ``Training.show_training_info``."""
+        self.add_many([(user, start, info.training_type, info.duration,
+                        info.distance, info.speed, info.calories)])
+
+    def add_many(self, sessions: Iterable[Sequence]) -> int:
+        """Store many sessions in one transaction.
+
+        ``sessions`` holds rows in the field order of ``Session``. Returns
+        the number of stored sessions. Nothing is stored when a user
+        already has a session with the same start time.
+        """
+        rows = []
+        rollups: Dict[tuple, List[float]] = {}
+        for user, start, training_type, *metrics in sessions:
+            rows.append((user, start, training_type, *metrics))
+            key = (user, day_start(start), training_type)
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = [1, *metrics]
+            else:
+                rollup[0] += 1
+                for i, value in enumerate(metrics, 1):
+                    rollup[i] += value
+        try:
+            with self.connection:
+                self.connection.executemany(_INSERT, rows)
+                self.connection.executemany(
+                    _ROLLUP, [(*key, *values)
+                              for key, values in rollups.items()])
+        except sqlite3.IntegrityError as exc:
+            raise ValueError('A user already has a session starting at '
+                             'the same time.') from exc
+        return len(rows)
+
+    def add_columns(self, users: Sequence[str], starts: Sequence[float],
+                    training_types: Sequence[str],
+                    columns: Sequence[Sequence[float]]) -> int:
+        """Store sessions given as columns, e.g. a ``BatchResult``."""
+        values = [column.tolist() if hasattr(column, 'tolist') else column
+                  for column in (starts, *columns)]
+        return self.add_many(zip(users, values[0], training_types,
+                                 *values[1:]))
+
+    def add_packages(self, users: Sequence[str], starts: Sequence[float],
+                     packages: Iterable[Tuple[str, List[float]]]) -> int:
+        """Calculate packages with ``tracker.batch`` and store them."""
+        from tracker.batch import compute_packages
+
+        names, result = compute_packages(packages)
+        return self.add_columns(users, starts, names, result)
+
+    def sessions(self, user: str, start: float, stop: float,
+                 training_type: Optional[str] = None) -> List[Session]:
+        """Sessions of a user starting in the range, oldest first."""
+        where, args = _type_filter(training_type)
+        cursor = self.connection.execute(
+            'SELECT * FROM sessions WHERE user = ? AND start >= ? '
+            f'AND start < ?{where} ORDER BY start',
+            (user, start, stop, *args))
+        return [Session(*row) for row in cursor]
+
+    def _raw_totals(self, user: str, start: float, stop: float,
+                    training_type: Optional[str]) -> Totals:
+        where, args = _type_filter(training_type)
+        row = self.connection.execute(
+            f'SELECT {_TOTALS} FROM sessions WHERE user = ? AND start >= ? '
+            f'AND start < ?{where}', (user, start, stop, *args)).fetchone()
+        return _totals(row)
+
+    def totals(self, user: str, start: float, stop: float,
+               training_type: Optional[str] = None) -> Totals:
+        """Totals of the sessions of a user starting in the range."""
+        first = -int(-start // DAY) * DAY
+        last = day_start(stop)
+        if first >= last:
+            return self._raw_totals(user, start, stop, training_type)
+        where, args = _type_filter(training_type)
+        row = self.connection.execute(
+            f'SELECT {_SUMS} FROM daily WHERE user = ? AND day >= ? '
+            f'AND day < ?{where}', (user, first, last, *args)).fetchone()
+        result = _totals(row)
+        result.merge(self._raw_totals(user, start, first, training_type))
+        result.merge(self._raw_totals(user, last, stop, training_type))
+        return result
+
+    def daily(self, user: str, start: float, stop: float,
+              training_type: Optional[str] = None) -> List[Tuple[int, Totals]]:
+        """Return ``(day start, totals)`` of the days overlapping the
+        range that have sessions, oldest first.
+        """
+        where, args = _type_filter(training_type)
+        cursor = self.connection.execute(
+            f'SELECT day, {_SUMS} FROM daily WHERE user = ? AND day >= ? '
+            f'AND day < ?{where} GROUP BY day ORDER BY day',
+            (user, day_start(start), stop, *args))
+        return [(day, _totals(row)) for day, *row in cursor]
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM sessions').fetchone()[0]
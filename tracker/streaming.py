@@ -0,0 +1,170 @@
+"""Streaming processing of newline-delimited sensor logs.
+
+Every line of a log holds one package, either as a JSON array
+``["RUN", [15000, 1, 75]]`` or as whitespace separated values
+``RUN 15000 1 75``. Blank lines and lines starting with ``#`` are
+skipped. Files are read in large chunks and every stage is a generator,
+so memory use does not depend on the size of the input.
+"""
+import argparse
+import json
+import sys
+from contextlib import ExitStack
+from typing import IO, Iterable, Iterator, List, Optional, Sequence
+
+from tracker import Package
+from tracker.sinks import SINKS
+from tracker.validation import iter_valid
+from workout_tracker import InfoMessage, Training, read_package
+
+CHUNK_SIZE = 1 << 20
+
+
+def parse_line(line: str) -> Optional[Package]:
+    """Turn one log line into a ``(workout_type, data)`` package."""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('['):
+        workout_type, data = json.loads(line)
+        return workout_type, data
+    workout_type, *values = line.split()
+    return workout_type, [float(value) for value in values]
+
+
+def read_chunks(source: IO[str],
+                chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """Yield lists of lines holding about ``chunk_size`` characters."""
+    while True:
+        lines = source.readlines(chunk_size)
+        if not lines:
+            return
+        yield lines
+
+
+def iter_packages(source: IO[str],
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[Package]:
+    """Yield the packages of a log file one by one."""
+    number = 0
+    for lines in read_chunks(source, chunk_size):
+        for line in lines:
+            number += 1
+            try:
+                package = parse_line(line)
+            except ValueError as exc:
+                raise ValueError(
+                    f'Line {number} is not a valid package: {exc}') from exc
+            if package is not None:
+                yield package
+
+
+def iter_trainings(packages: Iterable[Package]) -> Iterator[Training]:
+    """Create a workout for every package."""
+    for workout_type, data in packages:
+        yield read_package(workout_type, data)
+
+
+def iter_info(trainings: Iterable[Training]) -> Iterator[InfoMessage]:
+    """Calculate the information message of every workout."""
+    for training in trainings:
+        yield training.show_training_info()
+
+
+def process(source: IO[str], target: IO[str], fmt: str = 'text',
+            chunk_size: int = CHUNK_SIZE, cache=None,
+            rejects: Optional[IO[str]] = None) -> int:
+    """Process a whole log and write one line per workout.
+
+    ``fmt`` is one of the ``tracker.sinks.SINKS`` formats. Output is
+    written in blocks of ``chunk_size`` characters or more. With a
+    ``tracker.cache.ResultCache`` repeated packages are not calculated
+    again. With ``rejects`` invalid packages are written there as JSON
+    lines with the reason instead of stopping the run. Returns the number
+    of processed packages.
+    """
+    sink = SINKS[fmt](target, chunk_size)
+    packages = iter_packages(source, chunk_size)
+    if rejects is not None:
+        packages = iter_valid(
+            packages, lambda reject: rejects.write(reject.to_json() + '\n'))
+    if cache is None:
+        sink.write_many(iter_info(iter_trainings(packages)))
+    else:
+        sink.write_many(cache.get_info(workout_type, data)
+                        for workout_type, data in packages)
+    sink.flush()
+    return sink.count
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         prog: Optional[str] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Calculate workouts from a sensor log.')
+    parser.add_argument('input', help="log file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-',
+                        help="result file, '-' for stdout")
+    parser.add_argument('-f', '--format', choices=sorted(SINKS),
+                        default='text')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--stats',
+                        help="write stage timings to a file, '-' for stderr")
+    parser.add_argument('--stats-format', choices=('text', 'json'),
+                        default='text')
+    parser.add_argument('--profile', help='write a cProfile file')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='remember results of this many packages')
+    parser.add_argument('--cache-file',
+                        help='load the result cache from and save it to')
+    parser.add_argument('--rejects',
+                        help="write invalid packages to a file, "
+                             "'-' for stderr")
+    args = parser.parse_args(argv)
+
+    source = (sys.stdin if args.input == '-'
+              else open(args.input, encoding='utf-8',
+                        buffering=args.chunk_size))
+    target = (sys.stdout if args.output == '-'
+              else open(args.output, 'w', encoding='utf-8',
+                        buffering=args.chunk_size))
+    stats = cache = None
+    if args.cache_size or args.cache_file:
+        from tracker.cache import MAXSIZE, ResultCache
+        cache = ResultCache.open(args.cache_file,
+                                 args.cache_size or MAXSIZE)
+    try:
+        with ExitStack() as stack:
+            rejects = None
+            if args.rejects == '-':
+                rejects = sys.stderr
+            elif args.rejects:
+                rejects = stack.enter_context(
+                    open(args.rejects, 'w', encoding='utf-8'))
+            if args.profile:
+                from tracker.instrument import profile
+                stack.enter_context(profile(args.profile))
+            if args.stats:
+                from tracker.instrument import instrumented
+                stats = stack.enter_context(instrumented())
+            process(source, target, args.format, args.chunk_size, cache,
+                    rejects)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    if cache is not None and args.cache_file:
+        cache.save(args.cache_file)
+    if stats is not None:
+        dump = (stats.dump_json() if args.stats_format == 'json'
+                else stats.dump_text())
+        if args.stats == '-':
+            print(dump, file=sys.stderr)
+        else:
+            with open(args.stats, 'w', encoding='utf-8') as file:
+                file.write(dump + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Validation of sensor packages before calculation.
+
+Bad packages would otherwise fail deep inside the formulas, for example
+with ``ZeroDivisionError`` for a zero ``duration`` or ``height``, and
+abort a whole batch. The checks here route them to a reject stream with
+a reason and let valid packages through.
+
+Every value must be a finite number; the fields below also have lower
+bounds. Fields of other registered types are only checked for being
+finite.
+"""
+import json
+import math
+from numbers import Real
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Sequence, Tuple)
+
+from tracker import Package
+from workout_tracker import (TRAINING_TYPES, UnsupportedWorkoutType,
+                             get_workout_type)
+
+
+# Field: (lower bound, whether the bound itself is allowed).
+RULES: Dict[str, Tuple[float, bool]] = {
+    'action': (0.0, True),
+    'duration': (0.0, False),
+    'weight': (0.0, False),
+    'height': (0.0, False),
+    'length_pool': (0.0, False),
+    'count_pool': (0.0, True),
+}
+
+
+class Reject(NamedTuple):
+    """A package that did not pass validation."""
+    position: int
+    workout_type: str
+    data: list
+    reason: str
+
+    def to_json(self) -> str:
+        return json.dumps({'position': self.position,
+                           'workout_type': self.workout_type,
+                           'data': self.data, 'reason': self.reason},
+                          default=str)
+
+
+def _lookup(workout_type: str):
+    """Return the registered type, or None for unknown and unhashable
+    type codes.
+    """
+    try:
+        return get_workout_type(workout_type)
+    except UnsupportedWorkoutType:
+        return None
+
+
+def check_package(workout_type: str, data: Sequence[float]) -> Optional[str]:
+    """Return why a package is invalid, or None for a valid package."""
+    try:
+        workout = get_workout_type(workout_type)
+    except UnsupportedWorkoutType as exc:
+        return str(exc)
+    try:
+        size = len(data)
+    except TypeError:
+        return 'The package data must be a list of numbers.'
+    if size != workout.arity:
+        return (f"The '{workout_type}' workout type expects "
+                f'{workout.arity} values, got {size}.')
+    for field, value in zip(workout.fields, data):
+        reason = _check_value(field, value)
+        if reason is not None:
+            return reason
+    return None
+
+
+def _check_value(field: str, value) -> Optional[str]:
+    """Return why a single value is invalid, or None for a valid one."""
+    if not isinstance(value, Real):
+        return f'{field} must be a number, got {value!r}.'
+    if not math.isfinite(value):
+        return f'{field} must be finite, got {value!r}.'
+    if field in RULES:
+        bound, inclusive = RULES[field]
+        if value < bound or (value == bound and not inclusive):
+            sign = '>=' if inclusive else '>'
+            return f'{field} must be {sign} {bound:g}, got {value!r}.'
+    return None
+
+
+def valid_rows(workout_type: str, matrix):
+    """Return the mask of valid rows of a ``rows x fields`` float array.
+
+    The whole group is checked with a few NumPy operations.
+    """
+    import numpy as np
+
+    fields = TRAINING_TYPES[workout_type].fields
+    mask = np.isfinite(matrix).all(axis=1)
+    for column, field in enumerate(fields):
+        if field in RULES:
+            bound, inclusive = RULES[field]
+            values = matrix[:, column]
+            mask &= values >= bound if inclusive else values > bound
+    return mask
+
+
+def group_valid(packages: Sequence[Package]):
+    """Group valid packages into per-type columns, rejecting the others.
+
+    The arity of every package is checked in Python while grouping;
+    values are checked per workout type with vectorized operations, and
+    the exact reason is only worked out for the rows that failed.
+
+    Returns the groups in the layout of ``tracker.batch.group_packages``
+    with positions counted among the valid packages only, the number of
+    valid packages and the rejects ordered by position.
+    """
+    import numpy as np
+
+    rejects: List[Reject] = []
+    rows: Dict[str, list] = {}
+    positions: Dict[str, List[int]] = {}
+    for position, (workout_type, data) in enumerate(packages):
+        workout = _lookup(workout_type)
+        if (workout is None or not hasattr(data, '__len__')
+                or len(data) != workout.arity):
+            rejects.append(Reject(position, workout_type, data,
+                                  check_package(workout_type, data)))
+            continue
+        rows.setdefault(workout_type, []).append(data)
+        positions.setdefault(workout_type, []).append(position)
+
+    kept = {}
+    for workout_type, data in rows.items():
+        where = np.asarray(positions[workout_type], dtype=np.intp)
+        try:
+            matrix = np.array(data)
+        except ValueError:
+            # Nested sequences of different shapes among the values.
+            matrix = None
+        if (matrix is not None and matrix.ndim == 2
+                and matrix.dtype.kind in 'biuf'):
+            matrix = matrix.astype(np.float64, copy=False)
+            mask = valid_rows(workout_type, matrix)
+        else:
+            # Strings, sequences or other objects somewhere in the group.
+            mask = np.array([check_package(workout_type, row) is None
+                             for row in data], dtype=bool)
+            matrix = np.array([row if ok else [np.nan] * len(row)
+                               for row, ok in zip(data, mask)],
+                              dtype=np.float64)
+        for row in np.flatnonzero(~mask).tolist():
+            rejects.append(Reject(positions[workout_type][row], workout_type,
+                                  data[row],
+                                  check_package(workout_type, data[row])))
+        kept[workout_type] = (where[mask], matrix[mask])
+
+    order = np.sort(np.concatenate(
+        [where for where, _ in kept.values()] or [np.empty(0, np.intp)]))
+    groups = {}
+    for workout_type, (where, matrix) in kept.items():
+        fields = TRAINING_TYPES[workout_type].fields
+        groups[workout_type] = (
+            np.searchsorted(order, where),
+            {field: matrix[:, i] for i, field in enumerate(fields)},
+        )
+    rejects.sort(key=lambda reject: reject.position)
+    return groups, len(order), rejects
+
+
+def split_packages(
+        packages: Iterable[Package]) -> Tuple[List[Package], List[Reject]]:
+    """Separate valid packages from rejected ones, keeping the order."""
+    packages = list(packages)
+    _, _, rejects = group_valid(packages)
+    rejected = {reject.position for reject in rejects}
+    valid = [package for position, package in enumerate(packages)
+             if position not in rejected]
+    return valid, rejects
+
+
+def iter_valid(packages: Iterable[Package],
+               on_reject: Callable[[Reject], None]) -> Iterator[Package]:
+    """Yield valid packages one by one, passing the others to a callback."""
+    for position, (workout_type, data) in enumerate(packages):
+        reason = check_package(workout_type, data)
+        if reason is None:
+            yield workout_type, data
+        else:
+            on_reject(Reject(position, workout_type, data, reason))
@@ -0,0 +1,238 @@
+"""Compact binary format for sensor packages.
+
+A record is one tag byte followed by the constructor arguments of the
+workout as little-endian ``float64`` values, without padding:
+
+===== ===== =======================================================
+type  tag   fields
+===== ===== =======================================================
+SWM   ``S`` action, duration, weight, length_pool, count_pool (41 B)
+RUN   ``R`` action, duration, weight (25 B)
+WLK   ``W`` action, duration, weight, height (33 B)
+===== ===== =======================================================
+
+Other registered workout types are encoded the same way, with the tag
+given to ``workout_tracker.register``: the first letter of their code
+unless another one was chosen. A file is a plain concatenation of records.
+``frombuffer`` and ``read_columns`` give NumPy views over the raw bytes
+so that the batch path can calculate whole files without parsing
+individual records.
+"""
+import struct
+from array import array
+from typing import (BinaryIO, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple, Union)
+
+from tracker import Package
+from workout_tracker import TRAINING_TYPES, UnsupportedWorkoutType
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class Layout(NamedTuple):
+    """Record layout of one workout type."""
+    code: str
+    tag: int
+    fields: Tuple[str, ...]
+    packer: struct.Struct
+
+
+_layouts_cache: Dict[tuple, Tuple[Dict[str, Layout], Dict[int, Layout]]] = {}
+
+
+def layouts() -> Tuple[Dict[str, Layout], Dict[int, Layout]]:
+    """Return the layouts of all registered types by code and by tag.
+
+    The tag of a type is the one given to ``workout_tracker.register``.
+    """
+    key = tuple(TRAINING_TYPES)
+    if key not in _layouts_cache:
+        by_code: Dict[str, Layout] = {}
+        by_tag: Dict[int, Layout] = {}
+        for code, workout in TRAINING_TYPES.items():
+            layout = Layout(code, workout.tag, workout.fields,
+                            struct.Struct('<B' + 'd' * workout.arity))
+            by_code[code] = by_tag[workout.tag] = layout
+        _layouts_cache.clear()
+        _layouts_cache[key] = by_code, by_tag
+    return _layouts_cache[key]
+
+
+def _layout(workout_type: str) -> Layout:
+    by_code, _ = layouts()
+    if workout_type not in by_code:
+        raise UnsupportedWorkoutType(workout_type)
+    return by_code[workout_type]
+
+
+def record_size(workout_type: str) -> int:
+    """Return the size of one record of the type in bytes."""
+    return _layout(workout_type).packer.size
+
+
+def encode(workout_type: str, data: List[float]) -> bytes:
+    """Pack one package into a record."""
+    layout = _layout(workout_type)
+    if len(data) != len(layout.fields):
+        raise ValueError(
+            f"'{workout_type}' packages must have "
+            f'{len(layout.fields)} values.')
+    return layout.packer.pack(layout.tag, *data)
+
+
+def encode_many(packages: Iterable[Package]) -> bytes:
+    return b''.join(encode(workout_type, data)
+                    for workout_type, data in packages)
+
+
+def decode(buffer: Buffer, offset: int = 0) -> Tuple[Package, int]:
+    """Unpack the record at ``offset``.
+
+    Returns the package and the offset of the next record.
+    """
+    _, by_tag = layouts()
+    tag = buffer[offset]
+    if tag not in by_tag:
+        raise ValueError(f'Unknown record tag {tag!r} at offset {offset}.')
+    layout = by_tag[tag]
+    try:
+        _, *data = layout.packer.unpack_from(buffer, offset)
+    except struct.error as exc:
+        raise ValueError(
+            f'The record at offset {offset} is truncated.') from exc
+    return (layout.code, data), offset + layout.packer.size
+
+
+def iter_decode(buffer: Buffer) -> Iterator[Package]:
+    """Yield all packages of a buffer without copying it.
+
+    The buffer is released when the iteration ends or fails, so that a
+    memory-mapped file can be closed afterwards.
+    """
+    _, by_tag = layouts()
+    with memoryview(buffer) as view:
+        offset = 0
+        end = len(view)
+        while offset < end:
+            layout = by_tag.get(view[offset])
+            if layout is None:
+                raise ValueError(f'Unknown record tag {view[offset]!r} '
+                                 f'at offset {offset}.')
+            try:
+                _, *data = layout.packer.unpack_from(view, offset)
+            except struct.error as exc:
+                raise ValueError(
+                    f'The record at offset {offset} is truncated.') from exc
+            offset += layout.packer.size
+            yield layout.code, data
+
+
+def write_packages(target: BinaryIO, packages: Iterable[Package]) -> int:
+    """Write packages as records, returning the number of records."""
+    count = 0
+    for workout_type, data in packages:
+        target.write(encode(workout_type, data))
+        count += 1
+    return count
+
+
+def scan_offsets(buffer: Buffer) -> array:
+    """Return the byte offsets of all records of a buffer, in order."""
+    view = memoryview(buffer)
+    _, by_tag = layouts()
+    sizes = {tag: layout.packer.size for tag, layout in by_tag.items()}
+    offsets = array('q')
+    append = offsets.append
+    offset = 0
+    end = len(view)
+    while offset < end:
+        size = sizes.get(view[offset])
+        if size is None:
+            raise ValueError(
+                f'Unknown record tag {view[offset]!r} at offset {offset}.')
+        append(offset)
+        offset += size
+    if offset != end:
+        raise ValueError('The buffer ends in the middle of a record.')
+    return offsets
+
+
+def uniform_layout(buffer: Buffer) -> Optional[Layout]:
+    """Return the layout of a buffer holding records of one type only.
+
+    Returns None for empty buffers and buffers of mixed or invalid
+    records. Only the bytes where the tags of such a buffer must be are
+    compared: the first record of another type would start at one of
+    them.
+    """
+    view = memoryview(buffer)
+    if not len(view):
+        return None
+    _, by_tag = layouts()
+    layout = by_tag.get(view[0])
+    if layout is None or len(view) % layout.packer.size:
+        return None
+    tags = view[::layout.packer.size].tobytes()
+    return layout if tags.count(tags[:1]) == len(tags) else None
+
+
+def record_dtype(workout_type: str):
+    """Return the NumPy structured dtype of a record."""
+    import numpy as np
+
+    return np.dtype([('tag', 'u1')]
+                    + [(field, '<f8')
+                       for field in _layout(workout_type).fields])
+
+
+def frombuffer(buffer: Buffer, workout_type: str):
+    """View a buffer holding only records of one type as an array.
+
+    No data is copied: the fields of the returned structured array point
+    into ``buffer``.
+    """
+    import numpy as np
+
+    records = np.frombuffer(buffer, dtype=record_dtype(workout_type))
+    tag = _layout(workout_type).tag
+    if len(records) and (records['tag'] != tag).any():
+        raise ValueError(
+            f"The buffer holds records other than '{workout_type}'.")
+    return records
+
+
+def read_columns(buffer: Buffer):
+    """Split a buffer of mixed records into per-type columns.
+
+    Returns a mapping of type code to the input positions of its records
+    and the columns accepted by ``tracker.batch.compute_batch``. A buffer
+    of one type is viewed without copying; otherwise the records of each
+    type are gathered into a new array.
+    """
+    import numpy as np
+
+    uniform = uniform_layout(buffer)
+    if uniform is not None:
+        records = frombuffer(buffer, uniform.code)
+        positions = np.arange(len(records))
+        return {uniform.code: (positions, _columns(records, uniform.code))}
+
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    offsets = np.frombuffer(scan_offsets(buffer), dtype=np.int64)
+    tags = raw[offsets]
+    by_code, _ = layouts()
+    result = {}
+    for workout_type, layout in by_code.items():
+        positions = np.flatnonzero(tags == layout.tag)
+        if not len(positions):
+            continue
+        starts = offsets[positions]
+        rows = raw[starts[:, None] + np.arange(layout.packer.size)]
+        records = rows.reshape(-1).view(record_dtype(workout_type))
+        result[workout_type] = (positions, _columns(records, workout_type))
+    return result
+
+
+def _columns(records, workout_type: str):
+    return {field: records[field]
+            for field in _layout(workout_type).fields}
@@ -1,5 +1,10 @@
+from operator import attrgetter
+
+
 class InfoMessage:
     """Training information."""
+    __slots__ = ('training_type', 'duration', 'distance', 'speed', 'calories')
+
     def __init__(self, training_type: str,
                  duration: float,
                  distance: float,
@@ -20,11 +25,39 @@ class InfoMessage:
                 f'Kilocalories burned: {self.calories:.3f}.')
 
 
+# ``CO_VARARGS | CO_VARKEYWORDS`` of code object flags.
+_VARIADIC = 0x04 | 0x08
+
+
+def _init_fields(training_class: type):
+    """Return the names of the constructor arguments of a workout class.
+
+    Returns None for constructors whose arguments can not be named, such
+    as ones taking ``*args``, ``**kwargs`` or keyword-only arguments.
+    The code object is read instead of importing ``inspect``, which would
+    noticeably slow down the start of the script.
+    """
+    init = getattr(training_class.__init__, '__code__', None)
+    if (init is None or init.co_flags & _VARIADIC
+            or init.co_kwonlyargcount):
+        return None
+    return init.co_varnames[1:init.co_argcount]
+
+
+def _input_getter(training_class: type):
+    """Return a getter of the constructor arguments of a workout class,
+    or None when there are none to get.
+    """
+    fields = _init_fields(training_class)
+    return attrgetter(*fields) if fields else None
+
+
 class Training:
     """Basic training class."""
     M_IN_KM = 1000
     LEN_STEP = 0.65
     H_M = 60
+    _metrics = None
 
     def __init__(self,
                  action: int,
@@ -35,6 +68,10 @@ class Training:
         self.duration = duration
         self.weight = weight
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._inputs = _input_getter(cls)
+
     def get_distance(self) -> float:
         """Get the distance in km."""
         return self.action * self.LEN_STEP / self.M_IN_KM
@@ -50,20 +87,120 @@ class Training:
         
 
     def show_training_info(self) -> InfoMessage:
-        """Return an information message about the completed workout."""
-        calories = self.get_spent_calories()
-        distance = self.get_distance()
-        speed = self.get_mean_speed()
+        """Return an information message about the completed workout.
+
+        The metrics are calculated once and kept together with the
+        constructor arguments they were calculated from; later calls
+        reuse them until one of those arguments is reassigned. Workouts
+        whose arguments can not be read back are calculated every time.
+        """
+        inputs = None
+        if self._inputs is not None:
+            try:
+                inputs = self._inputs(self)
+            except AttributeError:
+                # The arguments are stored under other names.
+                pass
+        metrics = self._metrics
+        if inputs is None or metrics is None or metrics[0] != inputs:
+            metrics = (inputs, self.get_distance(), self.get_mean_speed(),
+                       self.get_spent_calories())
+            if inputs is not None:
+                self._metrics = metrics
         # Create an object of the InfoMessage class and return it
-        return InfoMessage(
-            training_type=self.__class__.__name__,
-            duration=self.duration,
-            distance=distance,
-            speed=speed,
-            calories=calories
-        )
+        return InfoMessage(self.__class__.__name__, self.duration,
+                           *metrics[1:])
+
+
+Training._inputs = _input_getter(Training)
+
+
+class UnsupportedWorkoutType(ValueError):
+    """Raised for a package type code that is not registered."""
 
+    def __init__(self, workout_type) -> None:
+        super().__init__(
+            f"The '{workout_type}' workout type is not supported.")
+        self.workout_type = workout_type
 
+
+class WorkoutType:
+    """Registered workout type: its code, class, constructor fields and
+    the tag byte of its binary records.
+    """
+    __slots__ = ('code', 'training_class', 'fields', 'arity', 'kernel',
+                 'tag')
+
+    def __init__(self, code: str, training_class: type,
+                 kernel=None, tag: str = None) -> None:
+        fields = _init_fields(training_class)
+        if fields is None:
+            raise ValueError(
+                f"The '{code}' workout type needs a constructor with "
+                'positional arguments only, without *args or **kwargs.')
+        tag = code[:1] if tag is None else tag
+        if len(tag) != 1 or not 0 < ord(tag) < 256:
+            raise ValueError(
+                f"The record tag of the '{code}' workout type must be "
+                f'one byte, got {tag!r}.')
+        self.code = code
+        self.training_class = training_class
+        self.fields = fields
+        self.arity = len(fields)
+        self.kernel = kernel
+        self.tag = ord(tag)
+
+    def create(self, data: list) -> Training:
+        """Create a workout after checking the number of values."""
+        if len(data) != self.arity:
+            raise ValueError(
+                f"The '{self.code}' workout type expects {self.arity} "
+                f'values ({", ".join(self.fields)}), got {len(data)}.')
+        return self.training_class(*data)
+
+
+TRAINING_TYPES: dict = {}
+
+
+def register(code: str, kernel=None, tag: str = None):
+    """Register a Training subclass under a package type code.
+
+    ``kernel`` is an optional vectorized calculation used by
+    ``tracker.batch``; it takes the constructor fields as arrays and
+    returns the duration, distance, speed and calories arrays.
+
+    ``tag`` is the character that marks the records of the type in the
+    binary formats, the first letter of ``code`` by default. Every type
+    needs its own tag.
+    """
+    def decorate(training_class: type) -> type:
+        if code in TRAINING_TYPES:
+            raise ValueError(
+                f"The '{code}' workout type is already registered.")
+        workout = WorkoutType(code, training_class, kernel, tag)
+        for other in TRAINING_TYPES.values():
+            if other.tag == workout.tag:
+                raise ValueError(
+                    f"The '{code}' workout type needs another record tag: "
+                    f"{chr(workout.tag)!r} is used by '{other.code}'.")
+        TRAINING_TYPES[code] = workout
+        return training_class
+    return decorate
+
+
+def get_workout_type(workout_type: str) -> WorkoutType:
+    """Return the registered type of a package type code."""
+    try:
+        workout = TRAINING_TYPES.get(workout_type)
+    except TypeError:
+        # Unhashable codes, e.g. a list read from JSON.
+        workout = None
+    if workout is None:
+        raise UnsupportedWorkoutType(workout_type)
+    return workout
+
+
+@register('RUN')
 class Running(Training):
     """Workout: running."""
     CALORIES_MEAN_SPEED_MULTIPLIER = 18
@@ -80,6 +217,7 @@ class Running(Training):
         )
 
 
+@register('WLK')
 class SportsWalking(Training):
     """Workout: race walking."""
     COEF_W_1 = 0.035
@@ -105,6 +243,7 @@ class SportsWalking(Training):
         )
 
 
+@register('SWM')
 class Swimming(Training):
     """Workout: swimming."""
     LEN_STEP = 1.38
@@ -130,32 +269,37 @@ class Swimming(Training):
 
 def read_package(workout_type: str, data: list) -> Training:
     """Read data received from sensors."""
-    training_classes = {
-        'SWM': Swimming,
-        'RUN': Running,
-        'WLK': SportsWalking,
-    }
+    return get_workout_type(workout_type).create(data)
 
-    if workout_type in training_classes:
-        training_class = training_classes[workout_type]
-        return training_class(*data)
-    else:
-        raise ValueError(f"The '{workout_type}' workout type is not supported.")
 
+def main(training: Training, sink=None) -> None:
+    """Main function.
 
-def main(training: Training) -> None:
-    """Main function."""
+    Prints the message right away or, given a sink from
+    ``tracker.sinks``, leaves it to the sink to write in bulk.
+    """
     info = training.show_training_info()
+    if sink is not None:
+        sink.write(info)
+        return
     message = info.get_message()
     print(message)
 
 
 if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1:
+        from tracker.cli import main as cli
+
+        sys.exit(cli(sys.argv[1:]))
+
     packages = [
         ('SWM', [720, 1, 80, 25, 40]),
         ('RUN', [15000, 1, 75]),
         ('WLK', [9000, 1, 75, 180]),
     ]
+    # Three messages: printing them beats importing a sink.
     for training_type, data in packages:
         training = read_package(training_type, data)
         main(training)